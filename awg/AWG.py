@@ -0,0 +1,229 @@
+import copy
+
+import numpy as np
+
+from .digest import digest
+from .material import Material, SiO2Model, SiModel
+from .Wavguide import Waveguide
+from .Aperture import Aperture
+from .SimulationOptions import SimulationOptions
+
+
+class AWG:
+    """
+    Arrayed waveguide grating model.
+
+    All lengths are in microns. Keyword arguments override the defaults
+    listed below; dl defaults to the length increment that places the
+    center wavelength lambda_c in diffraction order m.
+
+    Attributes:
+        lambda_c     - design center wavelength
+        clad         - upper cladding material
+        core         - core material
+        subs         - substrate material
+        w            - array waveguide width
+        h            - waveguide core height
+        t            - waveguide slab thickness (0 for strip waveguides)
+        polarization - 'TE' or 'TM'
+        N            - number of array waveguides
+        m            - diffraction order
+        R            - grating radius of curvature (focal length)
+        d            - array aperture spacing
+        g            - gap between array apertures
+        L0           - length of the shortest array waveguide
+        Ni           - number of input waveguides
+        wi           - input waveguide aperture width
+        di           - input waveguide spacing
+        li           - input waveguide offset
+        No           - number of output waveguides
+        wo           - output waveguide aperture width
+        do           - output waveguide spacing
+        lo           - output waveguide offset
+        df           - radial defocus of the focal curves
+        confocal     - confocal (True) or Rowland (False) mounting
+        phase_error  - (optional) per-arm phase errors (rad), shape (N,);
+                       None for an ideal array
+        arm_loss     - (optional) per-arm propagation loss (dB), shape (N,);
+                       None for lossless arms
+        solver       - mode solver of the channel waveguides (arms and
+                       apertures): 'eim' (effective index method) or 'fd'
+                       (finite differences of the cross-section, for thick
+                       high-contrast cores), see Waveguide
+        samples      - (optional) fixed sample counts of the uniform
+                       aperture grids, dict 'input' / 'array' / 'output'
+                       -> (samples per pitch, samples per half window);
+                       None derives them from the options for every
+                       design (see freeze)
+    """
+
+    def __init__(self, **kwargs):
+        self.lambda_c = 1.550
+        self.clad = SiO2Model()
+        self.core = SiModel()
+        self.subs = SiO2Model()
+        self.w = 0.450
+        self.h = 0.220
+        self.t = 0.0
+        self.polarization = "TE"
+        self.N = 40
+        self.m = 30
+        self.R = 100.0
+        self.d = 1.3
+        self.g = 0.2
+        self.L0 = 0.0
+        self.Ni = 1
+        self.wi = 1.0
+        self.di = 0.0
+        self.li = 0.0
+        self.No = 8
+        self.wo = 1.2
+        self.do = 1.5
+        self.lo = 0.0
+        self.df = 0.0
+        self.confocal = False
+        self.phase_error = None
+        self.arm_loss = None
+        self.solver = "eim"
+        self.samples = None
+        self._dl = None
+
+        for key, value in kwargs.items():
+            if key == "dl":
+                self._dl = value
+            elif hasattr(self, key) and not key.startswith("_"):
+                setattr(self, key, value)
+            else:
+                raise TypeError(f"AWG got an unexpected parameter {key!r}")
+
+        if self.solver not in ("eim", "fd"):
+            raise ValueError(f"solver={self.solver!r} must be 'eim' or 'fd'")
+        if self.g >= self.d:
+            raise ValueError(f"gap g={self.g} must be smaller than spacing d={self.d}")
+
+    def __repr__(self):
+        return (f"AWG(lambda_c={self.lambda_c}, N={self.N}, m={self.m}, R={self.R}, "
+                f"d={self.d}, Ni={self.Ni}, No={self.No})")
+
+    def _state(self):
+        state = {k: v for k, v in vars(self).items() if not k.startswith("_")}
+        state["dl"] = self.dl
+        if self.solver == "eim":
+            # 默认求解器不计入，已有的哈希保持不变
+            del state["solver"]
+        if self.samples is None:
+            del state["samples"]
+        return ("AWG", state)
+
+    def hash(self):
+        """
+        Stable hash of every physical parameter (see awg.digest): equal for
+        equivalent models in any process, e.g. whether dl is given or
+        derived.
+        """
+        return digest(self)
+
+    def at(self, T):
+        """
+        Copy of the model at temperature T (K): every Material is replaced
+        by its model at T (see Material.at), constant indices and plain
+        functions are kept. dl keeps its value at the original temperature,
+        as the arm lengths are fixed by the layout.
+        """
+        model = copy.copy(self)
+        model._dl = self.dl
+        for name in ("clad", "core", "subs"):
+            material = getattr(self, name)
+            if isinstance(material, Material):
+                setattr(model, name, material.at(T))
+        return model
+
+    def freeze(self, options=None):
+        """
+        Copy of the model whose aperture grids keep the sample counts of
+        this design under options (see Aperture.sample_counts) when the
+        geometry changes, so that the simulated transmission is a smooth
+        function of the widths instead of jumping where a count is rounded
+        up (see jacobian and optimize).
+        """
+        options = options or SimulationOptions()
+        model = copy.copy(self)
+        model.samples = {name: getattr(self, f"{name}_aperture")().sample_counts(options.points, options.window)
+                         for name in ("input", "array", "output")}
+        return model
+
+    # ---------- 派生参数 ----------
+    @property
+    def wa(self):
+        """Array waveguide aperture width."""
+        return self.d - self.g
+
+    @property
+    def dl(self):
+        """Array waveguide length increment."""
+        if self._dl is None:
+            return self.m * self.lambda_c / self.array_waveguide().index(self.lambda_c)
+        return self._dl
+
+    @dl.setter
+    def dl(self, value):
+        self._dl = value
+
+    # ---------- 波导 ----------
+    def _waveguide(self, w):
+        return Waveguide(self.clad, self.core, self.subs, w, self.h, self.t, self.polarization, self.solver)
+
+    def array_waveguide(self):
+        return self._waveguide(self.w)
+
+    def slab_waveguide(self):
+        return self._waveguide(np.inf)
+
+    def etched_index(self, lmbda):
+        """Index around the free propagation regions: etched slab of thickness t, or the cladding."""
+        slab = self.slab_waveguide()
+        if self.t > 0:
+            return slab.replace(h=self.t).index(lmbda)
+        return slab.materials(lmbda)[0]
+
+    # ---------- 几何 ----------
+    def arm_lengths(self):
+        """Length of every array waveguide."""
+        return self.L0 + np.arange(self.N) * self.dl
+
+    def focal_z(self, x):
+        """z position of the focal curve (input / output facets) at lateral x."""
+        r = self.R if self.confocal else self.R / 2
+        x = np.asarray(x, dtype=float)
+        return r - np.sqrt(r ** 2 - x ** 2) - self.df
+
+    def slab_walls(self, aperture):
+        """
+        Side walls of a free propagation region, from the ends of the focal
+        curve spanned by aperture (one pitch beyond the outer waveguides) to
+        the ends of the grating circle (one spacing beyond the outer arms):
+        array (2, 2, 2) of the end points (x, z) of the two walls.
+        """
+        x = np.array([aperture.positions.min() - aperture.pitch, aperture.positions.max() + aperture.pitch])
+        a = np.array([-1, 1]) * ((self.N - 1) / 2 + 1) * self.d / self.R
+        focal = np.column_stack([x, self.focal_z(x)])
+        grating = self.R * np.column_stack([np.sin(a), np.cos(a)])
+        return np.stack([focal, grating], axis=1)
+
+    def input_aperture(self):
+        pitch = max(self.di, self.wi)
+        x = self.li + (np.arange(self.Ni) - (self.Ni - 1) / 2) * pitch
+        return Aperture(self._waveguide(self.wi), x, pitch, self.lambda_c, self._samples("input"))
+
+    def array_aperture(self):
+        """Array apertures, positioned by arc length along the grating circle."""
+        s = (np.arange(self.N) - (self.N - 1) / 2) * self.d
+        return Aperture(self._waveguide(self.wa), s, self.d, self.lambda_c, self._samples("array"))
+
+    def output_aperture(self):
+        pitch = max(self.do, self.wo)
+        x = self.lo + (np.arange(self.No) - (self.No - 1) / 2) * pitch
+        return Aperture(self._waveguide(self.wo), x, pitch, self.lambda_c, self._samples("output"))
+
+    def _samples(self, name):
+        return None if self.samples is None else self.samples.get(name)
@@ -0,0 +1,192 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from .core.autoset import autoset
+from .core.pnorm import pnorm
+
+
+class Aperture:
+    """
+    Row of identical waveguide apertures on a regular pitch.
+
+    Apertures are the waveguide facets on either side of a free propagation
+    region: the input waveguides, the array waveguides and the output
+    waveguides. All apertures of a row share one sampling grid whose
+    spacing divides the pitch, so every aperture center falls on a sample
+    and the (wavelength dependent) mode profile is evaluated only once, on
+    a local window, for the whole row, and kept for later calls at the
+    same wavelengths: every arm of a given width shares one profile.
+
+    With a tolerance, the grid is adaptive instead (see core.autoset): the
+    samples of one pitch are placed so that the field of the row, the mode
+    profiles E and H at lambda_c repeated on every aperture, is integrated
+    within that relative tolerance, which puts them densely in the cores and
+    sparsely in the evanescent tails. The same samples are
+    repeated on every pitch, so the apertures still share one grid and
+    one local mode profile; integrals over it use trapezoidal weights (see
+    trapzw). A single aperture is sampled over its window alone.
+
+    The uniform grid has an even number of samples per pitch and an odd
+    number per window, both rounded up from points samples per window
+    width, so they jump as the width crosses a rounding step. Given
+    samples, both counts are fixed instead and the spacing follows the
+    pitch alone (see AWG.freeze); the mode profile then holds the mean of
+    the field over every sample cell rather than its point values, so
+    that it also varies smoothly as a core edge crosses a sample. The
+    adaptive grid uses cell means too: on its uneven cells point values
+    miss the integration tolerance (see core.autoset).
+
+    Attributes:
+        waveguide - Waveguide of the aperture (its width is the taper width)
+        positions - aperture centers (micron)
+        pitch     - center-to-center spacing (micron)
+        lambda_c  - reference wavelength of the adaptive sampling (micron)
+        samples   - (optional) fixed (samples per pitch, samples per half
+                    window) of the uniform grid
+    """
+
+    # 自适应采样的单周期偏移（按波导、周期、窗口和容差缓存）
+    _cache = OrderedDict()
+    # 模式剖面（按波导、局部窗口和波长缓存）
+    _modes = OrderedDict()
+    maxsize = 32
+
+    def __init__(self, waveguide, positions, pitch, lambda_c=1.55, samples=None):
+        self.waveguide = waveguide
+        self.positions = np.atleast_1d(np.asarray(positions, dtype=float))
+        self.pitch = float(pitch)
+        self.lambda_c = float(lambda_c)
+        self.samples = None if samples is None else tuple(int(n) for n in samples)
+
+        if self.pitch <= 0:
+            raise ValueError(f"pitch={pitch} must be > 0")
+        if self.samples is not None and (len(self.samples) != 2 or self.samples[0] < 2
+                                         or self.samples[0] % 2 or self.samples[1] < 1):
+            raise ValueError(f"samples={samples} must be (even n >= 2, h >= 1)")
+
+    @property
+    def width(self):
+        return self.waveguide.w
+
+    @property
+    def count(self):
+        return self.positions.size
+
+    def sample_counts(self, points, window):
+        """
+        Samples per pitch and per half window of the uniform grid: about
+        points samples per window, an even number per pitch (or samples).
+        """
+        if self.samples is not None:
+            return self.samples
+        n = max(int(np.ceil(self.pitch / (window * self.width / points) / 2)) * 2, 2)
+        return n, int(np.ceil(window * self.width / 2 / (self.pitch / n)))
+
+    def spacing(self, points, window):
+        """Sample spacing: about points samples per window, dividing pitch/2."""
+        return self.pitch / self.sample_counts(points, window)[0]
+
+    def local(self, points, window, tolerance=None):
+        """Local window coordinates centered on an aperture."""
+        if tolerance is not None:
+            return self._adaptive(window, tolerance)[0]
+        n, h = self.sample_counts(points, window)
+        return self.pitch / n * np.arange(-h, h + 1)
+
+    def grid(self, points, window, tolerance=None):
+        """
+        Common sampling grid of the row (points is not used when a
+        tolerance is given).
+
+        OUTPUT:
+            x   - grid coordinates
+            idx - (count, len(local)) indices of every aperture window in x
+        """
+        if tolerance is not None:
+            xl, cell, k, j = self._adaptive(window, tolerance)
+            c0 = self.positions.min()
+            if cell is None:
+                return xl + c0, np.arange(xl.size)[np.newaxis, :]
+            steps = np.round((self.positions - c0) / self.pitch).astype(int)
+            idx = (steps[:, np.newaxis] + k) * cell.size + j
+            lo = idx.min()
+            n = np.arange(lo, idx.max() + 1)
+            return c0 + np.floor_divide(n, cell.size) * self.pitch + cell[n % cell.size], idx - lo
+        ds = self.spacing(points, window)
+        xl = self.local(points, window)
+        h = (xl.size - 1) // 2
+        c0 = self.positions.mean()
+        steps = np.round((self.positions - c0) / ds).astype(int)
+        K = np.max(np.abs(steps)) + h
+        x = c0 + ds * np.arange(-K, K + 1)
+        idx = (K + steps)[:, np.newaxis] + np.arange(-h, h + 1)
+        return x, idx
+
+    def mode(self, lmbda, points, window, tolerance=None):
+        """
+        Unit-power mode profile on the local window, shape
+        (..., len(local)), averaged over the sample cells with fixed
+        samples or a tolerance (see slabmode), shared (read-only) by every aperture of the
+        same waveguide and window at the same wavelengths (LRU cache of
+        maxsize entries).
+        """
+        xl = self.local(points, window, tolerance)
+        lmbda = np.asarray(lmbda, dtype=float)
+        cells = self.samples is not None or tolerance is not None
+        key = (self.waveguide.key(), xl.tobytes(), cells, lmbda.shape, lmbda.tobytes())
+        if key in self._modes:
+            self._modes.move_to_end(key)
+            return xl, self._modes[key]
+
+        E, _, _ = self.waveguide.mode(lmbda, xl, cells=cells)
+        M = pnorm(xl, E)
+        M.flags.writeable = False
+        self._modes[key] = M
+        while len(self._modes) > self.maxsize:
+            self._modes.popitem(last=False)
+        return xl, M
+
+    def _adaptive(self, window, tolerance):
+        """
+        Adaptive local window xl, the sample offsets of one pitch (None for
+        a single aperture) and the pitch and offset indices (k, j) of xl.
+        """
+        half = window * self.width / 2
+        single = self.count == 1
+        key = (self.waveguide.key(), self.pitch, self.lambda_c, half, float(tolerance), single)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        def profile(x):
+            # 电场和磁场一起：TM 电场在芯层边界跳变，跳变处也要加密
+            E, H, _ = self.waveguide.mode(self.lambda_c, x)
+            return np.stack([E, H])
+
+        if single:
+            u = autoset(profile, 0.0, half, tolerance)
+            xl = np.concatenate([-u[:0:-1], u])
+            entry = (xl, None, None, None)
+        else:
+            p = self.pitch
+            K = int(np.ceil(half / p)) + 1
+            shifts = p * np.arange(-K, K + 1)
+
+            def row(x):
+                # 整排孔径的场：各周期模式之和
+                return np.abs(profile(x[:, np.newaxis] - shifts)).sum(axis=-1)
+
+            u = autoset(row, 0.0, p / 2, tolerance)
+            cell = np.concatenate([-u[::-1], u[1:-1]])
+            k, j = np.divmod(np.arange(-K * cell.size, (K + 1) * cell.size), cell.size)
+            x = k * p + cell[j]
+            # 覆盖窗口：取到第一个不小于 half 的采样
+            end = x[np.searchsorted(x, half)]
+            keep = np.abs(x) <= end + 1e-12 * p
+            entry = (x[keep], cell, k[keep], j[keep])
+
+        self._cache[key] = entry
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return entry
@@ -0,0 +1,194 @@
+import numpy as np
+
+from .core.fpower import fpower
+
+
+class Field:
+    """
+    Sampled 1D optical field.
+
+    The last axis of E (and H) is the sample axis matching x; any leading
+    axes are batch axes, typically the wavelength axis of a sweep; lmbda,
+    when it is given, matches the trailing batch axes (a multi-port iw
+    adds a leading port axis, see iw).
+
+    Fields are thin, slotted wrappers around arrays: the constructor does
+    not copy its inputs, and offset, crop and indexing return new Fields
+    viewing the same data. A field of B batch entries and n samples holds
+    16 B n bytes for E (complex128) plus 8 n bytes for the coordinate grid,
+    which is shared by every batch entry and by all views; H adds another
+    16 B n bytes once it is evaluated. Beyond that a Field costs one small
+    fixed-size object, whatever the number of samples.
+
+    H may be given as an array or as a callable returning it, in which case
+    it is only evaluated (once) when first accessed.
+
+    In-place operations (pnorm) act on the shared data and are therefore
+    visible through every view; use copy() to detach a field first.
+
+    Attributes:
+        x     - coordinate vector (micron), position along an aperture or arc
+        E     - electric field, shape (..., len(x))
+        H     - (optional) magnetic field, same shape as E
+        lmbda - (optional) wavelength(s) of the batch entries (micron)
+    """
+
+    __slots__ = ("x", "E", "_H", "lmbda")
+
+    def __init__(self, x, E, H=None, lmbda=None):
+        self.x = np.asarray(x, dtype=float)
+        self.E = np.asarray(E)
+        self._H = H if H is None or callable(H) else np.asarray(H)
+        self.lmbda = None if lmbda is None else np.asarray(lmbda, dtype=float)
+
+        if self.x.ndim != 1:
+            raise ValueError("x must be a vector")
+        if self.E.shape[-1] != self.x.size:
+            raise ValueError(f"field has {self.E.shape[-1]} samples but x has {self.x.size}")
+
+    def __repr__(self):
+        return f"Field(shape={self.shape}, x=[{self.x[0]:g}, {self.x[-1]:g}])"
+
+    @property
+    def H(self):
+        if callable(self._H):
+            self._H = np.asarray(self._H())
+        return self._H
+
+    @H.setter
+    def H(self, value):
+        self._H = value if value is None or callable(value) else np.asarray(value)
+
+    @property
+    def shape(self):
+        return self.E.shape
+
+    @property
+    def batch_shape(self):
+        """Shape of the batch (wavelength) axes."""
+        return self.E.shape[:-1]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the field arrays (H only once it has been evaluated)."""
+        H = self._H if isinstance(self._H, np.ndarray) else None
+        return sum(a.nbytes for a in (self.x, self.E, H, self.lmbda) if a is not None)
+
+    def power(self):
+        """Power carried by the field (per batch entry)."""
+        return fpower(self.x, self.E, self.H)
+
+    def pnorm(self):
+        """
+        Normalize every batch entry to unit power.
+
+        E (and H) are scaled in place when they are writable floating point
+        arrays, otherwise they are replaced by normalized copies. Returns
+        the field itself.
+        """
+        P = np.asarray(self.power())
+        if self._H is None:
+            s = np.sqrt(P)
+        else:
+            # 同时缩放 E 和 H，功率 Re(E H*) 按 s^2 变化
+            s = np.sqrt(np.abs(P))
+        s = s[..., np.newaxis]
+        self.E = _scale(self.E, s)
+        if self._H is not None:
+            self._H = _scale(self.H, s)
+        return self
+
+    def offset(self, dx):
+        """Field translated by dx along x; the field data are shared."""
+        return Field(self.x + dx, self.E, self._H, self.lmbda)
+
+    def crop(self, xmin=-np.inf, xmax=np.inf):
+        """Field restricted to xmin <= x <= xmax, as a view of the data."""
+        i = np.searchsorted(self.x, xmin, side="left")
+        j = np.searchsorted(self.x, xmax, side="right")
+        return self[..., i:j]
+
+    def copy(self):
+        """Deep copy (a lazy H stays lazy)."""
+        H = self._H.copy() if isinstance(self._H, np.ndarray) else self._H
+        lmbda = None if self.lmbda is None else self.lmbda.copy()
+        return Field(self.x.copy(), self.E.copy(), H, lmbda)
+
+    def __getitem__(self, key):
+        """
+        Index the batch axes, e.g. F[j] or F[2:5]; a trailing index on the
+        sample axis is allowed when key is a tuple ending in a slice
+        (F[..., i:j]). Basic indexing returns views.
+        """
+        key = key if isinstance(key, tuple) else (key,)
+        if key[0] is Ellipsis and len(key) == 2:
+            # 采样轴切片：x 与 E/H 同步切片
+            s = key[1]
+            H = self.H[..., s] if self._H is not None else None
+            return Field(self.x[s], self.E[..., s], H, self.lmbda)
+
+        if len(key) > len(self.batch_shape):
+            raise IndexError("too many indices for the batch axes of the field")
+        H = self.H[key] if self._H is not None else None
+        return Field(self.x, self.E[key], H, self._lmbda(key))
+
+    def _lmbda(self, key):
+        """
+        Wavelengths of the batch entries selected by key. lmbda matches the
+        trailing batch axes (leading axes, such as the input ports of a
+        multi-port iw, share it), so it is indexed as a broadcast view,
+        whose leading broadcast axes are then dropped again.
+        """
+        if self.lmbda is None or self.lmbda.ndim == 0:
+            return self.lmbda
+        lmbda = np.broadcast_to(self.lmbda, self.batch_shape)[key]
+        while lmbda.ndim and lmbda.strides[0] == 0:
+            lmbda = lmbda[0]
+        return lmbda
+
+    @classmethod
+    def concat(cls, fields, axis="batch"):
+        """
+        Concatenate fields along the first batch axis (axis='batch', equal
+        grids, e.g. consecutive wavelength batches of a sweep) or along the
+        sample axis (axis='x', increasing and non-overlapping grids). The
+        result owns new arrays.
+        """
+        fields = list(fields)
+        if not fields:
+            raise ValueError("no fields to concatenate")
+        hasH = [f._H is not None for f in fields]
+        if any(hasH) and not all(hasH):
+            raise ValueError("either all or none of the fields must carry H")
+
+        if axis == "batch":
+            x = fields[0].x
+            if any(f.x is not x and not np.array_equal(f.x, x) for f in fields[1:]):
+                raise ValueError("batch concatenation requires identical grids")
+            E = np.concatenate([np.atleast_2d(f.E) for f in fields])
+            H = np.concatenate([np.atleast_2d(f.H) for f in fields]) if hasH[0] else None
+            lmbda = None
+            if all(f.lmbda is not None for f in fields):
+                lmbda = np.concatenate([np.atleast_1d(f.lmbda) for f in fields])
+            return cls(x, E, H, lmbda)
+
+        if axis == "x":
+            x = np.concatenate([f.x for f in fields])
+            if np.any(np.diff(x) <= 0):
+                raise ValueError("sample concatenation requires increasing, non-overlapping grids")
+            shape = np.broadcast_shapes(*(f.batch_shape for f in fields))
+            E = np.concatenate([np.broadcast_to(f.E, shape + f.x.shape) for f in fields], axis=-1)
+            H = None
+            if hasH[0]:
+                H = np.concatenate([np.broadcast_to(f.H, shape + f.x.shape) for f in fields], axis=-1)
+            return cls(x, E, H, fields[0].lmbda)
+
+        raise ValueError(f"axis={axis!r} must be 'batch' or 'x'")
+
+
+def _scale(a, s):
+    """a / s, in place when a is a writable floating point array."""
+    if a.flags.writeable and np.issubdtype(a.dtype, np.inexact):
+        a /= s
+        return a
+    return a / s
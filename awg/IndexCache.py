@@ -0,0 +1,145 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class IndexCache:
+    """
+    LRU cache of effective-index solutions.
+
+    Entries are keyed by a waveguide key (materials, cross-section,
+    polarization and mode order, see Waveguide.key) together with a single
+    wavelength, so vectorized lookups only solve the wavelengths that have
+    not been seen before, in one vectorized call.
+
+    Attributes:
+        maxsize - maximum number of cached (waveguide, wavelength) entries
+        hits    - number of wavelengths served from the cache
+        misses  - number of wavelengths that had to be solved
+    """
+
+    def __init__(self, maxsize=2 ** 16):
+        if maxsize < 1:
+            raise ValueError(f"maxsize={maxsize} must be >= 1")
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def lookup(self, key, lmbda, solve):
+        """
+        Cached evaluation of solve(lmbda) for the waveguide identified by key.
+
+        INPUTS:
+            key   - hashable waveguide key
+            lmbda - wavelength(s) (micron), scalar or array
+            solve - vectorized solver called with the missing wavelengths
+
+        OUTPUT:
+            n - effective index, same shape as lmbda
+        """
+        lmbda = np.asarray(lmbda, dtype=float)
+        flat = lmbda.reshape(-1)
+        n = np.empty(flat.shape)
+
+        missing = []
+        for i, l in enumerate(flat.tolist()):
+            value = self._data.get((key, l))
+            if value is None:
+                missing.append(i)
+            else:
+                self._data.move_to_end((key, l))
+                n[i] = value
+        self.hits += flat.size - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            # 同一批次中重复的波长只求解一次
+            todo, inverse = np.unique(flat[missing], return_inverse=True)
+            solved = np.atleast_1d(np.asarray(solve(todo), dtype=float))
+            n[missing] = solved[inverse]
+            for l, value in zip(todo.tolist(), solved.tolist()):
+                self._data[(key, l)] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+        if lmbda.ndim == 0:
+            return n.item()
+        return n.reshape(lmbda.shape)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Cache statistics as a dict (hits, misses, size, maxsize)."""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._data), "maxsize": self.maxsize}
+
+
+class IndexTable:
+    """
+    Spline interpolated effective index over a wavelength (and width) range.
+
+    A 1D table interpolates n(lambda) of one waveguide; a 2D table
+    interpolates n(lambda, w) over a grid of core widths, which is what
+    Monte-Carlo width perturbations need. The table is solved once at
+    construction (through the index cache) and then evaluated with cubic
+    splines.
+
+    Attributes:
+        waveguide - Waveguide the table was built for
+        lmbda     - wavelength grid (micron)
+        w         - width grid (micron), None for a 1D table
+        mode      - mode order
+    """
+
+    def __init__(self, waveguide, lmbda, w=None, mode=0):
+        from scipy.interpolate import CubicSpline, RectBivariateSpline
+
+        self.waveguide = waveguide
+        self.lmbda = np.asarray(lmbda, dtype=float)
+        self.w = None if w is None else np.asarray(w, dtype=float)
+        self.mode = mode
+
+        if self.lmbda.ndim != 1 or self.lmbda.size < 4 or np.any(np.diff(self.lmbda) <= 0):
+            raise ValueError("lmbda must be an increasing vector of at least 4 points")
+
+        if self.w is None:
+            n = waveguide.index(self.lmbda, mode)
+            self._spline = CubicSpline(self.lmbda, n)
+        else:
+            if self.w.ndim != 1 or self.w.size < 4 or np.any(np.diff(self.w) <= 0):
+                raise ValueError("w must be an increasing vector of at least 4 points")
+            n = np.stack([waveguide.replace(w=wk).index(self.lmbda, mode) for wk in self.w], axis=-1)
+            self._spline = RectBivariateSpline(self.lmbda, self.w, n)
+
+        if np.any(np.isnan(n)):
+            raise ValueError("mode is cut off inside the table range")
+
+    def __call__(self, lmbda, w=None):
+        """Interpolated effective index, broadcasting lmbda against w."""
+        return self._evaluate(lmbda, w, 0)
+
+    def groupindex(self, lmbda, w=None):
+        """Group index ng = n - lambda * dn/dlambda from the spline derivative."""
+        lmbda = np.asarray(lmbda, dtype=float)
+        return self._evaluate(lmbda, w, 0) - lmbda * self._evaluate(lmbda, w, 1)
+
+    def _evaluate(self, lmbda, w, dl):
+        lmbda = np.asarray(lmbda, dtype=float)
+        if self.w is None:
+            if w is not None:
+                raise ValueError("1D table does not depend on w")
+            return self._spline(lmbda, dl)
+
+        if w is None:
+            w = self.waveguide.w
+        lmbda, w = np.broadcast_arrays(lmbda, np.asarray(w, dtype=float))
+        n = self._spline(lmbda, w, dx=dl, grid=False)
+        return n.item() if n.ndim == 0 else n
@@ -0,0 +1,81 @@
+import numpy as np
+
+# 真空光速 (micron/s)
+C = 299792458e6
+
+
+class PoleResidue:
+    """
+    Pole-residue model of the transmission of an AWG.
+
+    Evaluates, at angular frequency omega = 2 pi C / lmbda,
+
+        T(omega) = exp(-i (omega - center) delay)
+                   (sum_k residues_k / (i x - poles_k) + constant)
+
+    with x = (omega - center) / scale, for every input/output pair (see
+    SMatrix.fit). Evaluation costs one small matrix product per
+    wavelength, so circuit simulations can call it instead of the
+    physical model.
+
+    Attributes:
+        poles    - common poles in the normalized frequency, shape (n,)
+        residues - residues, shape (n, No, Ni)
+        constant - constant terms, shape (No, Ni)
+        delay    - group delay divided out (s)
+        center   - angular frequency of the band center (rad/s)
+        scale    - half width of the fitted band (rad/s)
+        error    - largest deviation from the fitted samples (None if
+                   unknown)
+    """
+
+    def __init__(self, poles, residues, constant, delay=0.0, center=0.0, scale=1.0, error=None):
+        self.poles = np.asarray(poles, dtype=complex).reshape(-1)
+        self.residues = np.asarray(residues, dtype=complex)
+        self.constant = np.asarray(constant, dtype=complex)
+        self.delay = float(delay)
+        self.center = float(center)
+        self.scale = float(scale)
+        self.error = error
+
+        if self.residues.shape != (self.poles.size,) + self.constant.shape or self.constant.ndim != 2:
+            raise ValueError(f"residues of shape {self.residues.shape} do not match "
+                             f"{self.poles.size} poles and constant of shape {self.constant.shape}")
+        if self.scale <= 0:
+            raise ValueError(f"scale={scale} must be > 0")
+
+    def __repr__(self):
+        No, Ni = self.constant.shape
+        return f"PoleResidue({self.poles.size} poles, Ni={Ni}, No={No})"
+
+    def transmission(self, lmbda):
+        """Complex transmission, shape (*lmbda.shape, No, Ni)."""
+        lmbda = np.asarray(lmbda, dtype=float)
+        omega = 2 * np.pi * C / lmbda.reshape(-1)
+        x = (omega - self.center) / self.scale
+        phi = 1 / (1j * x[:, np.newaxis] - self.poles)
+        T = np.tensordot(phi, self.residues, axes=1) + self.constant
+        T *= np.exp(-1j * (omega - self.center) * self.delay)[:, np.newaxis, np.newaxis]
+        return T.reshape(lmbda.shape + self.constant.shape)
+
+    def __call__(self, lmbda):
+        """Scattering matrix of all ports (see SMatrix), shape (*lmbda.shape, Ni + No, Ni + No)."""
+        T = self.transmission(lmbda)
+        No, Ni = self.constant.shape
+        S = np.zeros(T.shape[:-2] + (Ni + No, Ni + No), dtype=complex)
+        S[..., Ni:, :Ni] = T
+        S[..., :Ni, Ni:] = np.swapaxes(T, -1, -2)
+        return S
+
+    def save(self, path):
+        """Write the model to a NumPy .npz file."""
+        np.savez(path, poles=self.poles, residues=self.residues, constant=self.constant,
+                 delay=self.delay, center=self.center, scale=self.scale,
+                 error=np.nan if self.error is None else self.error)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            error = float(data["error"])
+            return cls(data["poles"], data["residues"], data["constant"], float(data["delay"]),
+                       float(data["center"]), float(data["scale"]), None if np.isnan(error) else error)
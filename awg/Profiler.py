@@ -0,0 +1,204 @@
+import functools
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class Profiler:
+    """
+    Opt-in profiler of the simulation stages.
+
+    Records, for every instrumented function (the chain stages iw, fpr1,
+    aw, fpr2, ow, simulate and spectrum, the mode solvers, diffraction,
+    overlaps and the material models), the number of calls, the wall time
+    (inclusive and exclusive of instrumented callees), the size of the
+    largest array passed in or returned and the peak memory allocated
+    during the call (tracemalloc, above the memory in use at entry).
+    Figures are kept per call stack, so the same stage reached from
+    different callers is told apart.
+
+    Use it as a context manager around any code,
+
+        with awg.Profiler() as prof:
+            awg.spectrum(model)
+        print(prof.report())
+        prof.json("profile.json")
+        prof.folded("profile.folded")   # flamegraph.pl / speedscope
+
+    or pass it (or True) as SimulationOptions(profile=...), in which case
+    simulate and spectrum activate it themselves. Profilers are re-entrant
+    and accumulate over several activations. Outside of an active profiler
+    an instrumented function costs one extra Python call. Only the calling
+    process is profiled (not the workers of montecarlo).
+
+    Attributes:
+        memory - track peak memory (tracemalloc slows allocations down)
+        wall   - total time spent inside the profiler (s)
+    """
+
+    def __init__(self, memory=True):
+        self.memory = bool(memory)
+        self.wall = 0.0
+        # 调用栈路径 -> [调用次数, 总时间, 自身时间, 最大数组元素数, 峰值内存]
+        self._paths = {}
+        self._stack = []
+        self._depth = 0
+        self._previous = None
+        self._tracing = False
+        self._start = 0.0
+
+    def __repr__(self):
+        return f"Profiler({len(self._paths)} call paths, {self.wall:.3f} s)"
+
+    @property
+    def active(self):
+        return self._depth > 0
+
+    def __enter__(self):
+        global _active
+        if self._depth == 0:
+            if self.memory:
+                self._tracing = not tracemalloc.is_tracing()
+                if self._tracing:
+                    tracemalloc.start()
+            self._previous, _active = _active, self
+            self._start = time.perf_counter()
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        self._depth -= 1
+        if self._depth == 0:
+            self.wall += time.perf_counter() - self._start
+            _active = self._previous
+            if self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+        return False
+
+    def clear(self):
+        """Discard the recorded figures."""
+        self._paths.clear()
+        self.wall = 0.0
+
+    def _call(self, name, f, args, kwargs):
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        path = (self._stack[-1][0] if self._stack else ()) + (name,)
+        # 帧：[路径, 子调用时间, 进入时内存, 期间最高内存]
+        frame = [path, 0.0, current, current]
+        self._stack.append(frame)
+        t = time.perf_counter()
+        try:
+            result = f(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - t
+            self._stack.pop()
+            if memory:
+                frame[3] = max(frame[3], tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+            if self._stack:
+                self._stack[-1][1] += elapsed
+                self._stack[-1][3] = max(self._stack[-1][3], frame[3])
+            entry = self._paths.setdefault(path, [0, 0.0, 0.0, 0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - frame[1]
+            entry[4] = max(entry[4], frame[3] - frame[2])
+        entry[3] = max(entry[3], _elements(args), _elements(kwargs.values()), _elements((result,)))
+        return result
+
+    def stages(self):
+        """
+        Figures per stage, summed over call paths: dict name -> dict with
+        'calls', 'time' (inclusive, s), 'self' (exclusive, s),
+        'max_elements' and 'peak_bytes'.
+        """
+        stages = {}
+        for path, (calls, total, own, elements, peak) in self._paths.items():
+            s = stages.setdefault(path[-1], {"calls": 0, "time": 0.0, "self": 0.0,
+                                             "max_elements": 0, "peak_bytes": 0})
+            s["calls"] += calls
+            # 递归调用只计最外层的总时间
+            if path[-1] not in path[:-1]:
+                s["time"] += total
+            s["self"] += own
+            s["max_elements"] = max(s["max_elements"], elements)
+            s["peak_bytes"] = max(s["peak_bytes"], peak)
+        return dict(sorted(stages.items(), key=lambda item: -item[1]["self"]))
+
+    def to_dict(self):
+        """Stages (see stages) and call paths as plain data, for JSON."""
+        return {
+            "wall": self.wall,
+            "memory": self.memory,
+            "stages": self.stages(),
+            "paths": [{"stack": list(path), "calls": calls, "time": total, "self": own,
+                       "max_elements": elements, "peak_bytes": peak}
+                      for path, (calls, total, own, elements, peak) in self._paths.items()],
+        }
+
+    def json(self, path=None):
+        """JSON text of to_dict(), also written to path if given."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def folded(self, path=None):
+        """
+        Folded stacks ('spectrum;simulate;fpr1;diffract 1234' per line,
+        exclusive time in microseconds), the input format of flamegraph.pl
+        and speedscope; also written to path if given.
+        """
+        lines = [f"{';'.join(p)} {round(own * 1e6)}" for p, (_, _, own, _, _) in self._paths.items()]
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def report(self):
+        """Text table of the stages, slowest (exclusive time) first."""
+        rows = [f"{'stage':<12} {'calls':>7} {'time (s)':>10} {'self (s)':>10} {'elements':>10} {'peak (MB)':>10}"]
+        for name, s in self.stages().items():
+            rows.append(f"{name:<12} {s['calls']:7d} {s['time']:10.4f} {s['self']:10.4f} "
+                        f"{s['max_elements']:10d} {s['peak_bytes'] / 2 ** 20:10.2f}")
+        return "\n".join(rows)
+
+
+# 当前活动的 Profiler（没有时为 None，被装饰的函数直接调用）
+_active = None
+
+
+def profiled(name):
+    """Decorator recording calls of a function as stage name in the active Profiler."""
+    def decorate(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return f(*args, **kwargs)
+            return _active._call(name, f, args, kwargs)
+        return wrapper
+    return decorate
+
+
+def _elements(values):
+    """Size of the largest array among values (and the items of tuples among them)."""
+    n = 0
+    for v in values:
+        if isinstance(v, np.ndarray):
+            n = max(n, v.size)
+        elif isinstance(v, tuple):
+            n = max([n] + [a.size for a in v if isinstance(a, np.ndarray)])
+    return n
@@ -0,0 +1,231 @@
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+
+from .Field import Field
+from .SimulationOptions import SimulationOptions
+from .digest import digest
+from .iw import iw
+from .fpr1 import fpr1
+from .aw import aw
+from .fpr2 import fpr2
+from .simulate import simulate
+
+
+# 缓存格式版本，数值算法或存储格式变化时递增以使旧条目失效
+VERSION = 3
+
+_STAGES = {"iw": (iw,), "fpr1": (iw, fpr1), "aw": (iw, fpr1, aw), "fpr2": (iw, fpr1, aw, fpr2)}
+
+
+class ResultCache:
+    """
+    Persistent on-disk cache of simulation results.
+
+    Entries are keyed by the stable hashes of the model and the options
+    (see AWG.hash, SimulationOptions.hash), the input waveguide and the kind
+    of result: output transmissions ('ow') or the field after one stage of
+    the chain ('iw', 'fpr1', 'aw', 'fpr2'). Every entry is a directory of
+    .npy arrays sorted by wavelength, opened memory-mapped, so only the
+    requested rows are read. A request is split into the wavelengths that
+    are already stored and the missing ones; only the latter are
+    simulated and merged into the entry, so extending a sweep reuses
+    everything that was computed before. Transmissions are always computed
+    through the simulation chain in batches of options.batch_size, never
+    interpolated (see spectrum), so an entry does not depend on the order
+    of the requests that filled it.
+
+    Entries are replaced atomically (written to a temporary directory, then
+    renamed), so concurrent processes sharing a cache directory at worst
+    compute a result twice. When the total size exceeds maxsize the least
+    recently used entries are removed.
+
+    Attributes:
+        path    - cache directory (default $AWG_CACHE or ~/.cache/awg)
+        maxsize - size bound in bytes
+        hits    - number of wavelengths served from the cache
+        misses  - number of wavelengths that had to be simulated
+    """
+
+    def __init__(self, path=None, maxsize=2 ** 30):
+        if maxsize < 0:
+            raise ValueError(f"maxsize={maxsize} must be >= 0")
+        if path is None:
+            path = os.environ.get("AWG_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "awg"))
+        self.path = os.path.abspath(path)
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def __repr__(self):
+        return f"ResultCache({self.path!r}, maxsize={self.maxsize})"
+
+    def key(self, kind, model, _input=0, options=None):
+        """Entry name of one kind of result of a model."""
+        options = options or SimulationOptions()
+        return digest((VERSION, kind, model.hash(), options.hash(), int(_input)))
+
+    def simulate(self, model, lmbda, _input=0, options=None):
+        """
+        Cached simulate: power transmission, shape (*lmbda.shape, No).
+        """
+        options = options or SimulationOptions()
+
+        def compute(l):
+            # 总是逐批走仿真链：插值扫描（见 spectrum）的结果取决于请求的波长范围
+            T = np.empty(l.shape + (model.No,))
+            for i in range(0, l.size, options.batch_size):
+                T[i:i + options.batch_size] = simulate(model, l[i:i + options.batch_size], _input,
+                                                       options=options)
+            return {"data": T}
+
+        entry = self._lookup(self.key("ow", model, _input, options), lmbda, compute,
+                             {"kind": "ow", "model": repr(model), "input": _input})
+        return entry["data"]
+
+    def field(self, stage, model, lmbda, _input=0, options=None):
+        """
+        Cached Field after one stage of the chain ('iw', 'fpr1', 'aw' or
+        'fpr2'), with E of shape (*lmbda.shape, n).
+        """
+        if stage not in _STAGES:
+            raise ValueError(f"stage={stage!r} must be one of {', '.join(_STAGES)}")
+        options = options or SimulationOptions()
+
+        def compute(l):
+            F = iw(model, l, _input, options=options)
+            for f in _STAGES[stage][1:]:
+                F = f(model, l, F, options)
+            return {"data": F.E, "x": F.x}
+
+        entry = self._lookup(self.key(stage, model, _input, options), lmbda, compute,
+                             {"kind": stage, "model": repr(model), "input": _input})
+        return Field(entry["x"], entry["data"], lmbda=lmbda)
+
+    # ---------- 存储 ----------
+    def _lookup(self, key, lmbda, compute, meta):
+        lmbda = np.asarray(lmbda, dtype=float)
+        flat = lmbda.reshape(-1)
+        entry = self._load(key)
+
+        if entry is None:
+            missing = np.unique(flat)
+        else:
+            wl = entry["wavelength"]
+            pos = np.minimum(np.searchsorted(wl, flat), wl.size - 1)
+            missing = np.unique(flat[wl[pos] != flat])
+        miss = int(np.count_nonzero(np.isin(flat, missing)))
+        self.hits += flat.size - miss
+        self.misses += miss
+
+        if missing.size:
+            new = compute(missing)
+            new["wavelength"] = missing
+            if entry is not None:
+                # 与已有条目合并，按波长排序
+                for name in ("wavelength", "data"):
+                    new[name] = np.concatenate([entry[name], new[name]])
+                new["x"] = entry.get("x", new.get("x"))
+                order = np.argsort(new["wavelength"], kind="stable")
+                new["wavelength"] = new["wavelength"][order]
+                new["data"] = new["data"][order]
+            self._save(key, new, meta)
+            entry = new
+        else:
+            self._touch(key)
+
+        rows = np.searchsorted(entry["wavelength"], flat)
+        out = {"data": np.asarray(entry["data"][rows]).reshape(lmbda.shape + entry["data"].shape[1:])}
+        if "x" in entry and entry["x"] is not None:
+            out["x"] = np.array(entry["x"])
+        return out
+
+    def _load(self, key):
+        folder = os.path.join(self.path, key)
+        try:
+            entry = {"wavelength": np.load(os.path.join(folder, "wavelength.npy"), mmap_mode="r"),
+                     "data": np.load(os.path.join(folder, "data.npy"), mmap_mode="r")}
+            if os.path.exists(os.path.join(folder, "x.npy")):
+                entry["x"] = np.load(os.path.join(folder, "x.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if entry["wavelength"].shape[0] != entry["data"].shape[0]:
+            return None
+        return entry
+
+    def _save(self, key, arrays, meta):
+        folder = os.path.join(self.path, key)
+        tmp = os.path.join(self.path, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp)
+        for name, a in arrays.items():
+            if a is not None:
+                np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(a))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        # 目录不能原子覆盖：先把旧条目移走再换入新条目
+        try:
+            os.rename(tmp, folder)
+        except OSError:
+            old = os.path.join(self.path, f".old-{uuid.uuid4().hex}")
+            try:
+                os.rename(folder, old)
+            except OSError:
+                pass
+            try:
+                os.rename(tmp, folder)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)
+            shutil.rmtree(old, ignore_errors=True)
+        self.evict()
+
+    def _touch(self, key):
+        try:
+            os.utime(os.path.join(self.path, key))
+        except OSError:
+            pass
+
+    def entries(self):
+        """(key, bytes, last use) of every entry, least recently used first."""
+        out = []
+        for key in os.listdir(self.path):
+            folder = os.path.join(self.path, key)
+            if key.startswith(".") or not os.path.isdir(folder):
+                continue
+            try:
+                size = sum(e.stat().st_size for e in os.scandir(folder))
+                out.append((key, size, os.stat(folder).st_mtime))
+            except OSError:
+                continue
+        return sorted(out, key=lambda e: e[2])
+
+    def size(self):
+        """Total size of the cache in bytes."""
+        return sum(e[1] for e in self.entries())
+
+    def evict(self, maxsize=None):
+        """Remove least recently used entries until the cache fits in maxsize bytes."""
+        maxsize = self.maxsize if maxsize is None else maxsize
+        entries = self.entries()
+        total = sum(e[1] for e in entries)
+        for key, size, _ in entries:
+            if total <= maxsize:
+                break
+            shutil.rmtree(os.path.join(self.path, key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        self.evict(0)
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Cache statistics as a dict (hits, misses, entries, size, maxsize)."""
+        entries = self.entries()
+        return {"hits": self.hits, "misses": self.misses, "entries": len(entries),
+                "size": sum(e[1] for e in entries), "maxsize": self.maxsize}
@@ -0,0 +1,175 @@
+import warnings
+
+import numpy as np
+
+from .PoleResidue import PoleResidue, C
+from .core.vectfit import vectfit
+
+
+class SMatrix:
+    """
+    Scattering matrix of an AWG over a wavelength grid.
+
+    Ports 1 to Ni are the input waveguides and ports Ni + 1 to Ni + No the
+    output waveguides (see sparameters). Only the transmission block
+    between inputs and outputs is stored by save, as every other entry
+    follows from it.
+
+    Attributes:
+        wavelength - wavelengths (micron), shape (L,)
+        S          - complex matrix, shape (L, Ni + No, Ni + No)
+        Ni         - number of input ports
+    """
+
+    def __init__(self, wavelength, S, Ni):
+        self.wavelength = np.asarray(wavelength, dtype=float).reshape(-1)
+        self.S = np.asarray(S, dtype=complex)
+        self.Ni = int(Ni)
+
+        if self.S.shape[0] != self.wavelength.size or self.S.shape[1:] != (self.ports, self.ports):
+            raise ValueError(f"S of shape {self.S.shape} does not match {self.wavelength.size} wavelengths")
+        if not 0 < self.Ni < self.ports:
+            raise ValueError(f"Ni={Ni} must be in [1, {self.ports - 1}]")
+
+    def __repr__(self):
+        return f"SMatrix({self.ports} ports, {self.wavelength.size} wavelengths)"
+
+    @property
+    def ports(self):
+        return self.S.shape[-1]
+
+    @property
+    def No(self):
+        return self.ports - self.Ni
+
+    @property
+    def frequency(self):
+        """Frequencies (Hz)."""
+        return C / self.wavelength
+
+    @property
+    def transmission(self):
+        """Complex transmission from every input to every output, shape (L, No, Ni)."""
+        return self.S[:, self.Ni:, :self.Ni]
+
+    def save(self, path):
+        """Write the wavelengths and the transmission block to a NumPy .npz file."""
+        np.savez_compressed(path, wavelength=self.wavelength, transmission=self.transmission)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.build(data["wavelength"], data["transmission"])
+
+    @classmethod
+    def build(cls, wavelength, transmission):
+        """SMatrix of the reciprocal device with the given (L, No, Ni) transmission block."""
+        transmission = np.asarray(transmission, dtype=complex)
+        L, No, Ni = transmission.shape
+        S = np.zeros((L, Ni + No, Ni + No), dtype=complex)
+        S[:, Ni:, :Ni] = transmission
+        S[:, :Ni, Ni:] = np.swapaxes(transmission, 1, 2)
+        return cls(wavelength, S, Ni)
+
+    def touchstone(self, path):
+        """
+        Write the matrix as a Touchstone (version 1) file, conventionally
+        named *.sNp for N ports: frequencies in GHz, ascending, real and
+        imaginary parts, reference resistance 50 ohm (immaterial for
+        optical ports).
+        """
+        n = self.ports
+        order = np.argsort(self.frequency)
+        with open(path, "w") as f:
+            f.write(f"! AWG scattering matrix: ports 1-{self.Ni} inputs, "
+                    f"{self.Ni + 1}-{n} outputs\n")
+            f.write("# GHZ S RI R 50\n")
+            for k in order:
+                S = self.S[k]
+                if n == 2:
+                    # 双端口按列顺序 S11 S21 S12 S22
+                    rows = [S.T.reshape(-1)]
+                else:
+                    rows = S
+                lines = []
+                for row in rows:
+                    # 每行最多 4 个复数，矩阵每一行另起一行
+                    for i in range(0, row.size, 4):
+                        lines.append(" ".join(f"{v.real:.9e} {v.imag:.9e}" for v in row[i:i + 4]))
+                f.write(f"{self.frequency[k] * 1e-9:.9f} " + "\n  ".join(lines) + "\n")
+
+    def fit(self, poles=None, tolerance=1e-3, iterations=10):
+        """
+        Pole-residue model of the transmission (see PoleResidue).
+
+        The earliest delay of the impulse response is divided out, so that
+        the rest is causal (every path is a further delay, which stable
+        poles approximate, while an advance would need unstable ones), and
+        fitted in the frequency offset from the band center with common
+        poles (see core.vectfit). The pole count needed grows with the
+        spread of the path delays over the band, about twice the number
+        of arms for a band of one free spectral range. Without a number
+        of poles, 8 are tried first and doubled until the largest error is
+        below tolerance times the largest transmission amplitude (or the
+        samples run out, 2 n + 2 samples being needed for n poles); a
+        RuntimeWarning reports the error if no count reaches tolerance.
+        """
+        samples = self.wavelength.size
+        if poles is not None and poles < 1:
+            raise ValueError(f"poles={poles} must be >= 1")
+        if samples < 2 * (poles or 1) + 2:
+            raise ValueError(f"{samples} wavelengths cannot fit {poles or 1} pole(s) "
+                             f"(at least {2 * (poles or 1) + 2} needed)")
+        order = np.argsort(self.frequency)
+        omega = 2 * np.pi * self.frequency[order]
+        T = self.transmission[order].reshape(omega.size, -1)
+
+        delay = _delay(omega, T)
+        center = (omega[0] + omega[-1]) / 2
+        scale = max((omega[-1] - omega[0]) / 2, 1.0)
+        x = (omega - center) / scale
+        H = T * np.exp(1j * (omega - center) * delay)[:, np.newaxis]
+
+        largest = np.max(np.abs(T))
+        counts = [poles] if poles is not None else _counts(omega.size)
+        for n in counts:
+            start = -2.0 / n + 1j * np.linspace(-1, 1, n)
+            p, r, d = vectfit(1j * x, H, start, iterations)
+            model = PoleResidue(p, r.reshape((n, self.No, self.Ni)), d.reshape(self.No, self.Ni),
+                                delay, center, scale)
+            model.error = float(np.max(np.abs(model.transmission(self.wavelength) - self.transmission)))
+            if model.error <= tolerance * largest:
+                break
+        else:
+            warnings.warn(f"pole-residue fit with {n} poles has a largest error of {model.error:.3g}, "
+                          f"above {tolerance * largest:.3g}", RuntimeWarning)
+        return model
+
+
+def _delay(omega, T, floor=1e-3):
+    """
+    Earliest delay (s) of the transmissions T (K, E) sampled at the sorted
+    angular frequencies omega whose impulse response carries more than
+    floor times the peak energy.
+    """
+    step = T[1:] * np.conj(T[:-1])
+    # 按功率加权的平均群时延
+    mean = -np.sum(np.angle(step.sum(axis=1))) / (omega[-1] - omega[0])
+    u = np.linspace(omega[0], omega[-1], omega.size)
+    H = T * np.exp(1j * (omega - omega[0]) * mean)[:, np.newaxis]
+    H = np.stack([np.interp(u, omega, h.real) + 1j * np.interp(u, omega, h.imag) for h in H.T], axis=1)
+    # 加窗 FFT 得到相对平均时延的冲激响应
+    energy = np.sum(np.abs(np.fft.fft(H * np.hanning(u.size)[:, np.newaxis], axis=0)) ** 2, axis=1)
+    t = np.fft.fftfreq(u.size, (u[1] - u[0]) / (2 * np.pi))
+    early = t[energy > floor * energy.max()].min()
+    return mean + early - (t[1] - t[0])
+
+
+def _counts(samples):
+    """Pole counts tried by SMatrix.fit: 8, 16, ... while the samples allow."""
+    n = 8
+    counts = [min(n, (samples - 2) // 2)]
+    while 2 * n <= (samples - 2) // 2:
+        n *= 2
+        counts.append(n)
+    return counts
@@ -0,0 +1,106 @@
+from .Profiler import Profiler
+from .digest import digest
+
+
+class SimulationOptions:
+    """
+    Numerical options of the AWG simulation chain.
+
+    Attributes:
+        points     - samples across each aperture field window
+        window     - width of an aperture field window in units of the
+                     aperture width (captures the evanescent tails)
+        batch_size - wavelengths propagated together by spectrum; bounds
+                     the memory of the diffraction kernels
+        diffraction - free propagation backend: 'auto', 'direct' or 'fft'
+                      (see core.diffract)
+        fpr         - star coupler model: 'diffraction' (fast scalar
+                      diffraction sum) or 'bpm' (2D split-step beam
+                      propagation through the slab, see core.bpm; its
+                      side walls are only accurate for a wall contrast
+                      of a few percent)
+        bpm_step    - BPM propagation step (micron); None chooses it from
+                      the index step at the slab walls (see StarCoupler.bpm)
+        bpm_sampling - BPM transverse samples per medium wavelength
+        coupling_window - (optional) half width, in output waveguide pitches,
+                      of the region around every focal spot where fpr2
+                      evaluates the field and ow the couplings (see focus
+                      and couplings); None evaluates the whole output
+                      aperture
+        tolerance   - (optional) relative integration tolerance of
+                      adaptive aperture sampling (see Aperture and
+                      core.autoset), replacing the uniform grid of points
+                      samples per window; None for uniform sampling
+        sweep       - wavelength sweep of spectrum: 'direct' (every
+                      wavelength through the simulation chain),
+                      'interpolate' (couplings interpolated over the band,
+                      see thermal; diffraction star coupler without
+                      coupling window) or 'auto' (interpolate sweeps of
+                      more than 500 wavelengths where it applies)
+        sweep_tolerance - relative interpolation tolerance of the
+                      interpolated sweep
+        profile     - (optional) Profiler activated by simulate and spectrum
+                      (True creates one); None for no profiling
+    """
+
+    def __init__(self, points=32, window=2.0, batch_size=128, diffraction="auto",
+                 fpr="diffraction", bpm_step=None, bpm_sampling=4, coupling_window=None,
+                 tolerance=None, sweep="auto", sweep_tolerance=1e-5, profile=None):
+        if points < 2:
+            raise ValueError(f"points={points} must be >= 2")
+        if window <= 0:
+            raise ValueError(f"window={window} must be > 0")
+        if batch_size < 1:
+            raise ValueError(f"batch_size={batch_size} must be >= 1")
+        if tolerance is not None and not 0 < tolerance < 1:
+            raise ValueError(f"tolerance={tolerance} must be in (0, 1)")
+        self.points = int(points)
+        self.window = float(window)
+        self.tolerance = None if tolerance is None else float(tolerance)
+        if diffraction not in ("auto", "direct", "fft"):
+            raise ValueError(f"diffraction={diffraction!r} must be 'auto', 'direct' or 'fft'")
+        self.batch_size = int(batch_size)
+        self.diffraction = diffraction
+        if fpr not in ("diffraction", "bpm"):
+            raise ValueError(f"fpr={fpr!r} must be 'diffraction' or 'bpm'")
+        if bpm_step is not None and bpm_step <= 0:
+            raise ValueError(f"bpm_step={bpm_step} must be > 0")
+        if bpm_sampling < 2:
+            raise ValueError(f"bpm_sampling={bpm_sampling} must be >= 2")
+        self.fpr = fpr
+        self.bpm_step = None if bpm_step is None else float(bpm_step)
+        self.bpm_sampling = float(bpm_sampling)
+        if coupling_window is not None and coupling_window <= 0:
+            raise ValueError(f"coupling_window={coupling_window} must be > 0")
+        self.coupling_window = None if coupling_window is None else float(coupling_window)
+        if sweep not in ("auto", "direct", "interpolate"):
+            raise ValueError(f"sweep={sweep!r} must be 'auto', 'direct' or 'interpolate'")
+        if not 0 < sweep_tolerance < 1:
+            raise ValueError(f"sweep_tolerance={sweep_tolerance} must be in (0, 1)")
+        self.sweep = sweep
+        self.sweep_tolerance = float(sweep_tolerance)
+        if profile is True:
+            profile = Profiler()
+        elif profile is False:
+            profile = None
+        if profile is not None and not isinstance(profile, Profiler):
+            raise TypeError(f"profile={profile!r} must be a Profiler, True or None")
+        self.profile = profile
+
+    def _state(self):
+        # batch_size 和 profile 不影响结果；容差、BPM 参数和耦合窗口只在使用时计入
+        state = ("SimulationOptions", self.points, self.window, self.diffraction)
+        if self.tolerance is not None:
+            state += ("tolerance", self.tolerance)
+        if self.fpr == "bpm":
+            state += (self.fpr, self.bpm_step, self.bpm_sampling)
+        if self.coupling_window is not None:
+            state += ("coupling_window", self.coupling_window)
+        # 缓存的结果总由仿真链逐批计算（见 ResultCache），只有强制插值时扫描方式才计入
+        if self.sweep == "interpolate":
+            state += ("sweep", self.sweep_tolerance)
+        return state
+
+    def hash(self):
+        """Stable hash of the options that affect the results (see awg.digest)."""
+        return digest(self)
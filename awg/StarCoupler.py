@@ -0,0 +1,144 @@
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+
+from .core.bpm import bpm, bpmgrid, propagator
+from .core.diffract import diffract, geometry
+from .core.trapzw import trapzw
+
+
+class StarCoupler:
+    """
+    Free propagation region (star coupler) between two sampled curves.
+
+    Holds the wavelength independent part of the diffraction kernel (the
+    distance and amplitude matrices between the source and target samples)
+    so that it is built once per geometry and reused by every wavelength
+    and every batch of a sweep. Use StarCoupler.get to share instances
+    between calls with identical geometry.
+
+    Attributes:
+        xi, zi - source sample coordinates
+        xf, zf - target sample coordinates
+        wi     - quadrature weights of the source samples
+    """
+
+    _cache = OrderedDict()
+    maxsize = 8
+    # BPM 侧壁相位屏可信的最大相对折射率差 |n - ncl| / n（见 core.bpm）
+    wall_contrast = 0.1
+
+    def __init__(self, xi, zi, xf, zf, wi=None, walls=None):
+        self.xi = np.asarray(xi, dtype=float).reshape(-1)
+        self.zi = np.broadcast_to(np.asarray(zi, dtype=float), self.xi.shape)
+        self.xf = np.asarray(xf, dtype=float).reshape(-1)
+        self.zf = np.broadcast_to(np.asarray(zf, dtype=float), self.xf.shape)
+        self.wi = None if wi is None else np.asarray(wi, dtype=float)
+        self.walls = None if walls is None else np.asarray(walls, dtype=float)
+        self._kernel = None
+        self._grids = {}
+        self._propagator = None
+
+    @classmethod
+    def get(cls, xi, zi, xf, zf, wi=None, walls=None):
+        """Shared instance for this geometry (LRU cache of maxsize entries)."""
+        key = tuple(
+            None if a is None else np.ascontiguousarray(a, dtype=float).tobytes()
+            for a in (xi, zi, xf, zf, wi, walls)
+        )
+        coupler = cls._cache.pop(key, None)
+        if coupler is None:
+            coupler = cls(xi, zi, xf, zf, wi, walls)
+        cls._cache[key] = coupler
+        while len(cls._cache) > cls.maxsize:
+            cls._cache.popitem(last=False)
+        return coupler
+
+    @property
+    def kernel(self):
+        """(r, g) matrices, built on first use."""
+        if self._kernel is None:
+            self._kernel = geometry(self.xi, self.xf, self.zf, self.zi, self.wi)
+        return self._kernel
+
+    def diffract(self, lmbda, ui, method="auto"):
+        """
+        Propagate ui (..., len(xi)) at medium wavelength(s) lmbda to the
+        target samples. The direct sum only runs over the span of source
+        samples where ui is non-zero (a port window of an aperture grid,
+        see iw), through a view of the kernel.
+        """
+        if method == "auto" or method == "direct":
+            # 平面网格交给 diffract 判断是否使用 FFT，否则复用几何核
+            if method == "auto" and self._planar():
+                return diffract(lmbda, ui, self.xi, self.xf, self.zf, self.zi, self.wi)
+            ui = np.asarray(ui)
+            live = np.flatnonzero(np.any(ui.reshape(-1, ui.shape[-1]) != 0, axis=0))
+            span = slice(live[0], live[-1] + 1) if live.size else slice(0, 1)
+            r, g = self.kernel
+            return diffract(lmbda, ui[..., span], self.xi[span], self.xf, self.zf, self.zi[span],
+                            method="direct", kernel=(r[:, span], g[:, span]))
+        return diffract(lmbda, ui, self.xi, self.xf, self.zf, self.zi, self.wi, method=method)
+
+    def bpm(self, lmbda, n, ncl, ui, step=None, sampling=4):
+        """
+        Propagate ui (..., len(xi)) at vacuum wavelength(s) lmbda through
+        the slab of index n (cladding index ncl outside the walls) to the
+        target samples with the split-step BPM. The transverse grid step
+        is the shortest medium wavelength over sampling. Without a given
+        step, the propagation step keeps the phase screen at the walls,
+        k0 |n - ncl| dz, below 1 rad (at most 1 micron; the slab itself is
+        propagated exactly at any step). Both are rounded down to 1/64
+        micron so that the batches of a sweep share one grid. Leading
+        axes of ui beyond those of lmbda are propagated one after another.
+
+        The walls are a thin phase screen (see core.bpm), accurate for a
+        weak wall contrast only; a RuntimeWarning is emitted when
+        |n - ncl| / n exceeds wall_contrast.
+        """
+        lmbda = np.asarray(lmbda, dtype=float)
+        ui = np.asarray(ui)
+        lead = ui.shape[:max(ui.ndim - 1 - lmbda.ndim, 0)]
+        if lead:
+            # 多个源场逐个传播（网格与传播子复用）
+            uf = [self.bpm(lmbda, n, ncl, u, step, sampling) for u in ui.reshape((-1,) + ui.shape[len(lead):])]
+            return np.reshape(uf, lead + lmbda.shape + (self.xf.size,))
+        n = np.broadcast_to(np.asarray(n, dtype=float), lmbda.shape)
+        dx = np.floor(64 * np.min(lmbda / n) / sampling) / 64
+        if dx <= 0:
+            raise ValueError(f"sampling={sampling} is too fine for the wavelength")
+        if self.walls is not None:
+            contrast = np.max(np.abs(n - np.broadcast_to(ncl, lmbda.shape)) / n)
+            if contrast > self.wall_contrast:
+                warnings.warn(
+                    f"BPM wall contrast |n - ncl| / n = {contrast:.2f} exceeds {self.wall_contrast:g}: "
+                    f"light reaching the slab walls is not modelled accurately (see core.bpm)",
+                    RuntimeWarning
+                )
+        if step is None:
+            step = 1.0
+            if self.walls is not None:
+                contrast = np.max(2 * np.pi / lmbda * np.abs(n - np.broadcast_to(ncl, lmbda.shape)))
+                step = max(np.floor(64 * min(step, 1 / contrast)) / 64, 1 / 64)
+
+        key = (float(dx), float(step))
+        if key not in self._grids:
+            self._grids[key] = bpmgrid(self.xi, self.zi, self.xf, self.zf, dx, step, self.walls)
+        grid = self._grids[key]
+
+        k0 = 2 * np.pi / lmbda.reshape(-1)
+        n = n.reshape(-1)
+        # 同一组波长的传播子在相邻调用之间复用（如 Monte Carlo）
+        pkey = key + (k0.tobytes(), n.tobytes())
+        if self._propagator is None or self._propagator[0] != pkey:
+            self._propagator = (pkey, propagator(k0, n, grid))
+
+        wi = trapzw(self.xi) if self.wi is None else self.wi
+        ui = np.broadcast_to(ui, lmbda.shape + (self.xi.size,)).reshape(k0.size, -1)
+        ncl = None if self.walls is None else np.broadcast_to(ncl, lmbda.shape).reshape(-1)
+        uf = bpm(k0, n, ncl, ui, wi, grid, self._propagator[1])
+        return uf.reshape(lmbda.shape + (self.xf.size,))
+
+    def _planar(self):
+        return np.ptp(self.zi) == 0 and np.ptp(self.zf) == 0
@@ -0,0 +1,230 @@
+import copy
+import os
+
+import numpy as np
+
+from .SimulationOptions import SimulationOptions
+from .core.lhs import lhs
+from .parallel import parallel
+from .spectrum import spectrum
+
+
+class Surrogate:
+    """
+    Reduced-order model of the channel spectra of an AWG over a box of
+    design parameters.
+
+    Surrogate.train simulates the spectra (in dB, above floor) of designs
+    drawn by Latin hypercube sampling (see core.lhs), keeps the leading
+    principal components of the spectrum matrix and interpolates their
+    coefficients over the normalized parameters with a cubic radial basis
+    function (r^3 plus a linear polynomial, exact at the samples). A query
+    then costs one distance vector, two small matrix products and the
+    conversion to linear transmission, a few tens of microseconds, instead
+    of a simulation.
+
+    Queries outside the box extrapolate and are not checked; the
+    validation error is measured on designs held out of the training.
+
+    Attributes:
+        names      - design parameters (AWG attributes)
+        low, high  - bounds of the design box, shape (d,)
+        default    - model values of the parameters, used for the ones a
+                     query leaves out, shape (d,)
+        wavelength - wavelengths of the spectra, shape (points,)
+        floor      - lowest modelled transmission (dB)
+        mean       - mean spectrum (dB), shape (points * No,)
+        components - principal components, shape (k, points * No)
+        X          - normalized training designs, shape (n, d)
+        weights    - radial basis weights, shape (n, k)
+        linear     - polynomial coefficients, shape (d + 1, k)
+        validation - dict of held-out errors: 'rms' and 'max' (dB, above
+                     the floor) and 'linear' (largest transmission error)
+    """
+
+    def __init__(self, names, low, high, default, wavelength, floor, mean, components, X, weights,
+                 linear, validation=None):
+        self.names = tuple(names)
+        self.low = np.asarray(low, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.default = np.asarray(default, dtype=float)
+        self.wavelength = np.asarray(wavelength, dtype=float)
+        self.floor = float(floor)
+        self.mean = np.asarray(mean, dtype=float)
+        self.components = np.asarray(components, dtype=float)
+        self.X = np.asarray(X, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.linear = np.asarray(linear, dtype=float)
+        self.validation = validation
+        self._shape = (self.wavelength.size, self.mean.size // self.wavelength.size)
+
+    def __repr__(self):
+        return (f"Surrogate({', '.join(self.names)}: {self.X.shape[0]} designs, "
+                f"{self.components.shape[0]} components)")
+
+    def __call__(self, **params):
+        """Power transmission of one design, shape (points, No)."""
+        x = self.default.copy()
+        for name, value in params.items():
+            if name not in self.names:
+                raise TypeError(f"Surrogate got an unexpected parameter {name!r}")
+            x[self.names.index(name)] = value
+        z = (x - self.low) / (self.high - self.low)
+        r = np.sqrt(np.sum((self.X - z) ** 2, axis=1))
+        c = r ** 3 @ self.weights + self.linear[0] + z @ self.linear[1:]
+        return 10 ** ((self.mean + c @ self.components).reshape(self._shape) / 10)
+
+    def predict(self, X):
+        """Power transmission of the designs X (..., d), shape (..., points, No)."""
+        X = np.asarray(X, dtype=float)
+        z = ((X - self.low) / (self.high - self.low)).reshape(-1, len(self.names))
+        r = np.sqrt(np.sum((z[:, np.newaxis] - self.X) ** 2, axis=-1))
+        c = r ** 3 @ self.weights + self.linear[0] + z @ self.linear[1:]
+        dB = self.mean + c @ self.components
+        return 10 ** (dB.reshape(X.shape[:-1] + self._shape) / 10)
+
+    @classmethod
+    def train(cls, model, space, samples=64, validation=None, components=None, lmbda=None,
+              bandwidth=None, points=250, _input=0, floor=-60.0, seed=None, workers=None,
+              options=None, cache=None, callback=None):
+        """
+        Surrogate of model over the design box space.
+
+        INPUTS:
+            model      - AWG model; the parameters outside space keep its
+                         values (dl follows the design unless the model
+                         fixes it)
+            space      - dict {name: (low, high)} of AWG attributes
+                         (integer ones, such as N, are rounded, and
+                         the surrogate is trained on the rounded values)
+            samples    - number of training designs (default 64)
+            validation - number of held-out designs, default samples / 4
+            components - number of principal components, default the
+                         fewest that keep all but 1e-6 of the variance
+            lmbda, bandwidth, points, _input
+                       - wavelength sweep (fixed for every design, set by
+                         the model), as in spectrum
+            floor      - lowest modelled transmission (dB, default -60)
+            seed       - (optional) seed of the Latin hypercube samples
+            workers    - (optional) number of processes, default
+                         os.cpu_count(); 1 simulates in this process
+            options    - (optional) SimulationOptions
+            cache      - (optional) ResultCache shared by the processes, so
+                         that retraining reuses the simulated spectra
+            callback   - (optional) callback(done, total) after every
+                         simulated chunk of designs
+
+        OUTPUT:
+            S - Surrogate
+        """
+        options = options or SimulationOptions()
+        names = tuple(space)
+        if not names:
+            raise ValueError("space must name at least one parameter")
+        for name in names:
+            if name.startswith("_") or not hasattr(model, name):
+                raise TypeError(f"AWG has no parameter {name!r}")
+        low, high = np.array([space[name] for name in names], dtype=float).T
+        if np.any(high <= low):
+            raise ValueError("every range of space must have low < high")
+        validation = max(samples // 4, 1) if validation is None else int(validation)
+        if samples < len(names) + 2 or validation < 0:
+            raise ValueError(f"samples={samples} must be >= {len(names) + 2} and validation >= 0")
+        workers = (os.cpu_count() or 1) if workers is None else int(workers)
+        if workers < 1:
+            raise ValueError(f"workers={workers} must be >= 1")
+
+        wavelength = spectrum(model, lmbda, bandwidth, points, _input, options, cache)["wavelength"]
+        rng = np.random.default_rng(seed)
+        # 训练集与验证集各自为拉丁超立方采样
+        Z = np.concatenate([lhs(samples, len(names), rng), lhs(validation, len(names), rng)]
+                           if validation else [lhs(samples, len(names), rng)])
+        # 整数参数（如 N）的坐标移到仿真实际使用的取整值上，插值节点与仿真的设计一致
+        integer = np.array([isinstance(getattr(model, name), int) for name in names])
+        values = low + Z * (high - low)
+        values[:, integer] = np.round(values[:, integer])
+        Z[:, integer] = (values[:, integer] - low[integer]) / (high - low)[integer]
+        state = (model, names, values, wavelength, _input, options, cache)
+        T = _simulate(state, workers, callback)
+        dB = 10 * np.log10(np.maximum(T, 10 ** (floor / 10))).reshape(Z.shape[0], -1)
+
+        # 主成分
+        # 取整后重合的训练设计只保留一个，否则插值矩阵奇异
+        _, first = np.unique(Z[:samples], axis=0, return_index=True)
+        first = np.sort(first)
+        train, Y = Z[first], dB[first]
+        mean = Y.mean(axis=0)
+        _, s, V = np.linalg.svd(Y - mean, full_matrices=False)
+        if components is None:
+            kept = 1 - np.cumsum(s ** 2) / max(np.sum(s ** 2), np.finfo(float).tiny)
+            components = int(np.argmax(kept <= 1e-6)) + 1 if np.any(kept <= 1e-6) else s.size
+        V = V[:components]
+
+        # 三次径向基插值（带线性项）
+        n, d = train.shape
+        P = np.concatenate([np.ones((n, 1)), train], axis=1)
+        A = np.zeros((n + d + 1, n + d + 1))
+        A[:n, :n] = np.sqrt(np.sum((train[:, np.newaxis] - train) ** 2, axis=-1)) ** 3
+        A[:n, n:], A[n:, :n] = P, P.T
+        b = np.zeros((n + d + 1, components))
+        b[:n] = (Y - mean) @ V.T
+        coef = np.linalg.solve(A, b)
+
+        default = np.array([float(getattr(model, name)) for name in names])
+        surrogate = cls(names, low, high, default, wavelength, floor, mean, V, train,
+                        coef[:n], coef[n:])
+        if validation:
+            # 留出的验证设计上的误差
+            predicted = surrogate.predict(values[samples:]).reshape(validation, -1)
+            e = 10 * np.log10(np.maximum(predicted, 10 ** (floor / 10))) - dB[samples:]
+            linear = np.abs(predicted - T[samples:].reshape(validation, -1))
+            surrogate.validation = {"rms": float(np.sqrt(np.mean(e ** 2))), "max": float(np.max(np.abs(e))),
+                                    "linear": float(np.max(linear))}
+        return surrogate
+
+    def save(self, path):
+        """Write the surrogate to a NumPy .npz file."""
+        v = self.validation or {}
+        np.savez(path, names=np.array(self.names), low=self.low, high=self.high, default=self.default,
+                 wavelength=self.wavelength, floor=self.floor, mean=self.mean,
+                 components=self.components, X=self.X, weights=self.weights, linear=self.linear,
+                 validation=np.array([v.get(k, np.nan) for k in ("rms", "max", "linear")]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            v = data["validation"]
+            validation = None if np.all(np.isnan(v)) else dict(zip(("rms", "max", "linear"), map(float, v)))
+            return cls([str(n) for n in data["names"]], data["low"], data["high"], data["default"],
+                       data["wavelength"], float(data["floor"]), data["mean"], data["components"],
+                       data["X"], data["weights"], data["linear"], validation)
+
+
+def _simulate(state, workers, callback):
+    """Spectra of all designs of state, shape (designs, points, No), on workers processes."""
+    designs = state[2].shape[0]
+    T = np.empty((designs, state[3].size, state[0].No))
+    done = 0
+
+    def store(rows, chunk):
+        nonlocal done
+        T[chunk.start:chunk.stop] = rows
+        done += len(chunk)
+        if callback is not None:
+            callback(done, designs)
+
+    parallel(_run, state, designs, workers, store)
+    return T
+
+
+def _run(state, chunk):
+    """Spectra of the designs in chunk, shape (len(chunk), points, No)."""
+    model, names, values, wavelength, _input, options, cache = state
+    T = np.empty((len(chunk), wavelength.size, model.No))
+    for t, i in zip(T, chunk):
+        design = copy.copy(model)
+        for name, value in zip(names, values[i]):
+            # 整数参数（如 N）取最近的整数
+            setattr(design, name, round(value) if isinstance(getattr(model, name), int) else value)
+        t[:] = spectrum(design, wavelength, _input=_input, options=options, cache=cache)["transmission"]
+    return T
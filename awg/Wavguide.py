@@ -0,0 +1,172 @@
+import copy
+from collections import OrderedDict
+
+import numpy as np
+
+from .IndexCache import IndexCache, IndexTable
+from .core.fdmode import fdmode
+from .core.slabindex import slabindex
+from .core.slabmode import slabmode
+from .core.wgindex import wgindex
+
+
+class Waveguide:
+    """
+    Rib / strip waveguide described by its materials and cross-section.
+
+    Materials may be given as a function of wavelength (see awg.material)
+    or as a constant refractive index. A waveguide of infinite width
+    (w = np.inf) is a planar slab, as used in the free propagation regions.
+
+    Effective indices are memoized in the class-wide IndexCache
+    (Waveguide.cache), keyed by materials, cross-section, polarization,
+    mode order and wavelength, so repeated sweeps never re-solve a slab.
+
+    A channel waveguide is solved by the effective index method (solver
+    'eim', see wgindex and wgmode) or by the semivectorial finite
+    difference solver of the cross-section (solver 'fd', see fdmode),
+    which resolves thick, high-contrast cores that the effective index
+    method misses, at the cost of one sparse eigenproblem per wavelength
+    (warm-started over a sweep). Its lateral profile is interpolated from
+    a grid of spacing min(w, h) / fd_points reaching max(w, 1) beyond the
+    core on either side, and is zero outside. Slabs (w = np.inf) are
+    always solved exactly.
+
+    Attributes:
+        clad         - upper cladding material
+        core         - core material
+        subs         - substrate material
+        w            - core width (micron)
+        h            - core height (micron)
+        t            - slab thickness (micron), 0 for a strip waveguide
+        polarization - 'TE' or 'TM'
+        solver       - channel mode solver: 'eim' or 'fd'
+    """
+
+    cache = IndexCache()
+    fd_points = 16
+    # 有限差分横向剖面（按波导和波长缓存）
+    _profiles = OrderedDict()
+    maxsize = 32
+
+    def __init__(self, clad, core, subs, w=0.45, h=0.22, t=0.0, polarization="TE", solver="eim"):
+        self.clad = clad
+        self.core = core
+        self.subs = subs
+        self.w = w
+        self.h = h
+        self.t = t
+        self.polarization = polarization
+        self.solver = solver
+
+        if solver not in ("eim", "fd"):
+            raise ValueError(f"solver={solver!r} must be 'eim' or 'fd'")
+
+    @property
+    def fd(self):
+        """True if the modes are solved by finite differences (channel waveguides only)."""
+        return self.solver == "fd" and np.isfinite(self.w)
+
+    def key(self, mode=0):
+        """Hashable identity of one guided mode of this waveguide."""
+        materials = tuple(m if callable(m) else float(m) for m in (self.clad, self.core, self.subs))
+        key = materials + (float(self.w), float(self.h), float(self.t),
+                           self.polarization.upper(), int(mode))
+        return key + ("fd",) if self.fd else key
+
+    def replace(self, **kwargs):
+        """Copy of the waveguide with some attributes changed."""
+        wg = copy.copy(self)
+        for key, value in kwargs.items():
+            if not hasattr(wg, key):
+                raise TypeError(f"Waveguide has no attribute {key!r}")
+            setattr(wg, key, value)
+        return wg
+
+    def materials(self, lmbda):
+        """Refractive indices (na, nc, ns) of cladding, core and substrate."""
+        return tuple(
+            np.asarray(m(lmbda) if callable(m) else np.broadcast_to(m, np.shape(lmbda)), dtype=float)
+            for m in (self.clad, self.core, self.subs)
+        )
+
+    def index(self, lmbda, mode=0):
+        """Effective index of the given mode order (cached)."""
+        return self.cache.lookup(self.key(mode), lmbda, lambda l: self._solve(l, mode))
+
+    def _solve(self, lmbda, mode):
+        if self.fd:
+            return fdmode(lmbda, self.w, self.h, self.t, self.clad, self.core, self.subs,
+                          self._grid(), mode=mode, polarization=self.polarization)[2]
+        na, nc, ns = self.materials(lmbda)
+        if np.isinf(self.w):
+            return slabindex(lmbda, self.h, na, nc, ns, mode, self.polarization)
+        return wgindex(lmbda, self.w, self.h, self.t, na, nc, ns, mode, self.polarization)
+
+    def groupindex(self, lmbda, mode=0, dl=1e-4):
+        """Group index ng = n - lambda * dn/dlambda (central difference)."""
+        lmbda = np.asarray(lmbda, dtype=float)
+        n = self.index(lmbda, mode)
+        dn = (self.index(lmbda + dl, mode) - self.index(lmbda - dl, mode)) / (2 * dl)
+        return n - lmbda * dn
+
+    def table(self, lmbda, w=None, mode=0):
+        """Spline interpolated index table over lmbda (and widths w), see IndexTable."""
+        return IndexTable(self, lmbda, w, mode)
+
+    def mode(self, lmbda, x, mode=0, cells=False):
+        """
+        Lateral mode profile (E, H, neff) sampled at x, or, with the
+        effective index method and cells, averaged over the cells of the
+        grid x (see slabmode).
+
+        For a channel waveguide the lateral slab of the effective index
+        method is built from the cached vertical slab indices of the core
+        and etched regions (see wgmode); with the 'fd' solver the lateral
+        profile of the cross-section mode (see fdmode) is interpolated at
+        x.
+        """
+        if self.fd:
+            xc, E, H, neff = self._profile(lmbda, mode)
+            return _resample(xc, E, x), _resample(xc, H, x), neff
+
+        na, nc, ns = self.materials(lmbda)
+        if np.isinf(self.w):
+            return slabmode(lmbda, self.h, na, nc, ns, x, mode, self.polarization,
+                            neff=self.index(lmbda, mode), cells=cells)
+
+        slab = self.replace(w=np.inf)
+        n1 = slab.index(lmbda)
+        n2 = slab.replace(h=self.t).index(lmbda) if self.t > 0 else na
+        lateral = "TM" if self.polarization.upper() == "TE" else "TE"
+        return slabmode(lmbda, self.w, n2, n1, n2, x, mode, lateral, neff=self.index(lmbda, mode), cells=cells)
+
+    def _profile(self, lmbda, mode):
+        """Finite-difference lateral profiles on their own grid (LRU cache of maxsize entries)."""
+        lmbda = np.asarray(lmbda, dtype=float)
+        key = (self.key(mode), lmbda.shape, lmbda.tobytes())
+        if key in self._profiles:
+            self._profiles.move_to_end(key)
+            return self._profiles[key]
+        xc = self._grid()
+        E, H, neff = fdmode(lmbda, self.w, self.h, self.t, self.clad, self.core, self.subs, xc,
+                            mode=mode, polarization=self.polarization)
+        self._profiles[key] = (xc, E, H, neff)
+        while len(self._profiles) > self.maxsize:
+            self._profiles.popitem(last=False)
+        return self._profiles[key]
+
+    def _grid(self):
+        """Lateral grid of the finite-difference solver, centered on the core."""
+        d = min(self.w, self.h) / self.fd_points
+        half = self.w / 2 + max(self.w, 1.0)
+        return d * np.arange(-np.ceil(half / d), np.ceil(half / d) + 1)
+
+
+def _resample(xc, E, x):
+    """Linear interpolation of profiles E (..., len(xc)) on the uniform grid xc at x, 0 outside."""
+    x = np.asarray(x, dtype=float)
+    i = np.clip(np.searchsorted(xc, x) - 1, 0, xc.size - 2)
+    f = (x - xc[i]) / (xc[1] - xc[0])
+    inside = (x >= xc[0]) & (x <= xc[-1])
+    return np.where(inside, E[..., i] * (1 - f) + E[..., i + 1] * f, 0.0)
@@ -1,3 +1,34 @@
 '''
     awg is a package for the design and simulation of Arrayed Waveguide Gratings.
 '''
+
+from .AWG import AWG
+from .SimulationOptions import SimulationOptions
+from .Field import Field
+from .Wavguide import Waveguide
+from .IndexCache import IndexCache, IndexTable
+from .Aperture import Aperture
+from .StarCoupler import StarCoupler
+from .ResultCache import ResultCache
+from .Profiler import Profiler
+from .PoleResidue import PoleResidue
+from .SMatrix import SMatrix
+from .Surrogate import Surrogate
+from .iw import iw
+from .fpr1 import fpr1
+from .aw import aw
+from .focus import focus
+from .fpr2 import fpr2
+from .ow import ow
+from .thermal import thermal
+from .simulate import simulate
+from .couplings import couplings
+from .spectrum import spectrum
+from .sparameters import sparameters
+from .analyse import analyse
+from .montecarlo import montecarlo
+from .dispersion import dispersion
+from .predict import predict
+from .digest import digest
+from .jacobian import jacobian
+from .optimize import optimize
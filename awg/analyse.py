@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def analyse(results):
+    """
+    Spectrum figures of merit
+
+    DESCRIPTION:
+        Extracts the usual AWG figures of merit from a transmission
+        spectrum, channel by channel. The passband of a channel is the
+        contiguous band around its peak where the transmission stays above
+        half of the peak (3 dB); band edges are linearly interpolated
+        between samples. Crosstalk is the highest transmission of the other
+        channels inside that passband, relative to the peak.
+
+    INPUTS:
+        results - spectrum results, dict with 'wavelength' (L,) and
+                  'transmission' (L, No) (see spectrum)
+
+    OUTPUT:
+        metrics - dict with, per output channel (shape (No,)):
+                  'center'                 : passband center wavelength
+                  'insertion_loss'         : -10 log10(peak transmission) (dB)
+                  'bandwidth_3db'          : 3 dB passband width (micron)
+                  'bandwidth_10db'         : 10 dB passband width (micron)
+                  'adjacent_crosstalk'     : from channels k-1, k+1 (dB)
+                  'nonadjacent_crosstalk'  : from channels |j-k| > 1 (dB)
+                  and the scalar 'nonuniformity' (dB), the spread of the
+                  insertion loss over the channels. Band edges that fall
+                  outside of the sweep are reported as NaN.
+    """
+    lmbda = np.asarray(results["wavelength"], dtype=float).reshape(-1)
+    T = np.asarray(results["transmission"], dtype=float)
+    if T.ndim != 2 or T.shape[0] != lmbda.size:
+        raise ValueError("transmission must have shape (len(wavelength), No)")
+    if lmbda.size < 2:
+        raise ValueError("at least two wavelength samples are required")
+    No = T.shape[1]
+
+    peak = T.max(axis=0)
+    center = np.empty(No)
+    bw3 = np.empty(No)
+    bw10 = np.empty(No)
+    xt_adj = np.full(No, -np.inf)
+    xt_non = np.full(No, -np.inf)
+
+    channels = np.arange(No)
+    with np.errstate(divide="ignore"):
+        for k in range(No):
+            p = int(np.argmax(T[:, k]))
+            l3, r3 = _edges(lmbda, T[:, k], p, peak[k] / 2)
+            l10, r10 = _edges(lmbda, T[:, k], p, peak[k] / 10)
+            center[k] = (l3 + r3) / 2
+            bw3[k] = r3 - l3
+            bw10[k] = r10 - l10
+
+            # 通带内其他通道的最大串扰（边缘未解析时取峰值点）
+            band = (lmbda >= np.nan_to_num(l3, nan=lmbda[p])) & (lmbda <= np.nan_to_num(r3, nan=lmbda[p]))
+            band[p] = True
+            leak = T[band].max(axis=0) / peak[k]
+            near = np.abs(channels - k) == 1
+            far = np.abs(channels - k) > 1
+            if near.any():
+                xt_adj[k] = 10 * np.log10(leak[near].max())
+            if far.any():
+                xt_non[k] = 10 * np.log10(leak[far].max())
+
+        il = -10 * np.log10(peak)
+
+    return {
+        "center": center,
+        "insertion_loss": il,
+        "bandwidth_3db": bw3,
+        "bandwidth_10db": bw10,
+        "adjacent_crosstalk": xt_adj,
+        "nonadjacent_crosstalk": xt_non,
+        "nonuniformity": float(il.max() - il.min()),
+    }
+
+
+def _edges(x, y, p, level):
+    """Interpolated crossings of y with level on either side of the peak index p."""
+    below = y < level
+    left = np.flatnonzero(below[:p])
+    right = np.flatnonzero(below[p:])
+
+    if left.size:
+        i = left[-1]
+        lo = x[i] + (level - y[i]) * (x[i + 1] - x[i]) / (y[i + 1] - y[i])
+    else:
+        lo = np.nan
+    if right.size:
+        i = p + right[0]
+        hi = x[i - 1] + (level - y[i - 1]) * (x[i] - x[i - 1]) / (y[i] - y[i - 1])
+    else:
+        hi = np.nan
+    return lo, hi
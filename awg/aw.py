@@ -0,0 +1,77 @@
+import numpy as np
+
+from .Field import Field
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .core.trapzw import trapzw
+
+
+@profiled("aw")
+def aw(model, lmbda, F0, options=None, phase_error=None, loss=None):
+    """
+    Arrayed waveguides
+
+    DESCRIPTION:
+        Couples the field on the input grating circle into the array
+        waveguides, applies the propagation phase and loss of every arm and
+        re-radiates the arm modes on the output grating circle.
+
+        Each arm only multiplies its mode by a complex amplitude, so the
+        whole array is one (wavelength x arm) matrix
+            exp(-i (beta L + phase_error)) 10^(-loss / 20)
+        applied to the coupling coefficients, and the mode profile is
+        solved once for all arms (and cached, see Aperture.mode). The
+        per-arm model.phase_error and model.arm_loss apply, plus the
+        phase_error and loss given here, so phase-error or trimming studies
+        can rerun this stage on a stored fpr1 field with new vectors only.
+
+    INPUTS:
+        model       - AWG model
+        lmbda       - wavelength(s) (micron), scalar or vector
+        F0          - Field on the input grating circle (see fpr1)
+        options     - (optional) SimulationOptions
+        phase_error - (optional) additional per-arm phase errors (rad),
+                      shape (N,)
+        loss        - (optional) additional per-arm loss (dB), shape (N,)
+
+    OUTPUT:
+        F - Field on the output grating circle
+    """
+    options = options or SimulationOptions()
+    lmbda = np.asarray(lmbda, dtype=float)
+
+    aperture = model.array_aperture()
+    s, idx = aperture.grid(options.points, options.window, options.tolerance)
+    if not np.allclose(s, F0.x):
+        raise ValueError("F0 is not sampled on the array aperture grid")
+    xl, M = aperture.mode(lmbda, options.points, options.window, options.tolerance)
+    # 各阵列波导耦合系数 (..., N)；自适应网格用梯形权重
+    if options.tolerance is None:
+        c = np.einsum("...kn,...n->...k", F0.E[..., idx], np.conj(M)) * (xl[1] - xl[0])
+    else:
+        c = np.einsum("...kn,...n->...k", F0.E[..., idx], np.conj(M) * trapzw(xl))
+
+    # 阵列波导相位
+    beta = 2 * np.pi * model.array_waveguide().index(lmbda) / lmbda
+    phi = np.asarray(beta)[..., np.newaxis] * model.arm_lengths()
+    for error in (model.phase_error, phase_error):
+        if error is not None:
+            # 制造误差或修调引入的各臂附加相位
+            phi = phi + _arms(model, error, "phase_error")
+    a = c * np.exp(-1j * phi)
+    for dB in (model.arm_loss, loss):
+        if dB is not None:
+            a = a * 10 ** (-_arms(model, dB, "loss") / 20)
+
+    E = np.zeros(np.shape(F0.E), dtype=complex)
+    for k in range(aperture.count):
+        E[..., idx[k]] += a[..., k, np.newaxis] * M
+    return Field(s, E, lmbda=lmbda)
+
+
+def _arms(model, values, name):
+    """Per-arm vector as a float array of shape (N,)."""
+    values = np.asarray(values, dtype=float)
+    if values.shape != (model.N,):
+        raise ValueError(f"{name} must have shape ({model.N},), got {values.shape}")
+    return values
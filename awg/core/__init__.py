@@ -0,0 +1,23 @@
+"""
+core 是 AWG 仿真的核心数值函数库
+"""
+
+from .trapzw import trapzw
+from .overlap import overlap, overlaps
+from .fpower import fpower
+from .pnorm import pnorm
+from .slabindex import slabindex
+from .slabgroup import slabgroup
+from .slabmode import slabmode
+from .wgindex import wgindex
+from .wgmode import wgmode
+from .diffract import diffract, geometry
+from .bpm import bpm, bpmgrid
+from .autoset import autoset
+from .gmode import gmode
+from .rectf import rectf
+from .sincf import sincf
+from .stepf import stepf
+from .vectfit import vectfit
+from .lhs import lhs
+from .fdmode import fdmode
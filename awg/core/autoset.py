@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def autoset(f, a, b, tol=1e-3, n=4, depth=16):
+    """
+    Adaptive sampling points
+
+    DESCRIPTION:
+        Places samples on [a, b] so that the estimated error of the
+        trapezoidal integral of f over them stays below tol max|f| (b - a).
+        On every interval of width h the trapezoidal rule differs from
+        Simpson's rule by
+
+            e = 2 h / 3 |f(mid) - (f(left) + f(right)) / 2|
+
+        which estimates its error. Starting from n equal intervals, the
+        intervals whose e exceeds an equal share of the tolerance are
+        halved, until the estimated errors add up to less than the
+        tolerance or depth halvings have been made. Samples therefore
+        gather where the field bends (the core and its edges) and thin out
+        where it is flat or small (the evanescent tails), and kinks or
+        steps of the field are only refined as far as they matter for the
+        integral.
+
+        The sum of the e is an estimate, not a bound. Where f is smooth on
+        the scale of the intervals, e approaches the error of each interval
+        (h^3 |f''| / 12), so the sum bounds the error of the integral from
+        above as the samples are refined. It can miss a feature narrower
+        than an initial interval, or one that happens to leave f(mid) on
+        the chord, and a step of f is resolved only to the interval that
+        contains it. On the aperture fields (see Aperture, which samples
+        the mode E and H of the whole row) the true error stays within the
+        estimate: tests/test_autoset.py checks that the integral of the
+        sampled row is within tol and the overlaps of the unit-power modes
+        with plane waves across the numerical aperture within 2 tol, for
+        tol from 1e-2 to 1e-4, and the transmissions of a simulation come
+        out within about 1.5 tol (benchmarks/adaptive_sampling.py).
+
+        f is called once per halving level with a vector of coordinates and
+        may return an array of shape (..., len(x)) (e.g. fields at several
+        wavelengths); the deviation is taken over all its leading entries.
+
+    INPUTS:
+        f     - function of a coordinate vector
+        a, b  - interval
+        tol   - (optional) relative tolerance
+        n     - (optional) initial number of intervals
+        depth - (optional) maximum number of halvings
+
+    OUTPUT:
+        x - sorted sample coordinates, including a and b
+    """
+    if tol <= 0:
+        raise ValueError(f"tol={tol} must be > 0")
+    if n < 1:
+        raise ValueError(f"n={n} must be >= 1")
+
+    def evaluate(x):
+        return np.asarray(f(x)).reshape(-1, x.size)
+
+    x = np.linspace(a, b, n + 1)
+    y = evaluate(x)
+    scale = np.max(np.abs(y))
+    if scale == 0:
+        return x
+    target = tol * scale * (b - a)
+
+    left, right = x[:-1], x[1:]
+    yl, yr = y[:, :-1], y[:, 1:]
+    ym = evaluate((left + right) / 2)
+    for _ in range(depth):
+        # 梯形公式与 Simpson 公式之差作为各区间的误差估计
+        e = 2 * (right - left) / 3 * np.max(np.abs(ym - (yl + yr) / 2), axis=0)
+        if np.sum(e) <= target:
+            break
+        split = e > target / e.size
+        mid = (left + right) / 2
+        keep = ~split
+        left = np.concatenate([left[keep], left[split], mid[split]])
+        right = np.concatenate([right[keep], mid[split], right[split]])
+        yl = np.concatenate([yl[:, keep], yl[:, split], ym[:, split]], axis=1)
+        yr = np.concatenate([yr[:, keep], ym[:, split], yr[:, split]], axis=1)
+        new = evaluate((left[keep.sum():] + right[keep.sum():]) / 2)
+        ym = np.concatenate([ym[:, keep], new], axis=1)
+    return np.append(np.sort(left), b)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from .trapzw import trapzw
+
+
+def fpower(x, E, H=None):
+    """
+    Field power (1D)
+
+    DESCRIPTION:
+        Computes the power carried by a sampled field by trapezoidal
+        integration along its last axis. Leading axes (e.g. wavelength)
+        are treated as a batch.
+
+    INPUTS:
+        x - coordinate vector
+        E - electric field, shape (..., len(x))
+        H - (optional) magnetic field, same shape as E
+
+    OUTPUT:
+        P - power, shape E.shape[:-1]
+    """
+    E = np.asarray(E)
+
+    if H is None:
+        y = np.abs(E) ** 2
+    else:
+        y = np.real(E * np.conj(np.asarray(H)))
+
+    # 梯形积分（不依赖 np.trapz，numpy 2.4 中已移除）
+    return y @ trapzw(x)
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .slabindex import slabindex
+
+
+def gmode(lmbda, w, h, t, na, nc, ns, x, polarization="TE"):
+    """
+    Gaussian approximation of the fundamental lateral mode
+
+    DESCRIPTION:
+        Gaussian field exp(-(x / w0)^2) of the lateral slab of the effective
+        index method (see wgmode), with Marcuse's spot size
+
+            w0 = w / 2 (0.65 + 1.619 / V^1.5 + 2.879 / V^6)
+            V  = pi w / lmbda sqrt(n1^2 - n2^2)
+
+        where n1 and n2 are the vertical slab indices of the core and
+        etched regions. A cheap, smooth stand-in for wgmode, e.g. to size
+        field windows or as a custom input field (see iw). The waveguide
+        is centered on x = 0.
+
+    INPUTS:
+        lmbda        - wavelength (micron)
+        w            - waveguide width (micron)
+        h            - core height (micron)
+        t            - slab thickness (micron), 0 for a strip waveguide
+        na           - cover (upper cladding) index
+        nc           - core index
+        ns           - substrate (lower cladding) index
+        x            - coordinate vector (micron)
+        polarization - 'TE' or 'TM'
+
+    OUTPUT:
+        E    - electric field profile, shape (*lmbda.shape, *x.shape)
+        H    - magnetic field profile (neff E), same shape as E
+        neff - effective index of the lateral slab mode
+    """
+    n1 = slabindex(lmbda, h, na, nc, ns, 0, polarization)
+    if np.all(np.asarray(t) > 0):
+        n2 = slabindex(lmbda, t, na, nc, ns, 0, polarization)
+    else:
+        n2 = np.broadcast_to(np.asarray(na, dtype=float), np.shape(n1))
+    lateral = "TM" if polarization.upper() == "TE" else "TE"
+    neff = slabindex(lmbda, w, n2, n1, n2, 0, lateral)
+
+    V = np.pi * w / np.asarray(lmbda, dtype=float) * np.sqrt(n1 ** 2 - n2 ** 2)
+    w0 = w / 2 * (0.65 + 1.619 / V ** 1.5 + 2.879 / V ** 6)
+    x = np.asarray(x, dtype=float)
+    shape = np.shape(w0) + (1,) * x.ndim
+    E = np.exp(-(x / np.reshape(w0, shape)) ** 2)
+    return E, np.reshape(neff, shape) * E, neff
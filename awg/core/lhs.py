@@ -0,0 +1,26 @@
+import numpy as np
+
+
+def lhs(n, d, seed=None):
+    """
+    Latin hypercube sample
+
+    DESCRIPTION:
+        n points in the unit cube [0, 1)^d such that, along every axis, each
+        of the n equal strata holds exactly one point (at a uniformly drawn
+        position inside it); the strata are paired at random between the
+        axes.
+
+    INPUTS:
+        n    - number of points
+        d    - number of dimensions
+        seed - (optional) seed or numpy Generator
+
+    OUTPUT:
+        X - points, shape (n, d)
+    """
+    if n < 1 or d < 1:
+        raise ValueError(f"n={n} and d={d} must be >= 1")
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((n, d)), axis=0)
+    return (strata + rng.random((n, d))) / n
@@ -1,5 +1,10 @@
 import numpy as np
 
+from .trapzw import trapzw
+from ..Profiler import profiled
+
+
+@profiled("overlap")
 def overlap(x, u, v, hu=None, hv=None):
     """
     Overlap integral (1D)
@@ -19,7 +24,7 @@ def overlap(x, u, v, hu=None, hv=None):
     """
 
     # 转为 numpy 数组并拉直
-    x = np.asarray(x)
+    w = trapzw(x)
     u = np.asarray(u).reshape(-1)
     v = np.asarray(v).reshape(-1)
 
@@ -28,21 +33,77 @@ def overlap(x, u, v, hu=None, hv=None):
         hu = np.asarray(hu).reshape(-1)
         hv = np.asarray(hv).reshape(-1)
 
-        uu = np.trapz(u * np.conj(hu), x)
-        vv = np.trapz(v * np.conj(hv), x)
-        uv = np.trapz(u * np.conj(hv), x)
-        vu = np.trapz(v * np.conj(hu), x)
+        uu = np.sum(u * np.conj(hu) * w)
+        vv = np.sum(v * np.conj(hv) * w)
+        uv = np.sum(u * np.conj(hv) * w)
+        vu = np.sum(v * np.conj(hu) * w)
 
         t = np.abs(np.real(uv * vu / vv) / np.real(uu))
 
     # ---------- 仅 E 场重叠 ----------
     else:
-        uu = np.trapz(np.conj(u) * u, x)
-        vv = np.trapz(np.conj(v) * v, x)
-        uv = np.trapz(np.conj(u) * v, x)
+        uu = np.sum(np.conj(u) * u * w)
+        vv = np.sum(np.conj(v) * v * w)
+        uv = np.sum(np.conj(u) * v * w)
 
         t = np.abs(uv) / (np.sqrt(uu) * np.sqrt(vv))
         # 等价另一种写法：
         # t = np.abs(uv)**2 / (uu * vv)
 
     return t
+
+
+@profiled("overlaps")
+def overlaps(x, U, V, HU=None, HV=None, w=None):
+    """
+    Batched overlap integrals (1D)
+
+    DESCRIPTION:
+        Computes the overlap of every field in U with every field in V, with
+        the same definition as overlap, using one matrix multiply per
+        integral. The last axis of every array is the sample axis; the
+        second to last axis enumerates the fields (e.g. modes) and any
+        leading axes (e.g. wavelengths) are broadcast batch axes. A single
+        field of shape (n,) is treated as a stack of one.
+
+    INPUTS:
+        x  - coordinate vector (n,)
+        U  - incident electric fields, shape (..., M, n)
+        V  - outgoing electric fields, shape (..., N, n)
+        HU - (optional) incident magnetic fields, same shape as U
+        HV - (optional) outgoing magnetic fields, same shape as V
+        w  - (optional) precomputed integration weights (see trapzw);
+             reuse them when many calls share the same grid x
+
+    OUTPUT:
+        t  - coupling efficiencies, shape (..., M, N)
+    """
+    w = trapzw(x) if w is None else np.asarray(w, dtype=float)
+    U = np.atleast_2d(np.asarray(U))
+    V = np.atleast_2d(np.asarray(V))
+
+    def inner(a, b):
+        # sum(a * b * w) 对所有场对，(..., M, n) @ (..., n, N)
+        return np.matmul(a * w, np.swapaxes(b, -1, -2))
+
+    # ---------- E + H 场重叠 ----------
+    if HU is not None and HV is not None:
+        HU = np.atleast_2d(np.asarray(HU))
+        HV = np.atleast_2d(np.asarray(HV))
+
+        uu = np.sum(U * np.conj(HU) * w, axis=-1)
+        vv = np.sum(V * np.conj(HV) * w, axis=-1)
+        uv = inner(U, np.conj(HV))
+        vu = np.swapaxes(inner(V, np.conj(HU)), -1, -2)
+
+        t = np.abs(np.real(uv * vu / vv[..., np.newaxis, :]) / np.real(uu)[..., np.newaxis])
+
+    # ---------- 仅 E 场重叠 ----------
+    else:
+        uu = np.sum(np.abs(U) ** 2 * w, axis=-1)
+        vv = np.sum(np.abs(V) ** 2 * w, axis=-1)
+        uv = inner(np.conj(U), V)
+
+        t = np.abs(uv) / np.sqrt(uu[..., np.newaxis] * vv[..., np.newaxis, :])
+
+    return t
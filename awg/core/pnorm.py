@@ -0,0 +1,30 @@
+import numpy as np
+
+from .fpower import fpower
+
+
+def pnorm(x, E, H=None):
+    """
+    Power normalization
+
+    DESCRIPTION:
+        Scales a sampled field so that it carries unit power. Leading axes
+        are treated as a batch and normalized independently.
+
+    INPUTS:
+        x - coordinate vector
+        E - electric field, shape (..., len(x))
+        H - (optional) magnetic field, same shape as E
+
+    OUTPUT:
+        E - normalized electric field
+        H - normalized magnetic field (only returned if H is given)
+    """
+    E = np.asarray(E)
+    P = fpower(x, E, H)
+    s = np.sqrt(np.abs(P))[..., np.newaxis]
+    s = np.where(s > 0, s, 1.0)
+
+    if H is None:
+        return E / s
+    return E / s, np.asarray(H) / s
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def rectf(x):
+    """
+    Rectangle function
+
+    DESCRIPTION:
+        1 for |x| < 1/2, 1/2 at |x| = 1/2 and 0 elsewhere; rectf(x / w) is
+        a uniform field of width w, e.g. a custom input field (see iw).
+
+    INPUTS:
+        x - coordinate(s)
+
+    OUTPUT:
+        y - function value(s), same shape as x
+    """
+    x = np.abs(np.asarray(x, dtype=float))
+    return np.where(x < 0.5, 1.0, np.where(x == 0.5, 0.5, 0.0))
@@ -0,0 +1,18 @@
+import numpy as np
+
+
+def sincf(x):
+    """
+    Sinc function
+
+    DESCRIPTION:
+        sin(pi x) / (pi x), with the limit 1 at x = 0; the far field of a
+        uniform aperture.
+
+    INPUTS:
+        x - coordinate(s)
+
+    OUTPUT:
+        y - function value(s), same shape as x
+    """
+    return np.sinc(np.asarray(x, dtype=float))
@@ -0,0 +1,83 @@
+import numpy as np
+
+from .slabindex import slabindex
+from ..Profiler import profiled
+
+
+@profiled("slabgroup")
+def slabgroup(lmbda, t, na, nc, ns, dna=0.0, dnc=0.0, dns=0.0, mode=0, polarization="TE", neff=None):
+    """
+    Slab waveguide group index
+
+    DESCRIPTION:
+        Group index ng = neff - lambda dneff/dlambda of an asymmetric
+        three-layer slab waveguide, from the material dispersion of its
+        layers (see Material.dispersion). The transverse resonance
+        condition f(neff, lambda, na, nc, ns) = 0 (see slabindex) is
+        differentiated analytically with respect to the wavelength, the
+        material indices varying by dna, dnc and dns per micron, and
+        solved for dneff/dlambda. All arguments broadcast against each
+        other.
+
+    INPUTS:
+        lmbda        - wavelength (micron)
+        t            - slab thickness (micron)
+        na           - cover (upper cladding) index
+        nc           - core index
+        ns           - substrate (lower cladding) index
+        dna          - (optional) dna/dlambda (1/micron), default 0
+        dnc          - (optional) dnc/dlambda (1/micron), default 0
+        dns          - (optional) dns/dlambda (1/micron), default 0
+        mode         - mode order (default 0)
+        polarization - 'TE' or 'TM'
+        neff         - (optional) effective index, solved if not given
+
+    OUTPUT:
+        ng - group index, NaN where the mode is cut off
+    """
+    if neff is None:
+        neff = slabindex(lmbda, t, na, nc, ns, mode, polarization)
+    lmbda, t, na, nc, ns, dna, dnc, dns, n = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (lmbda, t, na, nc, ns, dna, dnc, dns, neff))
+    )
+
+    k0 = 2 * np.pi / lmbda
+    kappa = k0 * np.sqrt(nc ** 2 - n ** 2)
+    gs = k0 * np.sqrt(n ** 2 - ns ** 2)
+    ga = k0 * np.sqrt(n ** 2 - na ** 2)
+    # 折射率平方对波长的导数
+    da, dc, ds = 2 * na * dna, 2 * nc * dnc, 2 * ns * dns
+    if polarization.upper() == "TE":
+        pa = ps = np.ones_like(nc)
+        dpa = dps = np.zeros_like(nc)
+    elif polarization.upper() == "TM":
+        pa = (nc / na) ** 2
+        ps = (nc / ns) ** 2
+        # 对数导数 d(ln p)/dlambda
+        dpa = dc / nc ** 2 - da / na ** 2
+        dps = dc / nc ** 2 - ds / ns ** 2
+    else:
+        raise ValueError(f"polarization={polarization!r} must be 'TE' or 'TM'")
+
+    def df(dx, dk, dc, ds, da, dps, dpa):
+        # f = kappa t - atan(ps gs / kappa) - atan(pa ga / kappa) 的全微分，
+        # dx 为 neff^2 的增量，dk 为 k0 的相对增量
+        dkappa = kappa * dk + k0 ** 2 * (dc - dx) / (2 * kappa)
+        dgs = gs * dk + k0 ** 2 * (dx - ds) / (2 * gs)
+        dga = ga * dk + k0 ** 2 * (dx - da) / (2 * ga)
+
+        def dphi(p, g, dg, dp):
+            return p * (kappa * (g * dp + dg) - g * dkappa) / (kappa ** 2 + (p * g) ** 2)
+
+        return t * dkappa - dphi(ps, gs, dgs, dps) - dphi(pa, ga, dga, dpa)
+
+    # f 关于 neff^2 的偏导与其余变量沿波长的全导数（均为线性）
+    zero = np.zeros_like(nc)
+    fx = df(np.ones_like(nc), zero, zero, zero, zero, zero, zero)
+    fl = df(zero, -1 / lmbda, dc, ds, da, dps, dpa)
+    dn = -fl / fx / (2 * n)
+
+    ng = n - lmbda * dn
+    if ng.ndim == 0:
+        return ng.item()
+    return ng
@@ -0,0 +1,60 @@
+import numpy as np
+
+from ..Profiler import profiled
+
+
+@profiled("slabindex")
+def slabindex(lmbda, t, na, nc, ns, mode=0, polarization="TE"):
+    """
+    Slab waveguide effective index
+
+    DESCRIPTION:
+        Solves the transverse resonance condition of an asymmetric
+        three-layer slab waveguide by bisection. All arguments broadcast
+        against each other, so a whole wavelength array is solved at once.
+
+    INPUTS:
+        lmbda        - wavelength (micron)
+        t            - slab thickness (micron)
+        na           - cover (upper cladding) index
+        nc           - core index
+        ns           - substrate (lower cladding) index
+        mode         - mode order (default 0)
+        polarization - 'TE' or 'TM'
+
+    OUTPUT:
+        neff - effective index, NaN where the mode is cut off
+    """
+    lmbda, t, na, nc, ns = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (lmbda, t, na, nc, ns))
+    )
+
+    k0 = 2 * np.pi / lmbda
+    if polarization.upper() == "TE":
+        pa = ps = np.ones_like(nc)
+    elif polarization.upper() == "TM":
+        pa = (nc / na) ** 2
+        ps = (nc / ns) ** 2
+    else:
+        raise ValueError(f"polarization={polarization!r} must be 'TE' or 'TM'")
+
+    def f(n):
+        kappa = k0 * np.sqrt(np.maximum(nc ** 2 - n ** 2, 0))
+        gs = k0 * np.sqrt(np.maximum(n ** 2 - ns ** 2, 0))
+        ga = k0 * np.sqrt(np.maximum(n ** 2 - na ** 2, 0))
+        return kappa * t - np.arctan2(ps * gs, kappa) - np.arctan2(pa * ga, kappa) - mode * np.pi
+
+    # f(n) 在 (max(na, ns), nc) 上单调递减，二分求根
+    lo = np.maximum(na, ns)
+    hi = nc.copy()
+    guided = (f(lo) > 0) & (nc > lo)
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        up = f(mid) > 0
+        lo = np.where(up, mid, lo)
+        hi = np.where(up, hi, mid)
+
+    neff = np.where(guided, (lo + hi) / 2, np.nan)
+    if neff.ndim == 0:
+        return neff.item()
+    return neff
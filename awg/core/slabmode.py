@@ -0,0 +1,107 @@
+import numpy as np
+
+from .slabindex import slabindex
+from ..Profiler import profiled
+
+
+@profiled("slabmode")
+def slabmode(lmbda, t, na, nc, ns, x, mode=0, polarization="TE", neff=None, cells=False):
+    """
+    Slab waveguide mode profile
+
+    DESCRIPTION:
+        Evaluates the transverse field profile of a guided slab mode. The
+        core spans -t/2 <= x <= t/2, the substrate lies below and the cover
+        above. Wavelength and index arguments broadcast against each other;
+        the sample axis of x is appended as the trailing axes of the result.
+
+        The TM electric field jumps at the core boundaries, so its samples
+        jump whenever a boundary crosses one. With cells, x is a sorted
+        grid and every sample holds instead the exact mean of the fields
+        over its cell (between the midpoints to its neighbours), which
+        varies smoothly with t and the samples, as the cell-averaged
+        permittivities of fdmode.
+
+    INPUTS:
+        lmbda        - wavelength (micron)
+        t            - slab thickness (micron)
+        na           - cover (upper cladding) index
+        nc           - core index
+        ns           - substrate (lower cladding) index
+        x            - coordinate vector (micron)
+        mode         - mode order (default 0)
+        polarization - 'TE' or 'TM'
+        neff         - (optional) precomputed effective index, skips the
+                       solve (see slabindex)
+        cells        - (optional) average the fields over the cells of the
+                       grid x (1-D, sorted)
+
+    OUTPUT:
+        E    - electric field profile, shape (*lmbda.shape, *x.shape)
+        H    - magnetic field profile, same shape as E
+        neff - effective index of the mode
+    """
+    if neff is None:
+        neff = slabindex(lmbda, t, na, nc, ns, mode, polarization)
+    neff = np.asarray(neff, dtype=float)
+    lmbda, t, na, nc, ns = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (lmbda, t, na, nc, ns))
+    )
+    neff = np.broadcast_to(neff, lmbda.shape)
+    x = np.asarray(x, dtype=float)
+
+    # 将标量参数扩展到采样轴
+    shape = lmbda.shape + (1,) * x.ndim
+    k0, t, na, nc, ns, n = (
+        np.reshape(v, shape) for v in (2 * np.pi / lmbda, t, na, nc, ns, neff)
+    )
+
+    kappa = k0 * np.sqrt(nc ** 2 - n ** 2)
+    gs = k0 * np.sqrt(n ** 2 - ns ** 2)
+    ga = k0 * np.sqrt(n ** 2 - na ** 2)
+    ps = 1.0 if polarization.upper() == "TE" else (nc / ns) ** 2
+    phi = np.arctan2(ps * gs, kappa)
+
+    if cells and x.ndim == 1 and x.size > 1:
+        m = (x[1:] + x[:-1]) / 2
+        lo = np.concatenate([[x[0] - (x[1] - x[0]) / 2], m])
+        hi = np.concatenate([m, [x[-1] + (x[-1] - x[-2]) / 2]])
+        f = _integral(lo, hi, t, kappa, gs, ga, phi, 1.0, 1.0, 1.0) / (hi - lo)
+        if polarization.upper() == "TE":
+            return f, n * f, neff
+        g = _integral(lo, hi, t, kappa, gs, ga, phi, 1 / ns ** 2, 1 / nc ** 2, 1 / na ** 2) / (hi - lo)
+        return n * g, f, neff
+
+    inside = np.cos(kappa * (x + t / 2) - phi)
+    below = np.cos(phi) * np.exp(gs * (x + t / 2))
+    above = np.cos(kappa * t - phi) * np.exp(-ga * (x - t / 2))
+    f = np.where(x < -t / 2, below, np.where(x > t / 2, above, inside))
+
+    if polarization.upper() == "TE":
+        E, H = f, n * f
+    else:
+        nx = np.where(x < -t / 2, ns, np.where(x > t / 2, na, nc))
+        E, H = n * f / nx ** 2, f
+
+    return E, H, neff
+
+
+def _integral(lo, hi, t, kappa, gs, ga, phi, wb, wc, wa):
+    """
+    Integral over [lo, hi] of the profile weighted by wb below, wc inside
+    and wa above the core: the antiderivative of every region between the
+    cell edges clipped to it.
+    """
+    def below(x):
+        return wb * np.cos(phi) * np.exp(gs * (x + t / 2)) / gs
+
+    def inside(x):
+        return wc * np.sin(kappa * (x + t / 2) - phi) / kappa
+
+    def above(x):
+        return -wa * np.cos(kappa * t - phi) * np.exp(-ga * (x - t / 2)) / ga
+
+    I = 0.0
+    for F, a, b in ((below, -np.inf, -t / 2), (inside, -t / 2, t / 2), (above, t / 2, np.inf)):
+        I = I + F(np.clip(hi, a, b)) - F(np.clip(lo, a, b))
+    return I
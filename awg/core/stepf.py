@@ -0,0 +1,18 @@
+import numpy as np
+
+
+def stepf(x):
+    """
+    Step function
+
+    DESCRIPTION:
+        Heaviside step: 0 for x < 0, 1/2 at x = 0 and 1 for x > 0.
+
+    INPUTS:
+        x - coordinate(s)
+
+    OUTPUT:
+        y - function value(s), same shape as x
+    """
+    x = np.asarray(x, dtype=float)
+    return np.where(x > 0, 1.0, np.where(x == 0, 0.5, 0.0))
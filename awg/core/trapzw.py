@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def trapzw(x):
+    """
+    Trapezoidal integration weights
+
+    DESCRIPTION:
+        Weights w such that sum(y * w, axis=-1) equals the trapezoidal
+        integral of y over x. Computing them once for a fixed grid turns
+        every subsequent integral into a dot product (or a matrix multiply
+        for stacked fields). Works for non-uniform grids.
+
+    INPUTS:
+        x - coordinate vector
+
+    OUTPUT:
+        w - integration weights, same length as x
+    """
+    x = np.asarray(x, dtype=float).reshape(-1)
+    w = np.zeros_like(x)
+    dx = np.diff(x)
+    w[:-1] += dx / 2
+    w[1:] += dx / 2
+    return w
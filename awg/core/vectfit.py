@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def vectfit(s, H, poles, iterations=10, weights=None):
+    """
+    Vector fitting
+
+    DESCRIPTION:
+        Rational approximation with common poles of a set of responses
+        sampled at the complex frequencies s (Gustavsen and Semlyen):
+
+            H(s) ~ sum_k r_k / (s - p_k) + d
+
+        Every iteration solves the linearized problem
+
+            sum_k r_k / (s - p_k) + d - H(s) sum_k c_k / (s - p_k) = H(s)
+
+        for all responses at once (the residues of each response are
+        eliminated by a QR factorization, so only the c_k are shared) and
+        relocates the poles to the zeros of 1 + sum_k c_k / (s - p_k),
+        the eigenvalues of diag(p) - c. Poles with a positive real part are
+        mirrored into the left half plane. The responses need not be
+        conjugate symmetric (complex baseband), so the poles are not paired.
+
+    INPUTS:
+        s          - complex frequencies, shape (K,)
+        H          - responses, shape (K, E)
+        poles      - starting poles, shape (n,)
+        iterations - (optional) number of pole relocations
+        weights    - (optional) sample weights, shape (K,)
+
+    OUTPUT:
+        p - poles, shape (n,)
+        r - residues, shape (n, E)
+        d - constant terms, shape (E,)
+    """
+    s = np.asarray(s, dtype=complex).reshape(-1)
+    H = np.asarray(H, dtype=complex).reshape(s.size, -1)
+    p = np.asarray(poles, dtype=complex).reshape(-1)
+    w = np.ones(s.size) if weights is None else np.asarray(weights, dtype=float).reshape(-1)
+    n = p.size
+    if s.size < 2 * n + 2:
+        raise ValueError(f"{s.size} samples cannot fit {n} poles")
+
+    for _ in range(iterations):
+        phi = 1 / (s[:, np.newaxis] - p)
+        A = np.concatenate([phi, np.ones((s.size, 1))], axis=1) * w[:, np.newaxis]
+        # 每个响应的留数由 QR 消去，只保留公共的 c 对应的方程
+        rows = []
+        for e in range(H.shape[1]):
+            B = -H[:, e, np.newaxis] * phi * w[:, np.newaxis]
+            R = np.linalg.qr(np.concatenate([A, B, (H[:, e] * w)[:, np.newaxis]], axis=1), mode="r")
+            rows.append(R[n + 1:2 * n + 1, n + 1:])
+        R = np.concatenate(rows)
+        c = np.linalg.lstsq(R[:, :n], R[:, n], rcond=None)[0]
+        p = np.linalg.eigvals(np.diag(p) - c[np.newaxis, :])
+        p = np.where(p.real > 0, -p.real + 1j * p.imag, p)
+
+    phi = 1 / (s[:, np.newaxis] - p)
+    A = np.concatenate([phi, np.ones((s.size, 1))], axis=1) * w[:, np.newaxis]
+    x = np.linalg.lstsq(A, H * w[:, np.newaxis], rcond=None)[0]
+    return p, x[:n], x[n]
@@ -0,0 +1,40 @@
+import numpy as np
+
+from .slabindex import slabindex
+from ..Profiler import profiled
+
+
+@profiled("wgindex")
+def wgindex(lmbda, w, h, t, na, nc, ns, mode=0, polarization="TE"):
+    """
+    Channel waveguide effective index (effective index method)
+
+    DESCRIPTION:
+        Reduces a rib or strip waveguide of width w, core height h and slab
+        thickness t to a lateral slab problem. The vertical slab is solved
+        first in the core region (thickness h) and in the etched region
+        (thickness t, or cover material when t = 0); the lateral slab is
+        then solved with the orthogonal polarization.
+
+    INPUTS:
+        lmbda        - wavelength (micron)
+        w            - waveguide width (micron)
+        h            - core height (micron)
+        t            - slab thickness (micron), 0 for a strip waveguide
+        na           - cover (upper cladding) index
+        nc           - core index
+        ns           - substrate (lower cladding) index
+        mode         - lateral mode order (default 0)
+        polarization - 'TE' or 'TM'
+
+    OUTPUT:
+        neff - effective index, NaN where the mode is cut off
+    """
+    n1 = slabindex(lmbda, h, na, nc, ns, 0, polarization)
+    if np.all(np.asarray(t) > 0):
+        n2 = slabindex(lmbda, t, na, nc, ns, 0, polarization)
+    else:
+        n2 = np.broadcast_to(np.asarray(na, dtype=float), np.shape(n1))
+
+    lateral = "TM" if polarization.upper() == "TE" else "TE"
+    return slabindex(lmbda, w, n2, n1, n2, mode, lateral)
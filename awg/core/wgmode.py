@@ -0,0 +1,42 @@
+import numpy as np
+
+from .slabindex import slabindex
+from .slabmode import slabmode
+from ..Profiler import profiled
+
+
+@profiled("wgmode")
+def wgmode(lmbda, w, h, t, na, nc, ns, x, mode=0, polarization="TE"):
+    """
+    Channel waveguide lateral mode profile (effective index method)
+
+    DESCRIPTION:
+        Lateral field profile of a rib or strip waveguide obtained from the
+        lateral slab of the effective index method (see wgindex). The
+        waveguide is centered on x = 0.
+
+    INPUTS:
+        lmbda        - wavelength (micron)
+        w            - waveguide width (micron)
+        h            - core height (micron)
+        t            - slab thickness (micron), 0 for a strip waveguide
+        na           - cover (upper cladding) index
+        nc           - core index
+        ns           - substrate (lower cladding) index
+        x            - coordinate vector (micron)
+        mode         - lateral mode order (default 0)
+        polarization - 'TE' or 'TM'
+
+    OUTPUT:
+        E    - electric field profile, shape (*lmbda.shape, *x.shape)
+        H    - magnetic field profile, same shape as E
+        neff - effective index of the mode
+    """
+    n1 = slabindex(lmbda, h, na, nc, ns, 0, polarization)
+    if np.all(np.asarray(t) > 0):
+        n2 = slabindex(lmbda, t, na, nc, ns, 0, polarization)
+    else:
+        n2 = np.broadcast_to(np.asarray(na, dtype=float), np.shape(n1))
+
+    lateral = "TM" if polarization.upper() == "TE" else "TE"
+    return slabmode(lmbda, w, n2, n1, n2, x, mode, lateral)
@@ -0,0 +1,98 @@
+import numpy as np
+
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .iw import iw
+from .fpr1 import fpr1
+from .aw import aw
+from .focus import focus
+from .fpr2 import fpr2
+from .ow import ow
+from .core.diffract import diffract, geometry
+
+
+@profiled("couplings")
+def couplings(model, lmbda, _input=0, u=None, options=None):
+    """
+    Sparse output couplings
+
+    DESCRIPTION:
+        Runs the simulation chain with the output couplings restricted to
+        the output waveguides within options.coupling_window pitches of a
+        focal spot (see focus), and returns them as a sparse matrix with
+        one row per wavelength: for large channel counts only a few
+        entries of every row are non-zero.
+
+        The transmission into a skipped waveguide is not computed;
+        error_estimate approximates the largest one of every wavelength (0
+        when no waveguide is skipped). The field of the arms, taken as
+        point sources at the arm centers, is summed at the center and the
+        edges of every output waveguide, which costs O(N) per waveguide
+        instead of the O(N n) of the full diffraction sum, and scaled to
+        the transmission of the evaluated waveguides. This is an estimate,
+        not a bound: on devices of 16 to 128 channels it lies 2 to 10 times
+        above the actual error for windows of 2 pitches and more, but it
+        misses the background of about -40 dB between the channel bands
+        of small devices, where the actual error can exceed it.
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        _input  - input waveguide index (default 0)
+        u       - (optional) custom input field (see iw)
+        options - (optional) SimulationOptions; options.coupling_window
+                  must be set
+
+    OUTPUT:
+        results - dict with
+                  'coupling' : power transmission, scipy.sparse CSR matrix
+                               of shape (lmbda.size, No)
+                  'focus'    : focal positions, shape (*lmbda.shape, P)
+                               (see focus)
+                  'error_estimate'
+                             : estimated truncation error (largest skipped
+                               transmission), shape lmbda.shape
+    """
+    from scipy.sparse import csr_matrix
+
+    options = options or SimulationOptions()
+    if options.coupling_window is None:
+        raise ValueError("couplings requires options.coupling_window")
+    lmbda = np.asarray(lmbda, dtype=float)
+
+    F = iw(model, lmbda, _input, u, options)
+    F = fpr1(model, lmbda, F, options)
+    F = aw(model, lmbda, F, options)
+    x, channels = focus(model, lmbda, F, options)
+    G = fpr2(model, lmbda, F, options, channels)
+    T = ow(model, lmbda, G, options, channels)
+    estimate = _estimate(model, lmbda, F, channels, T, options)
+    T = T.reshape(-1, model.No)
+
+    channels = np.broadcast_to(channels, lmbda.shape + (model.No,)).reshape(T.shape)
+    j, k = np.nonzero(channels)
+    coupling = csr_matrix((T[j, k], (j, k)), shape=T.shape)
+    return {"coupling": coupling, "focus": x, "error_estimate": estimate.reshape(lmbda.shape)}
+
+
+def _estimate(model, lmbda, F0, channels, T, options):
+    """Estimate of the largest transmission into a skipped output waveguide."""
+    s, idx = model.array_aperture().grid(options.points, options.window, options.tolerance)
+    center = idx[:, idx.shape[1] // 2]
+    a = s[center] / model.R
+    xi, zi = model.R * np.sin(a), model.R * np.cos(a)
+    wi = np.full(a.size, model.d)
+
+    # 各输出波导中心及两侧边缘处的场（阵列波导视为点源）
+    output = model.output_aperture()
+    x = (output.positions[:, np.newaxis] + np.array([-0.5, 0.0, 0.5]) * output.width).reshape(-1)
+    z = model.focal_z(x)
+    ns = model.slab_waveguide().index(lmbda)
+    E = diffract(np.asarray(lmbda) / ns, F0.E[..., center], xi, x, z, zi, wi,
+                 method="direct", kernel=geometry(xi, x, z, zi, wi))
+    A = np.max(np.abs(E.reshape(E.shape[:-1] + (output.count, 3))) ** 2, axis=-1)
+
+    channels = np.broadcast_to(channels, A.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.max(np.where(channels & (A > 0), T / A, 0.0), axis=-1)
+    return scale * np.max(np.where(channels, 0.0, A), axis=-1)
@@ -0,0 +1,85 @@
+import hashlib
+
+import numpy as np
+
+
+def digest(value):
+    """
+    Stable content hash
+
+    DESCRIPTION:
+        SHA-256 of a canonical binary encoding of value, identical across
+        processes, sessions and machines (unlike the built-in hash, which
+        is salted per process). Numbers are encoded by value, so 40 and
+        40.0 hash alike; containers recursively; arrays by dtype, shape and
+        content. Objects providing _state() (AWG, SimulationOptions,
+        materials) are encoded by that canonical state, other objects by
+        their type and public attributes, and functions by their qualified
+        name (plus their code for lambdas and closures).
+
+    INPUTS:
+        value - numbers, strings, None, tuples, lists, dicts, arrays,
+                functions or objects built from these
+
+    OUTPUT:
+        h - hex digest (64 characters)
+    """
+    h = hashlib.sha256()
+    _update(h, value)
+    return h.hexdigest()
+
+
+def _update(h, v):
+    if v is None:
+        h.update(b"N")
+    elif isinstance(v, (bool, np.bool_)):
+        h.update(b"T" if v else b"F")
+    elif isinstance(v, (int, float, np.integer, np.floating)):
+        h.update(b"f" + float(v).hex().encode())
+    elif isinstance(v, (complex, np.complexfloating)):
+        h.update(b"c" + complex(v).real.hex().encode() + b"," + complex(v).imag.hex().encode())
+    elif isinstance(v, str):
+        _bytes(h, b"s", v.encode())
+    elif isinstance(v, bytes):
+        _bytes(h, b"y", v)
+    elif isinstance(v, (tuple, list)):
+        h.update(b"(%d" % len(v))
+        for item in v:
+            _update(h, item)
+        h.update(b")")
+    elif isinstance(v, dict):
+        h.update(b"{%d" % len(v))
+        for key in sorted(v, key=str):
+            _update(h, str(key))
+            _update(h, v[key])
+        h.update(b"}")
+    elif isinstance(v, np.ndarray):
+        if v.ndim == 0:
+            _update(h, v.item())
+            return
+        a = np.ascontiguousarray(v)
+        _bytes(h, b"a", f"{a.dtype.str}{a.shape}".encode())
+        h.update(hashlib.sha256(a.tobytes()).digest())
+    elif hasattr(v, "_state") and not isinstance(v, type):
+        h.update(b"o")
+        _update(h, v._state())
+    elif callable(v) and hasattr(v, "__qualname__"):
+        name = f"{v.__module__}.{v.__qualname__}"
+        _bytes(h, b"q", name.encode())
+        code = getattr(v, "__code__", None)
+        if code is not None and ("<lambda>" in name or "<locals>" in name):
+            # 匿名函数和闭包的名字不唯一，加上字节码和常量
+            _bytes(h, b"k", code.co_code)
+            _update(h, [c for c in code.co_consts if isinstance(c, (int, float, str, bytes, tuple))])
+            _update(h, [c.cell_contents for c in (v.__closure__ or ())])
+    elif hasattr(v, "__dict__"):
+        h.update(b"o")
+        _update(h, (f"{type(v).__module__}.{type(v).__qualname__}",
+                    {k: a for k, a in vars(v).items() if not k.startswith("_")}))
+    else:
+        raise TypeError(f"cannot digest object of type {type(v).__name__}")
+
+
+def _bytes(h, tag, b):
+    h.update(tag + b"%d:" % len(b))
+    h.update(b)
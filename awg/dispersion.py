@@ -0,0 +1,209 @@
+import numpy as np
+
+from .core.slabgroup import slabgroup
+from .core.slabindex import slabindex
+from .material import Material
+
+
+# 可按候选设计向量化的 AWG 参数
+PARAMETERS = ("lambda_c", "w", "h", "t", "N", "m", "R", "d", "g", "L0", "Ni", "wi", "di", "li",
+              "No", "wo", "do", "lo", "df", "dl")
+
+
+def dispersion(model, **params):
+    """
+    AWG dispersion figures (analytic)
+
+    DESCRIPTION:
+        First order dispersion of an AWG, from the effective and group
+        indices of the array waveguides and the slab index of the free
+        propagation regions at the center wavelength. The group index is
+        analytic: the material dispersion of the layers (see
+        Material.dispersion) is carried through the slabs of the effective
+        index method (see slabgroup). With the grating
+        equation ns d sin(theta) + nc dl = m lambda,
+
+            dl               = m lambda_c / nc       (unless dl is given)
+            FSR              = lambda_c nc / (m ng)
+            dtheta / dlambda = dl ng / (lambda_c ns d)
+            dx / dlambda     = R dtheta / dlambda
+            channel spacing  = output pitch / (dx / dlambda)
+
+        Any numeric AWG parameter (see PARAMETERS) may be passed as an array
+        to override the model; all of them broadcast against each other, so
+        a whole grid of candidate designs is evaluated in one call. The
+        indices are only solved for the distinct (wavelength, cross-section)
+        combinations of the grid.
+
+    INPUTS:
+        model  - AWG model providing the materials, polarization and the
+                 default value of every parameter
+        params - (optional) parameter arrays, e.g. R=..., m=..., N=...
+
+    OUTPUT:
+        results - dict of arrays of the broadcast shape of params:
+                  'nc', 'ng'     : array waveguide effective / group index
+                  'ns'           : slab index of the FPRs
+                  'm', 'dl'      : diffraction order and length increment
+                  'FSR'          : free spectral range (micron)
+                  'angular'      : angular dispersion (rad / micron)
+                  'linear'       : linear dispersion on the focal curve
+                  'spacing'      : channel spacing (micron)
+                  'channels'     : number of channels fitting in one FSR
+    """
+    p = parameters(model, **params)
+    lc = p["lambda_c"]
+
+    nc, ng = groupindex(model, lc, p["w"], p["h"], p["t"])
+    ns = index(model, lc, np.inf, p["h"], p["t"])
+
+    if p["dl"] is None:
+        m = p["m"].astype(float)
+        dl = m * lc / nc
+    else:
+        dl = p["dl"]
+        m = nc * dl / lc
+
+    fsr = lc * nc / (m * ng)
+    angular = dl * ng / (lc * ns * p["d"])
+    linear = p["R"] * angular
+    spacing = np.maximum(p["do"], p["wo"]) / linear
+
+    return {"nc": nc, "ng": ng, "ns": ns, "m": m, "dl": dl, "FSR": fsr,
+            "angular": angular, "linear": linear, "spacing": spacing, "channels": fsr / spacing}
+
+
+def parameters(model, **params):
+    """Model parameters overridden by params, broadcast to one common shape."""
+    unknown = set(params) - set(PARAMETERS)
+    if unknown:
+        raise TypeError(f"unexpected parameter(s) {', '.join(sorted(unknown))}")
+
+    dl = params.get("dl", model._dl)
+    names = [k for k in PARAMETERS if k != "dl" or dl is not None]
+    values = [params.get(k, dl if k == "dl" else getattr(model, k)) for k in names]
+    values = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in values))
+    p = dict(zip(names, values))
+    p.setdefault("dl", None)
+
+    if np.any(p["g"] >= p["d"]):
+        raise ValueError("gap g must be smaller than spacing d")
+    return p
+
+
+def index(model, lmbda, w, h, t, mode=0):
+    """
+    Effective index of the model waveguide for arrays of wavelengths and
+    cross-sections (w = inf for the slab), solved once per distinct
+    combination.
+    """
+    n, _ = _solve(model, lmbda, w, h, t, mode)
+    return n
+
+
+def groupindex(model, lmbda, w, h, t, mode=0):
+    """Effective and group index (analytic, see slabgroup)."""
+    n, _, _, ng = _solve(model, lmbda, w, h, t, mode, group=True)
+    return n, ng
+
+
+def lateral(model, lmbda, w, h, t, mode=0):
+    """
+    Lateral slab of the effective index method: (neff, n1, n2), n1 being
+    the vertical slab index of the core region and n2 that of the etched
+    region (cladding index for t = 0).
+    """
+    return _solve(model, lmbda, w, h, t, mode, lateral=True)
+
+
+def _solve(model, lmbda, w, h, t, mode=0, lateral=False, group=False):
+    # 逐参数去重后组合成整数键，避免对整个网格做按行 unique
+    arrays = [np.asarray(v, dtype=float) for v in (lmbda, w, h, t)]
+    shape = np.broadcast_shapes(*(a.shape for a in arrays))
+    key = np.zeros((), dtype=np.int64)
+    values = []
+    for a in arrays:
+        u, i = np.unique(_compact(a), return_inverse=True)
+        key = key * u.size + i.reshape(_compact(a).shape)
+        values.append(u)
+    codes, inverse = np.unique(np.broadcast_to(key, shape), return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    # 各唯一组合在每个参数上的下标
+    index = []
+    rest = codes
+    for u in values[::-1]:
+        rest, i = np.divmod(rest, u.size)
+        index.append(i)
+    il, iw, ih, it = index[::-1]
+    l, w, h, t = (u[i] for u, i in zip(values, index[::-1]))
+
+    # 竖直方向的平板只依赖 (lambda, h) 或 (lambda, t)，单独去重求解
+    pol = model.polarization.upper()
+    na, nc, ns, dna, dnc, dns = (v[il] for v in _materials(model.slab_waveguide(), values[0]))
+    n1, dn1 = _vertical(l, h, na, nc, ns, dna, dnc, dns, il * values[2].size + ih, pol, group)
+    n2, dn2 = na.copy(), dna.copy()
+    etched = t > 0
+    if etched.any():
+        n2[etched], dn2[etched] = _vertical(l[etched], t[etched], na[etched], nc[etched], ns[etched],
+                                            dna[etched], dnc[etched], dns[etched],
+                                            il[etched] * values[3].size + it[etched], pol, group)
+
+    # 平板波导 (w = inf) 的有效折射率即竖直平板的解；侧向问题取正交偏振
+    slab = np.isinf(w)
+    neff = n1.copy()
+    ng = n1 - l * dn1 if group else None
+    if mode != 0 and slab.any():
+        neff[slab] = slabindex(l[slab], h[slab], na[slab], nc[slab], ns[slab], mode, pol)
+        if group:
+            ng[slab] = slabgroup(l[slab], h[slab], na[slab], nc[slab], ns[slab], dna[slab], dnc[slab],
+                                 dns[slab], mode, pol, neff[slab])
+    c = ~slab
+    if c.any():
+        side = "TM" if pol == "TE" else "TE"
+        neff[c] = slabindex(l[c], w[c], n2[c], n1[c], n2[c], mode, side)
+        if group:
+            ng[c] = slabgroup(l[c], w[c], n2[c], n1[c], n2[c], dn2[c], dn1[c], dn2[c], mode, side, neff[c])
+
+    out = tuple(v[inverse].reshape(shape) for v in (neff, n1, n2) + ((ng,) if group else ()))
+    return out if lateral or group else out[:2]
+
+
+def _vertical(l, h, na, nc, ns, dna, dnc, dns, key, polarization, group=False):
+    """
+    Vertical slab index and its wavelength derivative (zero unless group),
+    solved once per distinct key.
+    """
+    key, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    args = (l[first], h[first], na[first], nc[first], ns[first])
+    n = np.atleast_1d(slabindex(*args, 0, polarization))
+    if not group:
+        return n[inverse], np.zeros(inverse.size)
+    ng = np.atleast_1d(slabgroup(*args, dna[first], dnc[first], dns[first], 0, polarization, n))
+    return n[inverse], ((n - ng) / l[first])[inverse]
+
+
+def _materials(waveguide, lmbda, dl=1e-4):
+    """
+    Indices (na, nc, ns) of the waveguide materials and their wavelength
+    derivatives: the dispersion of a Material, zero for a constant index
+    and a central difference of a plain function.
+    """
+    out = []
+    for m in (waveguide.clad, waveguide.core, waveguide.subs):
+        if isinstance(m, Material):
+            n, dn, _ = m.dispersion(lmbda)
+        elif callable(m):
+            n, dn = m(lmbda), (m(lmbda + dl) - m(lmbda - dl)) / (2 * dl)
+        else:
+            n, dn = m, 0.0
+        out.append(np.broadcast_to(np.asarray(n, dtype=float), lmbda.shape))
+        out.append(np.broadcast_to(np.asarray(dn, dtype=float), lmbda.shape))
+    na, dna, nc, dnc, ns, dns = out
+    return na, nc, ns, dna, dnc, dns
+
+
+def _compact(a):
+    """a without its broadcast (zero-stride) axes, keeping the number of dimensions."""
+    return a[tuple(slice(0, 1) if st == 0 else slice(None) for st in a.strides)]
@@ -0,0 +1,79 @@
+import numpy as np
+
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+
+
+@profiled("focus")
+def focus(model, lmbda, F0, options=None):
+    """
+    Focal spots on the output focal curve
+
+    DESCRIPTION:
+        Locates, for every wavelength, where the field on the output
+        grating circle focuses on the output focal curve, from the grating
+        equation at the central arm
+
+            ns k0 d sin(theta) = dphi + 2 pi p
+
+        where dphi is the mean phase step between adjacent arms of F0 (so
+        the input position, the arm dispersion and any phase errors are
+        accounted for), theta the angle seen from the central arm and p the
+        diffraction order. Every order whose spot falls on the output
+        aperture, or within options.coupling_window output pitches of it,
+        is returned, and the output waveguides within that window of a spot
+        are marked (see fpr2 and ow); at wavelengths without any spot
+        there, the two outermost waveguides are.
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        F0      - Field on the output grating circle (see aw)
+        options - (optional) SimulationOptions; options.coupling_window
+                  must be set
+
+    OUTPUT:
+        x        - focal positions on the output curve, shape
+                   (*lmbda.shape, P), NaN where an order has no spot
+        channels - output waveguides near a spot, boolean (*lmbda.shape, No)
+    """
+    options = options or SimulationOptions()
+    if options.coupling_window is None:
+        raise ValueError("focus requires options.coupling_window")
+    lmbda = np.asarray(lmbda, dtype=float)
+
+    array = model.array_aperture()
+    s, idx = array.grid(options.points, options.window, options.tolerance)
+    if not np.allclose(s, F0.x):
+        raise ValueError("F0 is not sampled on the array aperture grid")
+    # 阵列波导中心处的场，相邻两臂的平均相位差
+    b = F0.E[..., idx[:, idx.shape[1] // 2]]
+    dphi = np.angle(np.sum(np.conj(b[..., 1:]) * b[..., :-1], axis=-1))
+    kd = 2 * np.pi * model.slab_waveguide().index(lmbda) / lmbda * model.d
+
+    output = model.output_aperture()
+    margin = options.coupling_window * output.pitch
+    edges = np.array([output.positions.min() - margin, output.positions.max() + margin])
+    sin = np.clip(edges / _distance(model, edges), -1, 1)
+    # 落在输出孔径（含窗口）内的衍射级次
+    pmin = np.ceil((kd * sin[0] - dphi) / (2 * np.pi)).astype(int)
+    pmax = np.floor((kd * sin[1] - dphi) / (2 * np.pi)).astype(int)
+    p = pmin[..., np.newaxis] + np.arange(max(np.max(pmax - pmin) + 1, 1))
+    sin_theta = (dphi[..., np.newaxis] + 2 * np.pi * p) / kd[..., np.newaxis]
+
+    x = sin_theta * model.R
+    for _ in range(8):
+        # 焦线上 x = sin(theta) * 到中心臂的距离，迭代求解
+        x = sin_theta * _distance(model, np.clip(x, *edges))
+    x = np.where(p <= pmax[..., np.newaxis], x, np.nan)
+
+    near = np.abs(output.positions - x[..., np.newaxis]) <= margin
+    channels = np.any(near, axis=-2)
+    # 没有焦斑落在孔径上时计算两端的波导（截断误差的标定，见 couplings）
+    channels[..., [0, -1]] |= ~np.any(channels, axis=-1, keepdims=True)
+    return x, channels
+
+
+def _distance(model, x):
+    """Distance from the point of the output focal curve at lateral x to the central arm."""
+    return np.hypot(x, model.R - model.focal_z(x))
@@ -0,0 +1,47 @@
+import numpy as np
+
+from .Field import Field
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .StarCoupler import StarCoupler
+
+
+@profiled("fpr1")
+def fpr1(model, lmbda, F0, options=None):
+    """
+    First free propagation region
+
+    DESCRIPTION:
+        Diffracts the input field F0, sampled along the input focal curve,
+        onto the grating circle carrying the array apertures.
+
+        With options.fpr = 'bpm' the field is propagated through the slab
+        and its side walls by the split-step BPM instead of the
+        diffraction sum (see StarCoupler.bpm; the walls are only accurate
+        for a weak index contrast).
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        F0      - input Field (see iw)
+        options - (optional) SimulationOptions
+
+    OUTPUT:
+        F - Field on the grating circle, x being the arc length
+    """
+    options = options or SimulationOptions()
+    ns = model.slab_waveguide().index(lmbda)
+
+    s, _ = model.array_aperture().grid(options.points, options.window, options.tolerance)
+    a = s / model.R
+    xf = model.R * np.sin(a)
+    zf = model.R * np.cos(a)
+
+    if options.fpr == "bpm":
+        coupler = StarCoupler.get(F0.x, model.focal_z(F0.x), xf, zf,
+                                  walls=model.slab_walls(model.input_aperture()))
+        E = coupler.bpm(lmbda, ns, model.etched_index(lmbda), F0.E, options.bpm_step, options.bpm_sampling)
+    else:
+        coupler = StarCoupler.get(F0.x, model.focal_z(F0.x), xf, zf)
+        E = coupler.diffract(np.asarray(lmbda) / ns, F0.E, options.diffraction)
+    return Field(s, E, lmbda=lmbda)
@@ -0,0 +1,95 @@
+import numpy as np
+
+from .Field import Field
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .StarCoupler import StarCoupler
+from .core.diffract import diffract, geometry
+
+
+@profiled("fpr2")
+def fpr2(model, lmbda, F0, options=None, channels=None):
+    """
+    Second free propagation region
+
+    DESCRIPTION:
+        Diffracts the field on the output grating circle onto the output
+        focal curve carrying the output waveguides.
+
+        With options.fpr = 'bpm' the field is propagated through the slab
+        and its side walls by the split-step BPM instead of the
+        diffraction sum (see StarCoupler.bpm; the walls are only accurate
+        for a weak index contrast).
+
+        Given channels (see focus), the diffraction sum is only evaluated
+        on the sample windows of the marked output waveguides of every
+        wavelength, and the field is zero elsewhere. Consecutive
+        wavelengths whose windows overlap are summed together over a
+        kernel restricted to their rows, so the cost scales with the
+        window instead of the width of the output aperture. The BPM always
+        propagates the whole field.
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        F0      - Field on the output grating circle (see aw)
+        options - (optional) SimulationOptions
+        channels - (optional) boolean (..., *lmbda.shape, No) mask of the
+                   output waveguides to evaluate
+
+    OUTPUT:
+        F - Field along the output focal curve
+    """
+    options = options or SimulationOptions()
+    ns = model.slab_waveguide().index(lmbda)
+
+    a = F0.x / model.R
+    xi = model.R * np.sin(a)
+    zi = model.R * np.cos(a)
+    # 圆弧上的积分权重（弧长）
+    ds = np.gradient(F0.x)
+
+    x, idx = model.output_aperture().grid(options.points, options.window, options.tolerance)
+    if options.fpr == "bpm":
+        coupler = StarCoupler.get(xi, zi, x, model.focal_z(x), ds,
+                                  walls=model.slab_walls(model.output_aperture()))
+        E = coupler.bpm(lmbda, ns, model.etched_index(lmbda), F0.E, options.bpm_step, options.bpm_sampling)
+    elif channels is not None:
+        E = _windowed(np.asarray(lmbda) / ns, F0.E, xi, zi, ds, x, model.focal_z(x), idx, channels)
+    else:
+        coupler = StarCoupler.get(xi, zi, x, model.focal_z(x), ds)
+        E = coupler.diffract(np.asarray(lmbda) / ns, F0.E, options.diffraction)
+    return Field(x, E, lmbda=lmbda)
+
+
+def _windowed(lmbda, ui, xi, zi, wi, xf, zf, idx, channels):
+    """Diffraction sum on the windows idx of the marked channels only."""
+    # 前导轴（多个输入端口）与波长一起展开
+    shape = np.broadcast_shapes(np.shape(ui)[:-1], np.shape(lmbda), np.shape(channels)[:-1])
+    lmbda = np.broadcast_to(lmbda, shape).reshape(-1)
+    ui = np.broadcast_to(ui, shape + ui.shape[-1:]).reshape(lmbda.size, -1)
+    channels = np.broadcast_to(channels, shape + idx.shape[:1]).reshape(lmbda.size, -1)
+
+    rows = np.zeros((lmbda.size, xf.size), dtype=bool)
+    for k in range(idx.shape[0]):
+        rows[:, idx[k]] |= channels[:, k, np.newaxis]
+    count = rows.sum(axis=1)
+
+    uf = np.zeros((lmbda.size, xf.size), dtype=complex)
+    j = 0
+    while j < lmbda.size:
+        # 相邻波长的窗口合并计算，合并后的行数不超过单个窗口的两倍
+        union, largest, end = rows[j].copy(), count[j], j + 1
+        while end < lmbda.size:
+            merged = union | rows[end]
+            if merged.sum() > 2 * max(largest, count[end]):
+                break
+            union, largest, end = merged, max(largest, count[end]), end + 1
+        sel = np.flatnonzero(union)
+        if sel.size:
+            kernel = geometry(xi, xf[sel], zf[sel], zi, wi)
+            E = diffract(lmbda[j:end], ui[j:end], xi, xf[sel], zf[sel], zi, wi,
+                         method="direct", kernel=kernel)
+            uf[j:end, sel] = E * rows[j:end, sel]
+        j = end
+    return uf.reshape(shape + (xf.size,))
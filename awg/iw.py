@@ -0,0 +1,66 @@
+import numpy as np
+
+from .Field import Field
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .core.pnorm import pnorm
+
+
+@profiled("iw")
+def iw(model, lmbda, _input=0, u=None, options=None):
+    """
+    Input waveguide
+
+    DESCRIPTION:
+        Field launched by an input waveguide at the entrance of the first
+        free propagation region, normalized to unit power.
+
+        The launched mode profile depends only on the input waveguide and
+        the wavelengths, so it is computed once per geometry and
+        wavelength batch and shared by every port and later call (see
+        Aperture.mode). The field is placed on the common sampling grid of
+        the input aperture, zero outside the window of the port, so that
+        the star coupler sees the same samples and quadrature weights for
+        a port whether it is launched alone or with others (the zero
+        samples cost nothing, see StarCoupler.diffract). Given a sequence
+        of input indices, the fields of all these ports are returned
+        together, one leading axis entry per port, so that the rest of the
+        chain propagates them in one pass (the star coupler kernels
+        multiply all ports at once, see core.diffract).
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        _input  - input waveguide index (default 0), or a sequence of P
+                  indices
+        u       - (optional) custom input field: a callable u(x) or an
+                  array sampled on the local aperture window
+        options - (optional) SimulationOptions
+
+    OUTPUT:
+        F - Field on the grid of the input aperture, E of shape
+            (*lmbda.shape, n), or (P, *lmbda.shape, n) for a sequence of
+            inputs
+    """
+    options = options or SimulationOptions()
+    ports = np.asarray(_input)
+    if ports.ndim > 1 or ports.size == 0 or not np.issubdtype(ports.dtype, np.integer):
+        raise ValueError(f"_input={_input} must be an index or a sequence of indices")
+    if np.any((ports < 0) | (ports >= model.Ni)):
+        raise ValueError(f"_input={_input} must be in [0, {model.Ni - 1}]")
+
+    aperture = model.input_aperture()
+    if u is None:
+        x, E = aperture.mode(lmbda, options.points, options.window, options.tolerance)
+    else:
+        x = aperture.local(options.points, options.window, options.tolerance)
+        E = u(x) if callable(u) else np.asarray(u)
+        E = np.broadcast_to(E, np.shape(lmbda) + x.shape)
+        E = pnorm(x, E)
+
+    # 放在整排孔径的公共网格上：单端口与多端口的采样和求积权重相同
+    s, idx = aperture.grid(options.points, options.window, options.tolerance)
+    U = np.zeros((ports.size,) + E.shape[:-1] + s.shape, dtype=E.dtype)
+    for j, port in enumerate(ports.reshape(-1)):
+        U[j][..., idx[port]] = E
+    return Field(s, U[0] if ports.ndim == 0 else U, lmbda=lmbda)
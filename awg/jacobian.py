@@ -0,0 +1,324 @@
+import numpy as np
+
+from .SimulationOptions import SimulationOptions
+from .core.diffract import _TOL
+from .core.trapzw import trapzw
+
+
+# 可求导的 AWG 参数（连续的几何参数）
+PARAMETERS = ("R", "d", "g", "wi", "di", "li", "wo", "do", "lo", "df", "L0", "dl")
+
+
+def jacobian(model, lmbda, params, _input=0, options=None):
+    """
+    Transmission and its derivatives with respect to the geometry
+
+    DESCRIPTION:
+        Runs the iw -> fpr1 -> aw -> fpr2 -> ow chain (as simulate) in
+        forward-mode automatic differentiation: every stage propagates,
+        next to its field, the tangent of the field with respect to each
+        parameter in params. The tangents are analytic: mode profiles
+        are differentiated through the effective index method (the
+        derivative of the effective index follows from the transverse
+        resonance condition), the diffraction kernels through the
+        positions of their source and target samples, and the array
+        through its arm lengths. The cost is about that of len(params) + 1
+        simulations, independent of how the objective is built from T.
+
+        T and J are those of model.freeze(options): the sample counts of
+        the aperture windows are held at their values for this model, the
+        sample spacing scales with the aperture pitch and the aperture
+        modes are averaged over the sample cells (see Aperture.mode), so
+        that the discretized chain is smooth in the widths too. Only the
+        diffraction star coupler is differentiated (options.fpr must be
+        'diffraction'), with the effective index method (model.solver must
+        be 'eim'); the kernels are summed directly.
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        params  - names of the parameters (see PARAMETERS), e.g.
+                  ('wi', 'wo', 'R', 'd'); the array aperture width is
+                  d - g
+        _input  - input waveguide index (default 0)
+        options - (optional) SimulationOptions
+
+    OUTPUT:
+        T - power transmission to every output, shape (*lmbda.shape, No)
+        J - derivatives dT/dp, shape (*lmbda.shape, No, len(params))
+    """
+    options = options or SimulationOptions()
+    params = tuple(params)
+    unknown = set(params) - set(PARAMETERS)
+    if unknown:
+        raise TypeError(f"cannot differentiate with respect to {', '.join(sorted(unknown))}")
+    if options.fpr != "diffraction":
+        raise ValueError("jacobian supports the diffraction star coupler only (options.fpr='diffraction')")
+    if model.solver != "eim":
+        raise ValueError("jacobian supports the effective index method only (model.solver='eim')")
+    if options.tolerance is not None:
+        raise ValueError("jacobian supports uniform aperture sampling only (options.tolerance=None)")
+    if not 0 <= _input < model.Ni:
+        raise ValueError(f"_input={_input} must be in [0, {model.Ni - 1}]")
+
+    model = model.freeze(options)
+    shape = np.shape(lmbda)
+    lmbda = np.asarray(lmbda, dtype=float).reshape(-1)
+    P = len(params)
+    seed = dict(zip(params, np.eye(P)))
+    zero = np.zeros(P)
+
+    def d(name):
+        return seed.get(name, zero)
+
+    # ---------- 孔径：切线只来自节距、位置和宽度 ----------
+    inp, arr, out = model.input_aperture(), model.array_aperture(), model.output_aperture()
+    rows = {
+        "input": (inp, d("wi") if model.wi >= model.di else d("di"), d("li"), d("wi")),
+        "array": (arr, d("d"), zero, d("d") - d("g")),
+        "output": (out, d("wo") if model.wo > model.do else d("do"), d("lo"), d("wo")),
+    }
+    grids = {}
+    for name, (aperture, dpitch, doffset, dwidth) in rows.items():
+        k = np.arange(aperture.count) - (aperture.count - 1) / 2
+        dpositions = doffset[:, np.newaxis] + k * dpitch[:, np.newaxis]
+        grids[name] = _grid(aperture, options, dpitch, dpositions) + (dwidth,)
+
+    # 焦线 z = r - sqrt(r^2 - x^2) - df 及其切线
+    r, dr = (model.R, d("R")) if model.confocal else (model.R / 2, d("R") / 2)
+
+    def focal(x, dx):
+        root = np.sqrt(r ** 2 - x ** 2)
+        return model.focal_z(x), dr[:, np.newaxis] - (r * dr[:, np.newaxis] - x * dx) / root - d("df")[:, np.newaxis]
+
+    # ---------- iw ----------
+    x0, idx, xl, dx0, dxl, _, dw = grids["input"]
+    u, du = _mode(inp.waveguide, lmbda, xl, dxl, dw)
+    pos = inp.positions[_input]
+    xi, dxi = xl + pos, dxl + (rows["input"][2] + (_input - (model.Ni - 1) / 2) * rows["input"][1])[:, np.newaxis]
+    # 求积权重取整排孔径网格上的值（见 iw）
+    wi, dwi = trapzw(x0)[idx[_input]], _trapzw(dx0)[:, idx[_input]]
+
+    # ---------- fpr1 ----------
+    ns = model.slab_waveguide().index(lmbda)
+    k0 = 2 * np.pi * ns / lmbda
+    s, idx, sl, ds, dsl, dh, dw = grids["array"]
+    theta = s / model.R
+    dtheta = ds / model.R - s * d("R")[:, np.newaxis] / model.R ** 2
+    xa, za = model.R * np.sin(theta), model.R * np.cos(theta)
+    dxa = d("R")[:, np.newaxis] * np.sin(theta) + za * dtheta
+    dza = d("R")[:, np.newaxis] * np.cos(theta) - xa * dtheta
+    zi, dzi = focal(xi, dxi)
+    u, du = _diffract(k0, u, du, xi, zi, wi, xa, za, dxi, dzi, dwi, dxa, dza)
+
+    # ---------- aw ----------
+    M, dM = _mode(arr.waveguide, lmbda, sl, dsl, dw)
+    h = sl[1] - sl[0]
+    dh = dh[:, np.newaxis, np.newaxis]
+    U, dU = u[:, idx], du[:, :, idx]
+    c = np.einsum("lkn,ln->lk", U, M) * h
+    dc = (np.einsum("plkn,ln->plk", dU, M) + np.einsum("lkn,pln->plk", U, dM)) * h + c * dh / h
+    beta = 2 * np.pi * model.array_waveguide().index(lmbda) / lmbda
+    phi = beta[:, np.newaxis] * model.arm_lengths()
+    if model.phase_error is not None:
+        phi = phi + np.asarray(model.phase_error, dtype=float)
+    dphi = beta[:, np.newaxis] * (d("L0")[:, np.newaxis, np.newaxis]
+                                  + np.arange(model.N) * d("dl")[:, np.newaxis, np.newaxis])
+    e = np.exp(-1j * phi)
+    if model.arm_loss is not None:
+        e = e * 10 ** (-np.asarray(model.arm_loss, dtype=float) / 20)
+    a, da = c * e, (dc - 1j * c * dphi) * e
+    u = np.zeros((lmbda.size, s.size), dtype=complex)
+    du = np.zeros((P, lmbda.size, s.size), dtype=complex)
+    for k in range(arr.count):
+        u[:, idx[k]] += a[:, k, np.newaxis] * M
+        du[:, :, idx[k]] += da[:, :, k, np.newaxis] * M + a[:, k, np.newaxis] * dM
+
+    # ---------- fpr2 ----------
+    xo, idx, ol, dxo, dol, _, dw = grids["output"]
+    zo, dzo = focal(xo, dxo)
+    u, du = _diffract(k0, u, du, xa, za, np.gradient(s), xo, zo, dxa, dza,
+                      np.gradient(ds, axis=-1), dxo, dzo)
+
+    # ---------- ow ----------
+    M, dM = _mode(out.waveguide, lmbda, ol, dol, dw)
+    w, dwq = trapzw(ol), _trapzw(dol)
+    U, dU = u[:, idx], du[:, :, idx]
+    o = np.einsum("lkn,ln->lk", np.conj(U), M * w)
+    do = (np.einsum("plkn,ln->plk", np.conj(dU), M * w)
+          + np.einsum("lkn,pln->plk", np.conj(U), dM * w + M * dwq[:, np.newaxis]))
+    Q = np.sum(M ** 2 * w, axis=-1)[:, np.newaxis]
+    dQ = np.sum(2 * M * dM * w + M ** 2 * dwq[:, np.newaxis], axis=-1)[:, :, np.newaxis]
+    T = np.abs(o) ** 2 / Q
+    J = 2 * np.real(np.conj(o) * do) / Q - T * dQ / Q
+
+    return T.reshape(shape + (model.No,)), np.moveaxis(J, 0, -1).reshape(shape + (model.No, P))
+
+
+def _trapzw(dx):
+    """Tangents of the trapezoidal weights (see trapzw) for tangents dx (P, n) of the samples."""
+    h = np.diff(dx, axis=-1) / 2
+    w = np.zeros(dx.shape)
+    w[..., :-1] += h
+    w[..., 1:] += h
+    return w
+
+
+def _grid(aperture, options, dpitch, dpositions):
+    """
+    Sampling grid of an aperture row (see Aperture.grid) with the tangents
+    of its samples, for tangents dpitch (P,) and dpositions (P, count):
+    (x, idx, xl, dx, dxl, dspacing).
+    """
+    x, idx = aperture.grid(options.points, options.window)
+    xl = aperture.local(options.points, options.window)
+    h = aperture.spacing(options.points, options.window)
+    # 采样数不变，采样间距随节距缩放
+    dh = dpitch * h / aperture.pitch
+    c = aperture.positions.mean()
+    dx = dpositions.mean(axis=-1)[:, np.newaxis] + np.round((x - c) / h) * dh[:, np.newaxis]
+    dxl = np.round(xl / h) * dh[:, np.newaxis]
+    return x, idx, xl, dx, dxl, dh
+
+
+def _mode(waveguide, lmbda, x, dx, dw):
+    """
+    Unit-power lateral mode averaged over the cells of x (see
+    Aperture.mode), shape (L, n), and its tangent (P, L, n) for tangents
+    dx (P, n) of the samples and dw (P,) of the waveguide width.
+    """
+    na, _, _ = waveguide.materials(lmbda)
+    slab = waveguide.replace(w=np.inf)
+    n1 = slab.index(lmbda)
+    n2 = slab.replace(h=waveguide.t).index(lmbda) if waveguide.t > 0 else na
+    n = waveguide.index(lmbda)
+    # 有效折射率法的横向平板取正交偏振
+    tm = waveguide.polarization.upper() == "TE"
+
+    k0, n, n1, n2 = (np.reshape(v, (-1, 1)) for v in (2 * np.pi / lmbda, n, n1, n2))
+    t = waveguide.w
+    p = (n1 / n2) ** 2 if tm else 1.0
+    kappa = k0 * np.sqrt(n1 ** 2 - n ** 2)
+    gamma = k0 * np.sqrt(n ** 2 - n2 ** 2)
+    phi = np.arctan2(p * gamma, kappa)
+    dkappa = -k0 ** 2 * n / kappa
+    dgamma = k0 ** 2 * n / gamma
+    dphi = p * (kappa * dgamma - gamma * dkappa) / (kappa ** 2 + (p * gamma) ** 2)
+    # 横向谐振条件 kappa t - 2 phi = m pi 的隐函数求导
+    dndt = -kappa / (t * dkappa - 2 * dphi)
+
+    # 单元平均的场（见 slabmode）：各区域原函数在裁剪到该区域的单元端点之差；
+    # TM 电场 E = n f / nx^2，系数及其对 n 的导数
+    if tm:
+        cb = ca = n / n2 ** 2
+        ci = n / n1 ** 2
+        dcb = dca = 1 / n2 ** 2
+        dci = 1 / n1 ** 2
+    else:
+        cb = ci = ca = 1.0
+        dcb = dci = dca = 0.0
+    ct, st = np.cos(kappa * t - phi), np.sin(kappa * t - phi)
+
+    def below(y):
+        u = y + t / 2
+        e = cb * np.cos(phi) * np.exp(gamma * u)
+        F = e / gamma
+        Fn = ((dcb * np.cos(phi) - cb * np.sin(phi) * dphi) * np.exp(gamma * u) / gamma
+              + e * dgamma * (u / gamma - 1 / gamma ** 2))
+        return F, e, e / 2, Fn
+
+    def inside(y):
+        u = y + t / 2
+        cu, su = np.cos(kappa * u - phi), np.sin(kappa * u - phi)
+        F = ci * su / kappa
+        Fn = dci * su / kappa + ci * cu * (dkappa * u - dphi) / kappa - F * dkappa / kappa
+        return F, ci * cu, ci * cu / 2, Fn
+
+    def above(y):
+        v = y - t / 2
+        ev = np.exp(-gamma * v)
+        e = ca * ct * ev
+        F = -e / gamma
+        Ft = ca * kappa * st * ev / gamma - e / 2
+        Fn = (-dca * ct * ev / gamma + ca * st * (t * dkappa - dphi) * ev / gamma
+              + e * dgamma * (v / gamma + 1 / gamma ** 2))
+        return F, e, Ft, Fn
+
+    m, dm = (x[1:] + x[:-1]) / 2, (dx[:, 1:] + dx[:, :-1]) / 2
+    a = np.concatenate([[x[0] - (x[1] - x[0]) / 2], m])
+    b = np.concatenate([m, [x[-1] + (x[-1] - x[-2]) / 2]])
+    da = np.concatenate([dx[:, :1] - (dx[:, 1:2] - dx[:, :1]) / 2, dm], axis=1)
+    db = np.concatenate([dm, dx[:, -1:] + (dx[:, -1:] - dx[:, -2:-1]) / 2], axis=1)
+    dw = dw[:, np.newaxis, np.newaxis]
+    edge = dw[:, :, 0] / 2
+    E, dE = 0.0, 0.0
+    for region, lo, hi, dlo, dhi in ((below, -np.inf, -t / 2, 0 * edge, -edge), (inside, -t / 2, t / 2, -edge, edge),
+                                     (above, t / 2, np.inf, edge, 0 * edge)):
+        for y, dy, sign in ((b, db, 1), (a, da, -1)):
+            # 端点裁剪到区域边界时，切线取边界的切线
+            yc = np.clip(y, lo, hi)
+            dyc = np.where(y < lo, dlo, np.where(y > hi, dhi, dy))
+            F, e, Ft, Fn = region(yc)
+            E = E + sign * F
+            dE = dE + sign * (e * dyc[:, np.newaxis, :] + (Ft + Fn * dndt) * dw)
+    size, dsize = b - a, db - da
+    E = E / size
+    dE = dE / size - E * (dsize / size)[:, np.newaxis, :]
+
+    # 功率归一化（见 pnorm）
+    w, dwq = trapzw(x), _trapzw(dx)
+    P = np.sum(E ** 2 * w, axis=-1)[:, np.newaxis]
+    dP = np.sum(2 * E * dE * w + E ** 2 * dwq[:, np.newaxis], axis=-1)[..., np.newaxis]
+    E = E / np.sqrt(P)
+    return E, dE / np.sqrt(P) - E * dP / (2 * P)
+
+
+def _diffract(k, u, du, xi, zi, wi, xf, zf, dxi, dzi, dwi, dxf, dzf):
+    """
+    Direct diffraction sum (see core.diffract) at medium wave numbers k (L,)
+    and its tangent: the tangent du (P, L, len(xi)) of the source field is
+    propagated by the kernel, and the tangents of the sample coordinates
+    and weights enter through the derivative of the kernel itself.
+    """
+    Dx = xf[:, np.newaxis] - xi
+    Dz = zf[:, np.newaxis] - zi
+    r = np.sqrt(Dx ** 2 + Dz ** 2)
+    g = np.abs(Dz) / r ** 1.5 * wi
+    # dK = K (dDz / Dz - (3/2r + i k) dr + dwi / wi) 对源点和目标点的切线可分离：
+    # 每项是与 K 同形的矩阵乘以（切线 * 源场），不必为每个参数构造核的导数
+    G = np.stack([g, g * (1 / Dz - 1.5 * Dz / r ** 2), g * Dz / r, g * (-1.5 * Dx / r ** 2), g * Dx / r])
+
+    uf = np.empty((k.size, xf.size), dtype=complex)
+    duf = np.empty((du.shape[0], k.size, xf.size), dtype=complex)
+    for j, E in enumerate(_phases(k, r)):
+        K, Z1, Z2, X1, X2 = G * E
+        v = u[j]
+        vz, vx = dzi * v, dxi * v
+        uf[j] = K @ v
+        duf[:, j] = ((du[:, j] + dwi / wi * v) @ K.T
+                     + dzf * (Z1 @ v - 1j * k[j] * (Z2 @ v)) - (vz @ Z1.T - 1j * k[j] * (vz @ Z2.T))
+                     + dxf * (X1 @ v - 1j * k[j] * (X2 @ v)) - (vx @ X1.T - 1j * k[j] * (vx @ X2.T)))
+    C = np.exp(1j * np.pi / 4) * np.sqrt(k / (2 * np.pi))[:, np.newaxis]
+    return uf * C, duf * C
+
+
+def _phases(k, r):
+    """exp(-i k_j r) for every k_j, advanced by recurrence as in core.diffract._direct."""
+    if k.size < 4:
+        for kj in k:
+            yield np.exp(-1j * kj * r)
+        return
+    j = np.arange(k.size)
+    c2, c1, c0 = np.polyfit(j, k, 2)
+    if np.max(np.abs(k - (c0 + c1 * j + c2 * j ** 2))) * r.max() > _TOL:
+        h = k.size // 2
+        yield from _phases(k[:h], r)
+        yield from _phases(k[h:], r)
+        return
+    E = np.exp(-1j * c0 * r)
+    D = np.exp(-1j * (c1 + c2) * r)
+    Q = np.exp(-2j * c2 * r)
+    for _ in j:
+        yield E
+        E = E * D
+        D *= Q
@@ -1,9 +1,18 @@
 import numpy as np
 
-# %%
-import matplotlib
-from matplotlib import pyplot as plt
-import mpld3
+from .Material import Sellmeier
+
+
+class AirModel(Sellmeier):
+    """
+    Refractive index of Air (idealized n=1)
+
+    Thermo-optic coefficient: -9.3e-7 /K, -(n - 1) / T of air at
+    atmospheric pressure (ideal gas)
+    """
+
+    def __init__(self):
+        super().__init__("Air", A=1, dndT=-9.3e-7)
 
 
 def Air(x):
@@ -28,16 +37,3 @@ def Air(x):
         return n.item()
     return n
 
-# %%
-# 测试代码
-lambda_um = np.linspace(0.5, 0.9, 401)
-n = Air(lambda_um)
-
-plt.plot(lambda_um, n)
-plt.xlabel("Wavelength (µm)")
-plt.ylabel("Refractive index")
-plt.grid(True)
-plt.show()
-# mpld3.enable_notebook()
-
-# print(Air(0.6))
@@ -1,33 +1,51 @@
-import numpy as np
-import warnings
+from .Material import Sellmeier
 
 
-def LiTaO3(x):
+class LiTaO3Model(Sellmeier):
     """
     Material model for: LiTaO3 (ordinary refractive index no)
 
     Optical transparency window: 0.45 um – 4.00 um
 
-    INPUT:
-        x - wavelength (micron), scalar or array-like
+        n^2 = A1 + A2 / (x^2 - A3^2) + A4 * x^2
 
-    OUTPUT:
-        n - refractive index (numpy array)
+    is rewritten in generalized Sellmeier form, using
+    A2 / (x^2 - A3^2) = A2 / A3^2 * (x^2 / (x^2 - A3^2) - 1).
+
+    Thermo-optic coefficient: about 4e-6 /K (no, room temperature)
     """
-    x = np.asarray(x, dtype=float)
-
-    # transparency window check
-    if np.any((x < 0.45) | (x > 4.00)):
-        warnings.warn(
-            "Extrapolating Sellmeier equation for LiTaO3 beyond "
-            "optical transparency window of 0.45 um – 4.00 um",
-            RuntimeWarning
-        )
 
     A1 = 4.51224
     A2 = 0.0847522
     A3 = 0.19876
     A4 = -0.0239046
 
-    n = np.sqrt(A1 + A2 / (x**2 - A3**2) + A4 * x**2)
-    return n
+    def __init__(self):
+        b = self.A2 / self.A3 ** 2
+        super().__init__(
+            "LiTaO3",
+            A=self.A1 - b,
+            B=(b,),
+            C=(self.A3,),
+            D=self.A4,
+            range=(0.45, 4.00),
+            dndT=4e-6
+        )
+
+
+_model = LiTaO3Model()
+
+
+def LiTaO3(x):
+    """
+    Material model for: LiTaO3 (ordinary refractive index no)
+
+    Optical transparency window: 0.45 um – 4.00 um
+
+    INPUT:
+        x - wavelength (micron), scalar or array-like
+
+    OUTPUT:
+        n - refractive index (numpy array)
+    """
+    return _model.index(x)
@@ -0,0 +1,258 @@
+import warnings
+
+import numpy as np
+
+from ..Profiler import profiled
+
+
+class Material:
+    """
+    Dispersive material model.
+
+    Subclasses implement _evaluate(x), returning the refractive index and
+    its wavelength derivative in a single vectorized pass. Instances are
+    callable with a wavelength, like the material functions, so they can be
+    used wherever a material is expected (e.g. AWG.core).
+
+    The index is that at the reference temperature T0; at(T) returns the
+    model at another temperature (see Thermal).
+
+    Attributes:
+        name    - material name
+        range   - (min, max) wavelength range of the model (micron)
+        warning - warning category emitted when extrapolating
+        dndT    - thermo-optic coefficient dn/dT (1/K)
+        T0      - reference temperature of the model (K)
+    """
+
+    def __init__(self, name, range=(0.0, np.inf), warning=RuntimeWarning, dndT=0.0, T0=293.15):
+        self.name = name
+        self.range = (float(range[0]), float(range[1]))
+        self.warning = warning
+        self.dndT = float(dndT)
+        self.T0 = float(T0)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+    def __call__(self, x):
+        return self.index(x)
+
+    @profiled("material")
+    def index(self, x):
+        """Refractive index n(x), x being the wavelength in micron."""
+        return self._index(self.validate(x))
+
+    @profiled("material")
+    def dispersion(self, x):
+        """
+        Index, its derivative and the group index in one pass.
+
+        OUTPUT:
+            n  - refractive index
+            dn - dn/dlambda (1/micron)
+            ng - group index n - lambda * dn/dlambda
+        """
+        x = self.validate(x)
+        n, dn = self._evaluate(x)
+        return n, dn, n - x * dn
+
+    def groupindex(self, x):
+        """Group index ng = n - lambda * dn/dlambda."""
+        return self.dispersion(x)[2]
+
+    def thermooptic(self, x):
+        """Thermo-optic coefficient dn/dT (1/K) at wavelength(s) x."""
+        x = self.validate(x)
+        return np.full(x.shape, self.dndT)
+
+    def at(self, T):
+        """Model of the material at temperature T (K), see Thermal."""
+        if T == self.T0:
+            return self
+        return Thermal(self, T)
+
+    def table(self, lmin, lmax, points=1001):
+        """Tabulated copy of the model over [lmin, lmax] (see Tabulated)."""
+        return Tabulated(self, lmin, lmax, points)
+
+    def validate(self, x):
+        """Convert x to a float array and warn once if any value is out of range."""
+        x = np.asarray(x, dtype=float)
+        if x.size and (x.min() < self.range[0] or x.max() > self.range[1]):
+            warnings.warn(
+                f"Extrapolating model equation for {self.name} beyond range of "
+                f"{self.range[0]:g}–{self.range[1]:g} µm",
+                self.warning
+            )
+        return x
+
+    def _index(self, x):
+        return self._evaluate(x)[0]
+
+    def _evaluate(self, x):
+        raise NotImplementedError
+
+
+class Sellmeier(Material):
+    """
+    Generalized Sellmeier model
+
+        n^2 = A + sum(B_i * x^2 / (x^2 - C_i^2)) + D * x^2
+
+    with x the wavelength in micron and C_i the resonance wavelengths.
+    Coefficients are bound once at construction; evaluation is a handful of
+    vectorized array operations.
+
+    Attributes:
+        A, B, C, D - Sellmeier coefficients
+    """
+
+    def __init__(self, name, A=1.0, B=(), C=(), D=0.0, range=(0.0, np.inf), warning=RuntimeWarning,
+                 dndT=0.0, T0=293.15):
+        super().__init__(name, range, warning, dndT, T0)
+        self.A = float(A)
+        self.B = tuple(float(b) for b in B)
+        self.C = tuple(float(c) for c in C)
+        self.D = float(D)
+
+        if len(self.B) != len(self.C):
+            raise ValueError("B and C must have the same length")
+
+    def _key(self):
+        return (type(self), self.name, self.A, self.B, self.C, self.D)
+
+    def __eq__(self, other):
+        return isinstance(other, Sellmeier) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _state(self):
+        # 物理内容（系数），与类名和名称无关，用于稳定哈希（见 awg.digest）
+        return ("Sellmeier", self.A, self.B, self.C, self.D)
+
+    def _index(self, x):
+        x2 = x * x
+        f = self.A + self.D * x2
+        for b, c in zip(self.B, self.C):
+            f = f + b * x2 / (x2 - c * c)
+        return np.sqrt(f)
+
+    def _evaluate(self, x):
+        x2 = x * x
+        f = self.A + self.D * x2
+        df = 2 * self.D * x
+        for b, c in zip(self.B, self.C):
+            q = 1 / (x2 - c * c)
+            f = f + b * x2 * q
+            df = df - 2 * b * x * c * c * q * q
+        n = np.sqrt(f)
+        return n, df / (2 * n)
+
+
+class Tabulated(Material):
+    """
+    Tabulated material: fast interpolated copy of another model.
+
+    n and dn/dlambda are sampled once on a uniform wavelength grid and
+    evaluated with cubic Hermite interpolation, which reproduces both the
+    index and its derivative. The range is validated when the table is
+    built; evaluating outside of it raises ValueError.
+
+    Attributes:
+        source - tabulated Material
+        x      - wavelength grid (micron)
+        n, dn  - tabulated index and derivative
+    """
+
+    def __init__(self, source, lmin, lmax, points=1001):
+        if not lmin < lmax:
+            raise ValueError(f"lmin={lmin} must be < lmax={lmax}")
+        if points < 2:
+            raise ValueError(f"points={points} must be >= 2")
+        super().__init__(f"{source.name} (tabulated)", (lmin, lmax), source.warning, source.dndT, source.T0)
+        self.source = source
+        self.x = np.linspace(lmin, lmax, int(points))
+        self.n, self.dn, _ = source.dispersion(self.x)
+        self._h = self.x[1] - self.x[0]
+
+        # 每个区间的三次多项式系数（Horner 形式），n = ((a t + b) t + c) t + d
+        n0, n1 = self.n[:-1], self.n[1:]
+        d0, d1 = self.dn[:-1] * self._h, self.dn[1:] * self._h
+        self._coef = np.stack([2 * n0 - 2 * n1 + d0 + d1, 3 * n1 - 3 * n0 - 2 * d0 - d1, d0, n0])
+
+    def _state(self):
+        return ("Tabulated", self.source, self.range, self.x.size)
+
+    def validate(self, x):
+        x = np.asarray(x, dtype=float)
+        if x.size and (x.min() < self.range[0] or x.max() > self.range[1]):
+            raise ValueError(f"wavelength outside of the table range {self.range[0]:g}–{self.range[1]:g} µm")
+        return x
+
+    def _locate(self, x):
+        u = (x - self.x[0]) / self._h
+        i = np.clip(u.astype(int), 0, self.x.size - 2)
+        return i, u - i
+
+    def _index(self, x):
+        i, t = self._locate(x)
+        a, b, c, d = self._coef[:, i]
+        return ((a * t + b) * t + c) * t + d
+
+    def _evaluate(self, x):
+        # 三次 Hermite 插值及其导数
+        i, t = self._locate(x)
+        a, b, c, d = self._coef[:, i]
+        n = ((a * t + b) * t + c) * t + d
+        dn = ((3 * a * t + 2 * b) * t + c) / self._h
+        return n, dn
+
+
+class Thermal(Material):
+    """
+    Material at another temperature, to first order in the temperature:
+
+        n(x, T) = n(x, T0) + dndT (T - T0)
+
+    with the reference temperature T0 and the thermo-optic coefficient dndT
+    of the source model. Models with their own temperature dependence
+    (e.g. SiModel) return a model at T from at() instead.
+
+    Attributes:
+        source - Material at its reference temperature
+        T      - temperature (K)
+        dn     - index offset dndT (T - T0)
+    """
+
+    def __init__(self, source, T):
+        super().__init__(f"{source.name} @ {T:g} K", source.range, source.warning, source.dndT, T)
+        self.source = source
+        self.T = float(T)
+        self.dn = source.dndT * (self.T - source.T0)
+
+    def _key(self):
+        return (type(self), self.source, self.dn)
+
+    def __eq__(self, other):
+        return isinstance(other, Thermal) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _state(self):
+        return ("Thermal", self.source, self.dn)
+
+    def at(self, T):
+        return self.source.at(T)
+
+    def validate(self, x):
+        return self.source.validate(x)
+
+    def _index(self, x):
+        return self.source._index(x) + self.dn
+
+    def _evaluate(self, x):
+        n, dn = self.source._evaluate(x)
+        return n + self.dn, dn
@@ -1,51 +1,78 @@
-import numpy as np
 import warnings
+from functools import lru_cache
 
+import numpy as np
 
-def Si(x, T=295):
+from .Material import Sellmeier
+
+
+def _coefficients(T):
+    """Sellmeier strengths and resonance wavelengths of Si at temperature T (K)."""
+    S1 = np.polyval([3.4469e-12, -5.823e-09, 4.2169e-06, -0.00020802, 10.491], T)
+    S2 = np.polyval([-1.3509e-06, 0.0010594, -0.27872, 29.166, -1346.6], T)
+    S3 = np.polyval([103.24, 678.41, -76158, -1.7621e6, 4.4283e7], T)
+
+    x1 = np.polyval([2.3248e-14, -2.5105e-10, 1.6713e-07, -1.1423e-05, 0.29971], T)
+    x2 = np.polyval([-1.1321e-06, 0.001175, -0.35796, 42.389, -3517.1], T)
+    x3 = np.polyval([23.577, -39.37, -6907.4, -1.4498e5, 1.714e6], T)
+    return (S1, S2, S3), (x1, x2, x3)
+
+
+class SiModel(Sellmeier):
     """
     Material model (Sellmeier) for: Si
     T range: 20 K – 300 K
     lambda range: 1.1 um – 5.6 um
 
-    INPUT:
-        x - wavelength (micron), scalar or array-like
-        T - temperature (K), default = 295
+    The six temperature polynomials are evaluated once, when the model is
+    built for a temperature T; evaluating the index is then a plain
+    Sellmeier evaluation. at(T) returns the model built for T, and the
+    thermo-optic coefficient is the temperature derivative of the model
+    (dndT holds its value at 1.55 um).
 
-    OUTPUT:
-        n - refractive index (numpy array or scalar)
+    Attributes:
+        T - temperature (K)
     """
 
-    x = np.asarray(x, dtype=float)
+    def __init__(self, T=295):
+        # 温度范围检查
+        if (T < 20) or (T > 300):
+            warnings.warn(
+                "Extrapolating model equation for Si beyond temperature range of 20 K – 300 K",
+                RuntimeWarning
+            )
 
-    # 波长范围检查
-    if np.any((x < 1.1) | (x > 5.6)):
-        warnings.warn(
-            "Extrapolating model equation for Si beyond range of 1.1 um – 5.6 um",
-            RuntimeWarning
-        )
+        B, C = _coefficients(T)
+        super().__init__("Si", A=1, B=B, C=C, range=(1.1, 5.6), T0=T)
+        self.T = T
+        self.dndT = float(self.thermooptic(1.55))
 
-    # 温度范围检查
-    if (T < 20) or (T > 300):
-        warnings.warn(
-            "Extrapolating model equation for Si beyond temperature range of 20 K – 300 K",
-            RuntimeWarning
-        )
+    def thermooptic(self, x):
+        """dn/dT (1/K) at wavelength(s) x, central difference of the temperature model."""
+        x = self.validate(x)
+        lo, hi = (Sellmeier("Si", 1, *_coefficients(T)) for T in (self.T - 0.5, self.T + 0.5))
+        return hi._index(x) - lo._index(x)
 
-    S1 = np.polyval([3.4469e-12, -5.823e-09, 4.2169e-06, -0.00020802, 10.491], T)
-    S2 = np.polyval([-1.3509e-06, 0.0010594, -0.27872, 29.166, -1346.6], T)
-    S3 = np.polyval([103.24, 678.41, -76158, -1.7621e6, 4.4283e7], T)
+    def at(self, T):
+        return self if T == self.T else _model(T)
 
-    x1 = np.polyval([2.3248e-14, -2.5105e-10, 1.6713e-07, -1.1423e-05, 0.29971], T)
-    x2 = np.polyval([-1.1321e-06, 0.001175, -0.35796, 42.389, -3517.1], T)
-    x3 = np.polyval([23.577, -39.37, -6907.4, -1.4498e5, 1.714e6], T)
 
-    # ===== Sellmeier 公式 =====
-    n = np.sqrt(
-        1
-        + S1 * x**2 / (x**2 - x1**2)
-        + S2 * x**2 / (x**2 - x2**2)
-        + S3 * x**2 / (x**2 - x3**2)
-    )
+@lru_cache(maxsize=256)
+def _model(T):
+    return SiModel(T)
 
-    return n
+
+def Si(x, T=295):
+    """
+    Material model (Sellmeier) for: Si
+    T range: 20 K – 300 K
+    lambda range: 1.1 um – 5.6 um
+
+    INPUT:
+        x - wavelength (micron), scalar or array-like
+        T - temperature (K), default = 295
+
+    OUTPUT:
+        n - refractive index (numpy array or scalar)
+    """
+    return _model(T).index(x)
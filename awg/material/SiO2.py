@@ -1,5 +1,25 @@
-import numpy as np
-import warnings
+from .Material import Sellmeier
+
+
+class SiO2Model(Sellmeier):
+    """
+    Sellmeier model for SiO2 (Fused Silica) at 20°C
+    Valid wavelength range: 0.21 µm – 6.7 µm
+    Thermo-optic coefficient: 1.0e-5 /K (near infrared)
+    """
+
+    def __init__(self):
+        super().__init__(
+            "SiO2",
+            B=(0.6961663, 0.4079426, 0.8974794),
+            C=(0.0684043, 0.1162414, 9.8961610),
+            range=(0.21, 6.7),
+            warning=UserWarning,
+            dndT=1.0e-5
+        )
+
+
+_model = SiO2Model()
 
 
 def SiO2(x):
@@ -17,19 +37,7 @@ def SiO2(x):
     n : float or ndarray
         Refractive index
     """
-    x = np.asarray(x, dtype=float)  # 支持标量和数组
-
-    # 检查波长范围
-    if np.any(x < 0.21) or np.any(x > 6.7):
-        warnings.warn("Extrapolating Sellmeier equation for SiO2 beyond range of 0.21–6.7 µm", UserWarning)
-
-    # Sellmeier 方程
-    n = np.sqrt(
-        1
-        + 0.6961663 / (1 - (0.0684043 / x) ** 2)
-        + 0.4079426 / (1 - (0.1162414 / x) ** 2)
-        + 0.8974794 / (1 - (9.8961610 / x) ** 2)
-    )
+    n = _model.index(x)
 
     # 如果输入是标量，返回标量
     if n.size == 1:
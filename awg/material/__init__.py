@@ -2,9 +2,10 @@
 material 是材料封装库
 """
 
-from .Air import Air
-from .SiO2 import SiO2
-from .Si import Si
-from .Si3N4 import Si3N4
-from .LiTaO3 import LiTaO3
+from .Material import Material, Sellmeier, Tabulated, Thermal
+from .Air import Air, AirModel
+from .SiO2 import SiO2, SiO2Model
+from .Si import Si, SiModel
+from .Si3N4 import Si3N4, Si3N4Model
+from .LiTaO3 import LiTaO3, LiTaO3Model
 
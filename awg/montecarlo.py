@@ -0,0 +1,167 @@
+import copy
+import os
+
+import numpy as np
+
+from .SimulationOptions import SimulationOptions
+from .StarCoupler import StarCoupler
+from .analyse import analyse
+from .aw import aw
+from .focus import focus
+from .fpr1 import fpr1
+from .fpr2 import fpr2
+from .iw import iw
+from .ow import ow
+from .parallel import parallel
+from .spectrum import spectrum
+
+
+# 每次试验输出的指标列
+COLUMNS = ("dw", "dh", "phase_rms", "insertion_loss", "nonuniformity",
+           "adjacent_crosstalk", "nonadjacent_crosstalk", "bandwidth_3db", "center_shift")
+
+
+def montecarlo(model, trials=100, phase=0.0, width=0.0, thickness=0.0, lmbda=None,
+               bandwidth=None, points=250, _input=0, seed=None, workers=None,
+               options=None, callback=None):
+    """
+    Monte-Carlo fabrication tolerance analysis
+
+    DESCRIPTION:
+        Simulates the spectrum of many randomly perturbed copies of an AWG
+        and reduces every trial to a few figures of merit (see analyse).
+        Each trial draws
+            - independent phase errors for every array arm, N(0, phase),
+            - one array waveguide width offset dw, N(0, width),
+            - one core thickness offset dh, N(0, thickness),
+        while the layout (arm length increment dl, apertures, focal curves)
+        keeps its nominal value. Since the sampling grids only depend on
+        the layout, the star coupler kernels are built once, by the nominal
+        run, and copied into every worker process when the pool starts
+        (see parallel), so that no worker rebuilds them. Without width
+        and thickness variations only the arm phases change, so the field
+        on the input grating circle (fpr1) of the nominal design is handed
+        over as well and every trial only reruns the array (see aw) and the
+        stages after it.
+
+        Trial i uses the random stream SeedSequence(entropy, spawn_key=(i,)),
+        so a trial is reproducible on its own and the result does not depend
+        on the number of workers or on the order in which trials complete.
+        Trials are dispatched to a process pool in chunks and their metrics
+        are written into the result columns as the chunks come back.
+
+    INPUTS:
+        model     - nominal AWG model
+        trials    - number of Monte-Carlo trials (default 100)
+        phase     - standard deviation of the arm phase errors (rad)
+        width     - standard deviation of the array waveguide width (micron)
+        thickness - standard deviation of the core thickness (micron)
+        lmbda, bandwidth, points, _input
+                  - wavelength sweep, as in spectrum
+        seed      - (optional) root seed (int or SeedSequence entropy)
+        workers   - (optional) number of processes, default os.cpu_count();
+                    1 runs the trials in this process
+        options   - (optional) SimulationOptions
+        callback  - (optional) callback(done, trials) after every chunk
+
+    OUTPUT:
+        results - dict of columns, each of shape (trials,):
+                  'dw', 'dh'              : drawn width and thickness offsets
+                  'phase_rms'             : RMS of the drawn phase errors
+                  'insertion_loss'        : worst channel insertion loss (dB)
+                  'nonuniformity'         : insertion loss spread (dB)
+                  'adjacent_crosstalk'    : worst adjacent crosstalk (dB)
+                  'nonadjacent_crosstalk' : worst non-adjacent crosstalk (dB)
+                  'bandwidth_3db'         : mean 3 dB bandwidth (micron)
+                  'center_shift'          : mean channel center shift (micron)
+                  plus 'entropy' (root seed) and 'nominal' (analyse of the
+                  unperturbed design).
+    """
+    options = options or SimulationOptions()
+    if trials < 1:
+        raise ValueError(f"trials={trials} must be >= 1")
+    if min(phase, width, thickness) < 0:
+        raise ValueError("standard deviations must be >= 0")
+    workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if workers < 1:
+        raise ValueError(f"workers={workers} must be >= 1")
+
+    entropy = np.random.SeedSequence(seed).entropy
+
+    # 名义设计：固定 dl 和扫描波长，同时建立共享的星型耦合器几何核
+    model = copy.copy(model)
+    model.dl = model.dl
+    nominal = spectrum(model, lmbda, bandwidth, points, _input, options)
+    reference = analyse(nominal)
+    couplers = [(key, c) for key, c in StarCoupler._cache.items() if c._kernel is not None]
+    fields = None
+    if width == 0 and thickness == 0:
+        # 只有相位误差时，各试验共用名义设计的 fpr1 场
+        wavelength = nominal["wavelength"]
+        fields = []
+        for i in range(0, wavelength.size, options.batch_size):
+            lmbda = wavelength[i:i + options.batch_size]
+            fields.append((lmbda, fpr1(model, lmbda, iw(model, lmbda, _input, options=options), options)))
+    state = (model, options, nominal["wavelength"], _input, reference["center"],
+             (phase, width, thickness), entropy, fields, couplers)
+
+    results = {name: np.empty(trials) for name in COLUMNS}
+    done = 0
+
+    def store(rows, chunk):
+        nonlocal done
+        for name, column in zip(COLUMNS, rows.T):
+            results[name][chunk.start:chunk.stop] = column
+        done += len(chunk)
+        if callback is not None:
+            callback(done, trials)
+
+    parallel(_run, state, trials, workers, store, _setup)
+
+    results["entropy"] = entropy
+    results["nominal"] = reference
+    return results
+
+
+def _setup(state):
+    """Installs the nominal star coupler kernels in a worker process."""
+    for key, coupler in state[-1]:
+        StarCoupler._cache[key] = coupler
+    while len(StarCoupler._cache) > StarCoupler.maxsize:
+        StarCoupler._cache.popitem(last=False)
+
+
+def _run(state, chunk):
+    """Metrics of the trials in chunk, shape (len(chunk), len(COLUMNS))."""
+    model, options, wavelength, _input, center, (phase, width, thickness), entropy, fields, _ = state
+    rows = np.empty((len(chunk), len(COLUMNS)))
+
+    for row, i in zip(rows, chunk):
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(i,)))
+        dphi = rng.normal(0.0, phase, model.N)
+        dw, dh = rng.normal(0.0, (width, thickness))
+
+        if fields is None:
+            trial = copy.copy(model)
+            trial.w = model.w + dw
+            trial.h = model.h + dh
+            trial.phase_error = dphi if model.phase_error is None else model.phase_error + dphi
+            m = analyse(spectrum(trial, wavelength, _input=_input, options=options))
+        else:
+            T = np.concatenate([_array(model, lmbda, F, options, dphi) for lmbda, F in fields])
+            m = analyse({"wavelength": wavelength, "transmission": T})
+        row[:] = (dw, dh, np.sqrt(np.mean(dphi ** 2)),
+                  np.max(m["insertion_loss"]), m["nonuniformity"],
+                  np.max(m["adjacent_crosstalk"]), np.max(m["nonadjacent_crosstalk"]),
+                  np.nanmean(m["bandwidth_3db"]), np.nanmean(m["center"] - center))
+    return rows
+
+
+def _array(model, lmbda, F, options, phase_error):
+    """Transmission from the nominal fpr1 field F with additional arm phase errors."""
+    F = aw(model, lmbda, F, options, phase_error=phase_error)
+    channels = None
+    if options.coupling_window is not None:
+        channels = focus(model, lmbda, F, options)[1]
+    F = fpr2(model, lmbda, F, options, channels)
+    return ow(model, lmbda, F, options, channels)
@@ -0,0 +1,188 @@
+import copy
+
+import numpy as np
+
+from .SimulationOptions import SimulationOptions
+from .analyse import analyse
+from .jacobian import jacobian
+from .spectrum import spectrum
+
+
+def optimize(model, params=("wi", "wo", "g", "R"), bounds=None, passband=0.5,
+             weights=(1.0, 0.1, 0.1), points=None, _input=0, maxiter=50,
+             tol=1e-4, options=None, callback=None):
+    """
+    Gradient-based AWG design optimization
+
+    DESCRIPTION:
+        Tunes the geometry of an AWG for flat passbands and low crosstalk
+        on the channel grid of the initial design. The merit function is
+
+            weights[0] * ripple + weights[1] * crosstalk + weights[2] * loss
+
+        averaged over the output channels, where, inside the passband of
+        channel k (passband times the channel spacing, centered on the
+        channel center of the initial design),
+            ripple    - RMS deviation of the channel transmission from its
+                        mean, in dB (0 for a flat-top passband),
+            crosstalk - power of all other channels relative to channel k,
+                        integrated over the passband (dB),
+            loss      - mean insertion loss (dB).
+        Each evaluation is one simulation of the channel band with its
+        derivatives (see jacobian), and the gradient drives a bounded
+        quasi-Newton search (L-BFGS-B) in parameters scaled by their
+        initial values.
+
+        The arm count N may be listed in params: it is integer, so it is
+        searched by steps N +- s (s halving from N / 8 down to 1) between
+        continuous searches, one evaluation per candidate.
+
+    INPUTS:
+        model    - initial AWG model (not modified)
+        params   - parameters to tune: names from jacobian.PARAMETERS
+                   and optionally 'N'
+        bounds   - (optional) dict name -> (low, high); by default every
+                   continuous parameter stays within a factor 0.5 .. 1.5
+                   of its initial value, and the input and output widths
+                   below the waveguide spacing (wider tapers would overlap
+                   and change the pitch)
+        passband - passband width in units of the channel spacing
+        weights  - weights of ripple, crosstalk and loss
+        points   - (optional) wavelength samples over the channel band,
+                   default 16 per channel
+        _input   - input waveguide index (default 0)
+        maxiter  - iterations of every continuous search
+        tol      - relative change of the merit at which a search stops
+        options  - (optional) SimulationOptions
+        callback - (optional) callback(evaluations, merit, values) after
+                   every evaluation
+
+    OUTPUT:
+        results - dict with
+                  'model'        : optimized copy of the model, with the
+                                   aperture sample counts of the initial
+                                   design (see AWG.freeze)
+                  'params'       : dict of the optimized parameter values
+                  'merit'        : merit of the initial and optimized design
+                  'ripple', 'crosstalk', 'loss'
+                                 : per channel figures of the optimized
+                                   design (dB), shape (No,)
+                  'wavelength', 'transmission'
+                                 : optimized spectrum over the channel band
+                  'history'      : merit of every evaluation
+                  'evaluations'  : number of simulations
+                  'success', 'message' : status of the last search
+    """
+    from scipy.optimize import minimize
+
+    options = options or SimulationOptions()
+    params = tuple(params)
+    continuous = tuple(p for p in params if p != "N")
+    # 孔径采样数固定为初始设计的值，优化过程中透射率随宽度光滑变化
+    model = model.freeze(options)
+    # 参数变化时通道栅格保持不变
+    model.dl = model.dl
+    x0 = np.array([float(getattr(model, p)) for p in continuous])
+    if np.any(x0 == 0):
+        raise ValueError("parameters with an initial value of 0 cannot be scaled, "
+                         "use a non-zero start value")
+
+    # 通道栅格：初始设计的通道中心与间距
+    a = analyse(spectrum(model, _input=_input, points=32 * model.No, options=options))
+    center = a["center"]
+    spacing = np.abs(np.mean(np.diff(center)))
+    points = 16 * model.No if points is None else int(points)
+    lmbda = np.linspace(center.min() - spacing, center.max() + spacing, points)
+    bands = np.abs(lmbda[:, np.newaxis] - center) <= passband * spacing / 2
+    if np.any(bands.sum(axis=0) < 2):
+        raise ValueError(f"points={points} leave fewer than two samples in a passband")
+
+    defaults = {p: (0.5 * v, 1.5 * v) for p, v in zip(continuous, x0)}
+    # 锥形波导宽度不超过波导间距（否则节距改为宽度，采样网格跳变）
+    for w, pitch, count in (("wi", "di", model.Ni), ("wo", "do", model.No)):
+        if w in defaults and pitch not in params and count > 1 and getattr(model, pitch) > getattr(model, w):
+            defaults[w] = (defaults[w][0], min(defaults[w][1], getattr(model, pitch)))
+    defaults.update(bounds or {})
+    limits = [tuple(sorted(np.array(defaults[p], dtype=float) / v)) for p, v in zip(continuous, x0)]
+    history, last = [], {}
+
+    def evaluate(trial, x):
+        key = (trial.N, x.tobytes())
+        if key not in last:
+            for p, v in zip(continuous, x * x0):
+                setattr(trial, p, v)
+            T, J = jacobian(trial, lmbda, continuous, _input, options)
+            f, g, figures = _merit(T, bands, weights)
+            history.append(f)
+            if callback is not None:
+                callback(len(history), f, dict(zip(params, [getattr(trial, p) for p in params])))
+            # 只保留最近一次，L-BFGS-B 常在同一点重复求值
+            last.clear()
+            last[key] = f, np.einsum("ln,lnp->p", g, J) * x0, T, figures
+        return last[key]
+
+    x, result = np.ones(x0.size), None
+    initial = evaluate(copy.copy(model), x)[0]
+    step = max(model.N // 8, 1)
+    while True:
+        trial = copy.copy(model)
+        result = minimize(lambda y: evaluate(trial, y)[:2], x, jac=True, method="L-BFGS-B",
+                          bounds=limits, options={"maxiter": maxiter, "ftol": tol})
+        x = result.x
+        best = result.fun
+        if "N" not in params:
+            break
+        # 阵列波导数为整数：在连续参数最优处按步长搜索
+        moved = False
+        while step >= 1 and not moved:
+            for N in (model.N - step, model.N + step):
+                if N < 2:
+                    continue
+                trial = copy.copy(model)
+                trial.N = N
+                f = evaluate(trial, x)[0]
+                if f < best:
+                    best, model.N, moved = f, N, True
+            if not moved:
+                step //= 2
+        if not moved:
+            break
+
+    for p, v in zip(continuous, x * x0):
+        setattr(model, p, v)
+    f, _, T, figures = evaluate(model, x)
+    return {
+        "model": model,
+        "params": {p: getattr(model, p) for p in params},
+        "merit": (initial, f),
+        **figures,
+        "wavelength": lmbda,
+        "transmission": T,
+        "history": np.array(history),
+        "evaluations": len(history),
+        "success": bool(result.success),
+        "message": str(result.message),
+    }
+
+
+def _merit(T, bands, weights):
+    """Merit of a spectrum T (L, No), its gradient dT and the per channel figures."""
+    c = 10 / np.log(10)
+    No = T.shape[1]
+    n = bands.sum(axis=0)
+    dB = c * np.log(T)
+
+    mean = np.sum(dB * bands, axis=0) / n
+    loss = -mean
+    dev = (dB - mean) * bands
+    ripple = np.sqrt(np.sum(dev ** 2, axis=0) / n)
+    # 通道 k 通带内其余通道的总功率与通道 k 功率之比
+    own = np.sum(T * bands, axis=0)
+    leak = bands.T @ T.sum(axis=1) - own
+    crosstalk = c * np.log(leak / own)
+
+    w = np.asarray(weights, dtype=float) / No
+    f = w[0] * ripple.sum() + w[1] * crosstalk.sum() + w[2] * loss.sum()
+    g = (w[0] * dev / (n * np.where(ripple > 0, ripple, 1.0)) - w[2] * bands / n) * c / T
+    g = g + w[1] * c * ((bands @ (1 / leak))[:, np.newaxis] - bands / leak - bands / own)
+    return f, g, {"ripple": ripple, "crosstalk": crosstalk, "loss": loss}
@@ -0,0 +1,73 @@
+import numpy as np
+
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .core.overlap import overlaps
+from .core.trapzw import trapzw
+
+
+@profiled("ow")
+def ow(model, lmbda, F0, options=None, channels=None, amplitude=False):
+    """
+    Output waveguides
+
+    DESCRIPTION:
+        Power coupled from the field on the output focal curve into every
+        output waveguide.
+
+        Given channels (see focus), only the marked output waveguides are
+        evaluated and the others get a transmission of 0.
+
+        With amplitude set, the complex amplitudes of the output modes are
+        returned instead (the overlap of the field with the unit-power
+        mode, whose squared magnitude is the transmission), as needed for
+        a transfer matrix (see sparameters).
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        F0      - Field on the output focal curve (see fpr2)
+        options - (optional) SimulationOptions
+        channels - (optional) boolean (..., *lmbda.shape, No) mask of the
+                   output waveguides to evaluate
+        amplitude - (optional) return complex mode amplitudes
+
+    OUTPUT:
+        T - power transmission (or complex amplitude), shape
+            (..., *lmbda.shape, No), the leading axes being those of F0
+            (one per input port, see iw)
+    """
+    options = options or SimulationOptions()
+
+    aperture = model.output_aperture()
+    x, idx = aperture.grid(options.points, options.window, options.tolerance)
+    if not np.allclose(x, F0.x):
+        raise ValueError("F0 is not sampled on the output aperture grid")
+    xl, M = aperture.mode(lmbda, options.points, options.window, options.tolerance)
+    w = trapzw(xl)
+    if amplitude:
+        # 与单位功率模式的重叠积分
+        M = np.conj(M) * w / np.sqrt(np.sum(np.abs(M) ** 2 * w, axis=-1, keepdims=True))
+
+    if channels is not None:
+        shape = np.broadcast_shapes(F0.E.shape[:-1], np.shape(lmbda))
+        E = np.broadcast_to(F0.E, shape + x.shape).reshape(-1, x.size)
+        M = np.broadcast_to(M, shape + xl.shape).reshape(-1, xl.size)
+        j, k = np.nonzero(np.broadcast_to(channels, shape + idx.shape[:1]).reshape(E.shape[0], -1))
+        # 只计算焦点附近的 (波长, 输出波导) 对
+        U = E[j[:, np.newaxis], idx[k]]
+        if amplitude:
+            a = np.zeros((E.shape[0], idx.shape[0]), dtype=complex)
+            a[j, k] = np.sum(U * M[j], axis=-1)
+            return a.reshape(shape + idx.shape[:1])
+        t = overlaps(xl, U[:, np.newaxis, :], M[j, np.newaxis, :], w=w)[:, 0, 0]
+        T = np.zeros((E.shape[0], idx.shape[0]))
+        T[j, k] = np.sum(np.abs(U) ** 2 * w, axis=-1) * t ** 2
+        return T.reshape(shape + idx.shape[:1])
+
+    # 每个输出波导窗口内的场与该波导模式的重叠，(..., No)
+    U = F0.E[..., idx]
+    if amplitude:
+        return np.einsum("...jn,...n->...j", U, M)
+    t = overlaps(xl, U, M[..., np.newaxis, :], w=w)[..., 0]
+    return np.sum(np.abs(U) ** 2 * w, axis=-1) * t ** 2
@@ -0,0 +1,55 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+def parallel(run, state, count, workers, store, setup=None):
+    """
+    Chunked process-pool map
+
+    DESCRIPTION:
+        Splits the items range(count) into about 4 chunks per worker and
+        calls run(state, chunk) on every chunk, in a pool of worker
+        processes, handing each result to store(result, chunk) in this
+        process as the chunks come back (in any order).
+
+        The read-only state is passed to every worker once, when the pool
+        starts (copied, or inherited on fork), and kept there in a module
+        global for the lifetime of the pool, after setup(state) if given.
+        With one worker or one chunk, run is called directly in this
+        process with state and nothing is kept.
+
+    INPUTS:
+        run     - function run(state, chunk) of module level (picklable)
+        state   - read-only arguments of run
+        count   - number of items
+        workers - number of processes
+        store   - callback store(result, chunk) of this process
+        setup   - (optional) function setup(state) of module level, run
+                  once in every worker before its first chunk
+    """
+    size = max(1, int(np.ceil(count / (4 * workers))))
+    chunks = [range(i, min(i + size, count)) for i in range(0, count, size)]
+    if workers == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            store(run(state, chunk), chunk)
+        return
+    with ProcessPoolExecutor(workers, initializer=_initialize, initargs=(setup, state)) as pool:
+        futures = {pool.submit(_call, run, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            store(future.result(), futures[future])
+
+
+# 工作进程的只读状态，由 _initialize 在每个工作进程中设置一次
+_state = None
+
+
+def _initialize(setup, state):
+    global _state
+    if setup is not None:
+        setup(state)
+    _state = state
+
+
+def _call(run, chunk):
+    return run(_state, chunk)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .iw import iw
+from .fpr1 import fpr1
+from .aw import aw
+from .focus import focus
+from .fpr2 import fpr2
+from .ow import ow
+from .thermal import thermal
+
+
+@profiled("simulate")
+def simulate(model, lmbda, _input=0, u=None, options=None, cache=None, temperature=None):
+    """
+    AWG simulation
+
+    DESCRIPTION:
+        Runs the full iw -> fpr1 -> aw -> fpr2 -> ow chain. lmbda may be a
+        vector, in which case every stage propagates the whole batch of
+        wavelengths at once as (wavelength x sample) arrays.
+
+        With options.coupling_window set, fpr2 and ow only evaluate the
+        output waveguides near the focal spots found by focus (see
+        couplings for an estimate of the truncation error).
+
+        Given a sequence of input indices (all ports of an N x N router,
+        for instance), every port is propagated in the same pass: the
+        kernels of both star couplers and the arm modes are evaluated once
+        per wavelength and applied to all ports together, which gives the
+        whole transfer matrix at a fraction of the cost of one simulation
+        per port (the temperature sweep and the result cache still run
+        the ports one by one).
+
+        Given temperatures, the model is simulated at each of them (see
+        AWG.at) by the temperature sweep of thermal, which computes the
+        temperature independent parts once.
+
+    INPUTS:
+        model   - AWG model
+        lmbda   - wavelength(s) (micron), scalar or vector
+        _input  - input waveguide index (default 0), or a sequence of P
+                  indices
+        u       - (optional) custom input field (see iw)
+        options - (optional) SimulationOptions
+        cache   - (optional) ResultCache; wavelengths already stored for
+                  this model and options are read back instead of being
+                  simulated (not used with a custom input field u)
+        temperature - (optional) temperature(s) (K), scalar or vector
+
+    OUTPUT:
+        T - power transmission to every output, shape (*lmbda.shape, No),
+            or (*temperature.shape, *lmbda.shape, No) given temperatures,
+            with a leading axis of length P for a sequence of inputs
+    """
+    options = options or SimulationOptions()
+    if options.profile is not None and not options.profile.active:
+        with options.profile:
+            return simulate(model, lmbda, _input, u, options, cache, temperature)
+    lmbda = np.asarray(lmbda, dtype=float)
+    if np.ndim(_input) > 0 and (temperature is not None or cache is not None):
+        return np.stack([simulate(model, lmbda, i, u, options, cache, temperature) for i in _input])
+    if temperature is not None:
+        if cache is not None:
+            raise ValueError("cache is not supported with temperature")
+        return thermal(model, lmbda, temperature, _input, u, options)
+    if cache is not None and u is None:
+        return cache.simulate(model, lmbda, _input, options)
+
+    F = iw(model, lmbda, _input, u, options)
+    F = fpr1(model, lmbda, F, options)
+    F = aw(model, lmbda, F, options)
+    channels = None
+    if options.coupling_window is not None:
+        channels = focus(model, lmbda, F, options)[1]
+    F = fpr2(model, lmbda, F, options, channels)
+    return ow(model, lmbda, F, options, channels)
@@ -0,0 +1,72 @@
+import numpy as np
+
+from .Profiler import profiled
+from .SMatrix import SMatrix
+from .SimulationOptions import SimulationOptions
+from .iw import iw
+from .fpr1 import fpr1
+from .aw import aw
+from .focus import focus
+from .fpr2 import fpr2
+from .ow import ow
+
+
+@profiled("sparameters")
+def sparameters(model, lmbda=None, bandwidth=None, points=250, options=None):
+    """
+    Scattering matrix of all ports
+
+    DESCRIPTION:
+        Complex transfer matrix from every input waveguide to every output
+        waveguide over a wavelength band: the amplitudes of the output
+        modes (see ow) with all inputs propagated in one pass per batch of
+        options.batch_size wavelengths (see iw). The ports are numbered
+        inputs first, then outputs; the device is reciprocal and the star
+        couplers are taken as reflection free, so S[out, in] = S[in, out]
+        and the other entries are 0. Phases follow the exp(i omega t)
+        convention of the circuit simulators (propagation exp(-i k L)).
+
+        The result can be written to a binary file or to Touchstone and
+        fitted by a pole-residue model (see SMatrix).
+
+    INPUTS:
+        model     - AWG model
+        lmbda     - center wavelength (default model.lambda_c), or an
+                    explicit vector of wavelengths to simulate
+        bandwidth - sweep width (micron), default one free spectral range
+        points    - number of wavelength points (default 250)
+        options   - (optional) SimulationOptions
+
+    OUTPUT:
+        S - SMatrix of Ni + No ports
+    """
+    options = options or SimulationOptions()
+    if options.profile is not None and not options.profile.active:
+        with options.profile:
+            return sparameters(model, lmbda, bandwidth, points, options)
+
+    if lmbda is not None and np.ndim(lmbda) > 0:
+        wavelength = np.asarray(lmbda, dtype=float).reshape(-1)
+    else:
+        lc = model.lambda_c if lmbda is None else float(lmbda)
+        if bandwidth is None:
+            ng = model.array_waveguide().groupindex(lc)
+            bandwidth = lc ** 2 / (ng * model.dl)
+        wavelength = lc + np.linspace(-1 / 2, 1 / 2, points) * bandwidth
+
+    S = np.zeros((wavelength.size, model.Ni + model.No, model.Ni + model.No), dtype=complex)
+    for i in range(0, wavelength.size, options.batch_size):
+        j = slice(i, i + options.batch_size)
+        l = wavelength[j]
+        F = iw(model, l, range(model.Ni), options=options)
+        F = fpr1(model, l, F, options)
+        F = aw(model, l, F, options)
+        channels = None
+        if options.coupling_window is not None:
+            channels = focus(model, l, F, options)[1]
+        F = fpr2(model, l, F, options, channels)
+        # (输入, 波长, 输出) -> (波长, 输出, 输入)
+        a = np.moveaxis(ow(model, l, F, options, channels, amplitude=True), 0, -1)
+        S[j, model.Ni:, :model.Ni] = a
+        S[j, :model.Ni, model.Ni:] = np.swapaxes(a, -1, -2)
+    return SMatrix(wavelength, S, model.Ni)
@@ -0,0 +1,108 @@
+import numpy as np
+
+from .Profiler import profiled
+from .analyse import analyse
+from .SimulationOptions import SimulationOptions
+from .simulate import simulate
+from .thermal import thermal
+
+
+@profiled("spectrum")
+def spectrum(model, lmbda=None, bandwidth=None, points=250, _input=0, options=None, cache=None,
+             temperature=None):
+    """
+    AWG transmission spectrum
+
+    DESCRIPTION:
+        Sweeps the transmission of every output channel over a wavelength
+        band. Wavelengths are pushed through the simulation chain in
+        batches of options.batch_size, so the cost per point is a handful
+        of vectorized array operations rather than a Python-level call of
+        simulate per wavelength.
+
+        Long sweeps of large devices are dominated by the star coupler
+        kernels, rebuilt for every batch. With options.sweep 'interpolate'
+        (and by default, 'auto', for sweeps of more than 500 wavelengths)
+        the couplings from the input into the arms and from the arms into
+        the outputs are instead computed on a few nodes of the band and
+        interpolated to options.sweep_tolerance (see thermal), so that each
+        wavelength costs one (No x N) matrix-vector product. The result
+        agrees with the chain to about sweep_tolerance times the largest
+        coupling squared.
+
+        Given a vector of temperatures, the sweep is repeated at each of
+        them (see thermal) and the thermal drift of every channel is
+        returned along with it: the passband centers (see analyse), their
+        shift from the first temperature and the fitted slope.
+
+    INPUTS:
+        model     - AWG model
+        lmbda     - center wavelength (default model.lambda_c), or an
+                    explicit vector of wavelengths to simulate
+        bandwidth - sweep width (micron), default one free spectral range
+        points    - number of wavelength points (default 250)
+        _input    - input waveguide index (default 0)
+        options   - (optional) SimulationOptions
+        cache     - (optional) ResultCache; only the wavelengths missing
+                    from a previous sweep of the same design are simulated
+        temperature - (optional) temperature(s) (K), scalar or vector
+
+    OUTPUT:
+        results - dict with
+                  'wavelength'   : wavelength vector, shape (points,)
+                  'transmission' : power transmission, shape (points, No)
+                  given temperatures, also
+                  'temperature'  : temperature vector, shape (K,)
+                  'transmission' : shape (K, points, No)
+                  'center'       : passband centers, shape (K, No)
+                  'shift'        : center - center at temperature[0]
+                  'slope'        : least-squares dcenter/dT (micron/K)
+                                   over the finite centers, shape (No,)
+    """
+    options = options or SimulationOptions()
+    if options.profile is not None and not options.profile.active:
+        with options.profile:
+            return spectrum(model, lmbda, bandwidth, points, _input, options, cache, temperature)
+
+    if lmbda is not None and np.ndim(lmbda) > 0:
+        wavelength = np.asarray(lmbda, dtype=float).reshape(-1)
+    else:
+        lc = model.lambda_c if lmbda is None else float(lmbda)
+        if bandwidth is None:
+            ng = model.array_waveguide().groupindex(lc)
+            bandwidth = lc ** 2 / (ng * model.dl)
+        wavelength = lc + np.linspace(-1 / 2, 1 / 2, points) * bandwidth
+
+    if temperature is not None:
+        if cache is not None:
+            raise ValueError("cache is not supported with temperature")
+        temperature = np.asarray(temperature, dtype=float).reshape(-1)
+        T = thermal(model, wavelength, temperature, _input, options=options)
+        center = np.stack([analyse({"wavelength": wavelength, "transmission": t})["center"] for t in T])
+        slope = np.full(model.No, np.nan)
+        for k in range(model.No):
+            # 各通道中心波长随温度的线性拟合（跳过通带移出扫描范围的温度）
+            ok = np.isfinite(center[:, k])
+            if np.unique(temperature[ok]).size > 1:
+                slope[k] = np.polyfit(temperature[ok], center[ok, k], 1)[0]
+        return {"wavelength": wavelength, "temperature": temperature, "transmission": T,
+                "center": center, "shift": center - center[0], "slope": slope}
+
+    interpolate = (options.fpr == "diffraction" and options.coupling_window is None and cache is None)
+    if options.sweep == "interpolate" and not interpolate:
+        raise ValueError("options.sweep='interpolate' needs the diffraction star coupler, "
+                         "no coupling window and no cache")
+    if options.sweep == "interpolate" or options.sweep == "auto" and interpolate and wavelength.size > 500:
+        T = thermal(model, wavelength, None, _input, options=options, tolerance=options.sweep_tolerance)
+        return {"wavelength": wavelength, "transmission": T}
+
+    if cache is not None:
+        return {"wavelength": wavelength,
+                "transmission": cache.simulate(model, wavelength, _input, options)}
+
+    T = np.empty((wavelength.size, model.No))
+    for i in range(0, wavelength.size, options.batch_size):
+        j = slice(i, i + options.batch_size)
+        T[j] = simulate(model, wavelength[j], _input, options=options)
+
+    return {"wavelength": wavelength, "transmission": T}
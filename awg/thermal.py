@@ -0,0 +1,259 @@
+import numpy as np
+
+from .Profiler import profiled
+from .SimulationOptions import SimulationOptions
+from .StarCoupler import StarCoupler
+from .iw import iw
+from .core.diffract import diffract, geometry
+from .core.overlap import overlap
+from .core.slabindex import slabindex
+from .core.trapzw import trapzw
+from .core.wgindex import wgindex
+
+
+@profiled("thermal")
+def thermal(model, lmbda, temperature, _input=0, u=None, options=None, tolerance=1e-4):
+    """
+    Temperature sweep
+
+    DESCRIPTION:
+        Transmission of the model at every temperature (see AWG.at) and
+        wavelength. Both free propagation regions depend on the temperature
+        only through the medium wavelength lambda / ns, and the aperture
+        mode profiles mostly so, so the couplings from the input waveguide
+        into every arm, and from every arm into every output waveguide, are
+        computed once for a whole group of temperatures: on nodes of
+        medium wavelength, with the geometry, diffraction kernels and mode
+        profiles of the model at a reference temperature of the group.
+        Their phase exp(-i k r) between the aperture centers is divided out
+        and the slowly varying rest is interpolated with cubic splines; the
+        node spacing is halved until the interpolation error at the
+        midpoints is below tolerance times the largest coupling. Every
+        temperature then only needs the effective indices of the slab and
+        the arms, solved for all temperatures in one vectorized call, and
+        the transmission is one (No x N) matrix-vector product per
+        wavelength.
+
+        The temperatures of a group are those at which the mode profiles of
+        the input, arm and output waveguides (at lambda_c) differ from the
+        reference ones at equal medium wavelength by a relative distance
+        sqrt(2 (1 - |overlap|)) of at most tolerance; the sweep is split
+        into as few groups as that allows (by bisection over the sorted
+        temperatures, the distance growing with the temperature step).
+
+        Without temperature the model itself is swept, as one group with
+        itself as reference: this is the interpolated wavelength sweep of
+        spectrum (see SimulationOptions.sweep).
+
+    INPUTS:
+        model       - AWG model
+        lmbda       - wavelength(s) (micron), scalar or vector
+        temperature - temperature(s) (K), scalar or vector; None for the
+                      model as it is
+        _input      - input waveguide index (default 0)
+        u           - (optional) custom input field (see iw)
+        options     - (optional) SimulationOptions (diffraction star
+                      coupler, no coupling window)
+        tolerance   - (optional) relative tolerance of the reused mode
+                      profiles and of the interpolated couplings
+
+    OUTPUT:
+        T - power transmission, shape (*temperature.shape, *lmbda.shape, No),
+            (*lmbda.shape, No) without temperature
+    """
+    options = options or SimulationOptions()
+    if options.fpr != "diffraction":
+        raise ValueError("thermal supports the diffraction star coupler only (options.fpr='diffraction')")
+    if options.coupling_window is not None:
+        raise ValueError("thermal does not support options.coupling_window")
+    if not 0 < tolerance < 1:
+        raise ValueError(f"tolerance={tolerance} must be in (0, 1)")
+    if not 0 <= _input < model.Ni:
+        raise ValueError(f"_input={_input} must be in [0, {model.Ni - 1}]")
+    lmbda = np.asarray(lmbda, dtype=float)
+    wavelength = lmbda.reshape(-1)
+    if temperature is None:
+        temps, models = np.zeros(1), [model]
+    else:
+        temperature = np.asarray(temperature, dtype=float)
+        temps = temperature.reshape(-1)
+        models = [model.at(t) for t in temps]
+    order = np.argsort(temps, kind="stable")
+
+    # 所有温度的平板和阵列波导有效折射率一次求解
+    ns, nc = _indices(models, wavelength)
+
+    T = np.empty((temps.size, wavelength.size, model.No))
+    start = 0
+    while start < order.size:
+        # 参考温度取与组内最低温度的模式差别不超过容差的最高温度，组再向上延伸
+        ref = _last(start, order.size, lambda i: _change(models[order[start]], models[order[i]], options) <= tolerance)
+        reference = models[order[ref]]
+        end = _last(ref, order.size, lambda i: _change(reference, models[order[i]], options) <= tolerance) + 1
+        group = order[start:end]
+        start = end
+
+        spline, phase = _interpolate(reference, wavelength / ns[group], _input, u, options, tolerance)
+        for i in group:
+            beta = 2 * np.pi * nc[i] / wavelength
+            for j in range(0, wavelength.size, options.batch_size):
+                k = slice(j, j + options.batch_size)
+                T[i, k] = _transmission(model, wavelength[k] / ns[i, k], beta[k], spline, phase)
+    if temperature is None:
+        return T[0].reshape(lmbda.shape + (model.No,))
+    return T.reshape(temperature.shape + lmbda.shape + (model.No,))
+
+
+def _last(lo, hi, ok):
+    """Largest i in [lo, hi) with ok(i), for ok true at lo and then monotonically false (bisection)."""
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if ok(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _indices(models, lmbda):
+    """Slab and arm effective indices of every model, (len(models), len(lmbda)), in one solve."""
+    m = models[0]
+    na, nc, ns = (np.stack(n) for n in zip(*(k.slab_waveguide().materials(lmbda) for k in models)))
+    slab = slabindex(lmbda, m.h, na, nc, ns, 0, m.polarization)
+    if m.solver == "fd":
+        arm = np.stack([k.array_waveguide().index(lmbda) for k in models])
+    else:
+        arm = wgindex(lmbda, m.w, m.h, m.t, na, nc, ns, 0, m.polarization)
+    return slab, arm
+
+
+def _change(reference, model, options):
+    """
+    Largest relative distance sqrt(2 (1 - |overlap|)) between the aperture
+    mode profiles of model at lambda_c and those of the reference at the
+    wavelength of equal medium wavelength, which replace them.
+    """
+    lc = reference.lambda_c
+    lv = _vacuum(reference, lc / model.slab_waveguide().index(lc))
+    change = 0.0
+    for name in ("input_aperture", "array_aperture", "output_aperture"):
+        a, b = getattr(reference, name)(), getattr(model, name)()
+        xl = a.local(options.points, options.window, options.tolerance)
+        # 与 Aperture.mode 相同的采样方式
+        cells = a.samples is not None or options.tolerance is not None
+        E0 = a.waveguide.mode(lv, xl, cells=cells)[0]
+        E1 = b.waveguide.mode(lc, xl, cells=cells)[0]
+        change = max(change, np.sqrt(2 * max(1 - overlap(xl, E0, E1), 0.0)))
+    return change
+
+
+def _vacuum(model, lm):
+    """Vacuum wavelength of the medium wavelength(s) lm in the slab of model."""
+    # 割线法求解 lv - lm ns(lv) = 0（不动点迭代的收缩因子 lm dns/dlv 可达 0.5）
+    slab = model.slab_waveguide()
+    lm = np.asarray(lm, dtype=float)
+    a = lm * slab.index(model.lambda_c)
+    b = lm * slab.index(a)
+    fa, fb = a - lm * slab.index(a), b - lm * slab.index(b)
+    for _ in range(20):
+        step = np.where(fb != fa, fb * (b - a) / np.where(fb != fa, fb - fa, 1.0), 0.0)
+        a, fa = b, fb
+        b = b - step
+        fb = b - lm * slab.index(b)
+        if np.all(np.abs(step) <= 1e-14 * b):
+            break
+    return b
+
+
+def _interpolate(model, lm, _input, u, options, tolerance, levels=8):
+    """
+    Cubic splines of the demodulated couplings over the medium wavelengths
+    lm, and the center-to-center distances (r1, r2) of their phase.
+    """
+    from scipy.interpolate import CubicSpline
+
+    evaluate, phase = _couplings(model, _input, u, options)
+    lo, hi = lm.min(), lm.max()
+    if hi - lo < 1e-9 * hi:
+        lo, hi = lo - 1e-6 * lo, hi + 1e-6 * hi
+
+    x = np.linspace(lo, hi, 9)
+    V = evaluate(x)
+    for _ in range(levels):
+        mid = (x[:-1] + x[1:]) / 2
+        Vm = evaluate(mid)
+        error = np.max(np.abs(CubicSpline(x, V, axis=0)(mid) - Vm))
+        x = np.concatenate([x, mid])
+        order = np.argsort(x)
+        x, V = x[order], np.concatenate([V, Vm])[order]
+        # 中点插值误差满足容差后，加入中点作为最终节点
+        if error <= tolerance * np.max(np.abs(V)):
+            break
+    return CubicSpline(x, V, axis=0), phase
+
+
+def _couplings(model, _input, u, options):
+    """
+    Function of the medium wavelengths lm returning the couplings from the
+    input into the arms (N) and from the arms into the outputs (No x N),
+    flattened to (len(lm), N + No N), with the phase exp(-i k r) of the
+    center-to-center distances r1 (N) and r2 (No, N) divided out.
+    """
+    array = model.array_aperture()
+    output = model.output_aperture()
+    s, idx = array.grid(options.points, options.window, options.tolerance)
+    xa, za = model.R * np.sin(s / model.R), model.R * np.cos(s / model.R)
+    ds = np.gradient(s)
+    x, jdx = output.grid(options.points, options.window, options.tolerance)
+    z = model.focal_z(x)
+
+    # 孔径中心之间的距离
+    arms, outputs = idx[:, idx.shape[1] // 2], jdx[:, jdx.shape[1] // 2]
+    xi = model.input_aperture().positions[_input]
+    r1 = np.hypot(xa[arms] - xi, za[arms] - model.focal_z(xi))
+    r2 = np.hypot(x[outputs, np.newaxis] - xa[arms], z[outputs, np.newaxis] - za[arms])
+    # 每条阵列波导到输出焦线的几何核，与波长无关
+    kernels = [geometry(xa[i], x, z, za[i], ds[i]) for i in idx]
+
+    def evaluate(lm):
+        # 模式剖面取对应的真空波长
+        lv = _vacuum(model, lm)
+        F = iw(model, lv, _input, u, options)
+        coupler = StarCoupler.get(F.x, model.focal_z(F.x), xa, za)
+        E = coupler.diffract(lm, F.E, options.diffraction)
+        xl, M = array.mode(lv, options.points, options.window, options.tolerance)
+        w = xl[1] - xl[0] if options.tolerance is None else trapzw(xl)
+        A = np.einsum("lkn,ln->lk", E[:, idx], np.conj(M) * w)
+
+        xo, Mo = output.mode(lv, options.points, options.window, options.tolerance)
+        wo = trapzw(xo)
+        Mo = np.conj(Mo) * wo / np.sqrt(np.sum(np.abs(Mo) ** 2 * wo, axis=-1, keepdims=True))
+        B = np.empty((lm.size, output.count, array.count), dtype=complex)
+        for k, i in enumerate(idx):
+            G = diffract(lm, M, xa[i], x, z, za[i], ds[i], method="direct", kernel=kernels[k])
+            B[:, :, k] = np.einsum("ljn,ln->lj", G[:, jdx], Mo)
+
+        k0 = 2 * np.pi / lm
+        A = A * np.exp(1j * k0[:, np.newaxis] * r1)
+        B = B * np.exp(1j * k0[:, np.newaxis, np.newaxis] * r2)
+        return np.concatenate([A, B.reshape(lm.size, -1)], axis=1)
+
+    return evaluate, (r1, r2)
+
+
+def _transmission(model, lm, beta, spline, phase):
+    """Power transmission (len(lm), No) from the interpolated couplings and the arm phases."""
+    r1, r2 = phase
+    N = r1.size
+    V = spline(lm)
+    k0 = 2 * np.pi / lm
+    A = V[:, :N] * np.exp(-1j * k0[:, np.newaxis] * r1)
+    B = V[:, N:].reshape(lm.size, -1, N) * np.exp(-1j * k0[:, np.newaxis, np.newaxis] * r2)
+
+    phi = beta[:, np.newaxis] * model.arm_lengths()
+    if model.phase_error is not None:
+        phi = phi + np.asarray(model.phase_error, dtype=float)
+    a = A * np.exp(-1j * phi)
+    if model.arm_loss is not None:
+        a = a * 10 ** (-np.asarray(model.arm_loss, dtype=float) / 20)
+    return np.abs(np.einsum("ljn,ln->lj", B, a)) ** 2
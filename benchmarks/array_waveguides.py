@@ -0,0 +1,104 @@
+"""
+阵列波导级：向量化的（波长 x 臂）相位/幅度矩阵与逐臂循环的比较
+
+Times the array waveguide stage (awg.aw) of a device with --arms arms on
+--points wavelengths against the naive per-arm loop it replaces, which
+samples the mode profile again for every arm and couples, phases and
+re-radiates one arm at a time. aw is timed cold (mode profile cache
+cleared) and warm with new random per-arm phase errors and losses on
+every call, as in a tolerance or phase-trimming study. Reports the times,
+the speedups and the largest difference of the output fields.
+
+    python benchmarks/array_waveguides.py [--arms 200] [--points 128]
+                                          [--repeat 5] [--json out.json]
+
+Exits with status 1 if aw differs from the loop or is not faster.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loop(model, lmbda, F0, options, phase_error, loss):
+    """Per-arm reference implementation of aw."""
+    import numpy as np
+    from awg.core.pnorm import pnorm
+
+    aperture = model.array_aperture()
+    s, idx = aperture.grid(options.points, options.window)
+    xl = aperture.local(options.points, options.window)
+    beta = 2 * np.pi * model.array_waveguide().index(lmbda) / lmbda
+    lengths = model.arm_lengths()
+
+    E = np.zeros(np.shape(F0.E), dtype=complex)
+    for k in range(aperture.count):
+        # 每条臂重新采样模式剖面
+        M = pnorm(xl, aperture.waveguide.mode(lmbda, xl)[0])
+        c = np.sum(F0.E[..., idx[k]] * np.conj(M), axis=-1) * (xl[1] - xl[0])
+        a = c * np.exp(-1j * (beta * lengths[k] + phase_error[k])) * 10 ** (-loss[k] / 20)
+        E[..., idx[k]] += a[..., np.newaxis] * M
+    return E
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--arms", type=int, default=200)
+    parser.add_argument("--points", type=int, default=128)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    model = awg.AWG(N=args.arms, R=2.0 * args.arms)
+    options = awg.SimulationOptions()
+    lmbda = model.lambda_c + np.linspace(-0.01, 0.01, args.points)
+    F0 = awg.fpr1(model, lmbda, awg.iw(model, lmbda, options=options), options)
+    rng = np.random.default_rng(0)
+
+    def draw():
+        return rng.normal(0.0, 0.1, model.N), rng.uniform(0.0, 0.5, model.N)
+
+    def best(run):
+        times = []
+        for _ in range(args.repeat):
+            t = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - t)
+        return min(times)
+
+    def cold():
+        awg.Aperture._modes.clear()
+        awg.aw(model, lmbda, F0, options, *draw())
+
+    phase_error, loss = draw()
+    E = awg.aw(model, lmbda, F0, options, phase_error, loss).E
+    error = float(np.max(np.abs(E - loop(model, lmbda, F0, options, phase_error, loss))))
+
+    t_loop = best(lambda: loop(model, lmbda, F0, options, *draw()))
+    t_cold = best(cold)
+    t_warm = best(lambda: awg.aw(model, lmbda, F0, options, *draw()))
+    result = {"arms": model.N, "wavelengths": args.points, "loop_s": t_loop, "cold_s": t_cold,
+              "warm_s": t_warm, "speedup_cold": t_loop / t_cold, "speedup_warm": t_loop / t_warm,
+              "error": error}
+    print(f"{model.N} arms x {args.points} wavelengths: per-arm loop {t_loop * 1e3:8.1f} ms")
+    print(f"  aw, cold mode cache          {t_cold * 1e3:8.1f} ms ({result['speedup_cold']:5.1f}x)")
+    print(f"  aw, new phase errors / loss  {t_warm * 1e3:8.1f} ms ({result['speedup_warm']:5.1f}x)")
+    print(f"  largest field difference     {error:.1e}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    ok = error <= 1e-9 * np.max(np.abs(E)) and t_cold < t_loop
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
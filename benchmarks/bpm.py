@@ -0,0 +1,114 @@
+"""
+星形耦合器两种精度的对比：衍射求和与二维分步 BPM 的耗时和精度
+
+Compares the two star coupler models of SimulationOptions.fpr on the
+default AWG:
+
+  * propagator check - the BPM without side walls against the diffraction
+    sum on the first free propagation region (both solve the same
+    homogeneous problem; the residual is the error of the asymptotic
+    diffraction kernel),
+  * convergence      - the full spectrum with the BPM at its automatic step
+    against a BPM run at a quarter of that step,
+  * model difference - figures of merit (see analyse) of the spectrum with
+    either model, and the runtime of both. The silicon slab of the default
+    AWG has high-contrast walls, outside the validity range of the BPM
+    wall screen (see core.bpm): its far crosstalk is only indicative,
+  * weak walls       - both models on a low-contrast design whose input far
+    field barely reaches the walls, where they must agree.
+
+    python benchmarks/bpm.py [--points 100] [--json out.json]
+
+Exits with status 1 if the propagator check differs by more than 1e-3,
+the BPM spectrum is not converged to 1e-2 (absolute transmission) or the
+weak-wall spectra differ by more than 2e-3 of their peak.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=100)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    model = awg.AWG()
+    fast = awg.SimulationOptions()
+    slow = awg.SimulationOptions(fpr="bpm")
+    results, ok = {}, True
+
+    # 无侧壁时 BPM 与衍射求和求解同一个均匀问题
+    lmbda = model.lambda_c + np.linspace(-0.005, 0.005, 16)
+    ns = model.slab_waveguide().index(lmbda)
+    F0 = awg.iw(model, lmbda, options=fast)
+    s, _ = model.array_aperture().grid(fast.points, fast.window, fast.tolerance)
+    coupler = awg.StarCoupler(F0.x, model.focal_z(F0.x), model.R * np.sin(s / model.R),
+                              model.R * np.cos(s / model.R))
+    reference = coupler.diffract(lmbda / ns, F0.E, "direct")
+    error = np.max(np.abs(coupler.bpm(lmbda, ns, None, F0.E) - reference)) / np.max(np.abs(reference))
+    results["propagator_error"] = float(error)
+    print(f"propagator check (no walls): relative error {error:.2e}")
+    ok &= error <= 1e-3
+
+    lmbda = model.lambda_c + np.linspace(-0.006, 0.006, args.points)
+    spectra, metrics = {}, {}
+    for name, options in (("diffraction", fast), ("bpm", slow)):
+        awg.StarCoupler._cache.clear()
+        t = time.perf_counter()
+        spectra[name] = awg.spectrum(model, lmbda, options=options)
+        seconds = time.perf_counter() - t
+        a = awg.analyse(spectra[name])
+        metrics[name] = {"s": seconds,
+                         "insertion_loss": float(np.min(a["insertion_loss"])),
+                         "bandwidth_3db": float(np.nanmean(a["bandwidth_3db"]) * 1e3),
+                         "adjacent_crosstalk": float(np.nanmax(a["adjacent_crosstalk"])),
+                         "nonuniformity": float(a["nonuniformity"])}
+        m = metrics[name]
+        print(f"{name:<12} {seconds:7.2f} s  IL {m['insertion_loss']:5.2f} dB  "
+              f"BW3dB {m['bandwidth_3db']:5.3f} nm  XT {m['adjacent_crosstalk']:6.2f} dB  "
+              f"NU {m['nonuniformity']:5.2f} dB")
+    results["models"] = metrics
+    T = {k: v["transmission"] for k, v in spectra.items()}
+    results["difference"] = float(np.max(np.abs(T["bpm"] - T["diffraction"])))
+    print(f"largest transmission difference between the models: {results['difference']:.4f}")
+
+    # 收敛性：自动步长（同 StarCoupler.bpm 的规则）与四分之一步长
+    contrast = np.max(2 * np.pi / lmbda * np.abs(model.slab_waveguide().index(lmbda)
+                                                 - model.etched_index(lmbda)))
+    step = max(np.floor(64 * min(1.0, 1 / contrast)) / 64, 1 / 64)
+    fine = awg.SimulationOptions(fpr="bpm", bpm_step=step / 4)
+    T_fine = awg.spectrum(model, lmbda, options=fine)["transmission"]
+    results["step"] = step
+    results["convergence"] = float(np.max(np.abs(T["bpm"] - T_fine)))
+    print(f"bpm step {step:.4f} um vs {step / 4:.4f} um: largest difference {results['convergence']:.2e}")
+    ok &= results["convergence"] <= 1e-2
+
+    # 弱侧壁（约 6%）且几乎照不到侧壁：两种模型应一致
+    weak = awg.AWG(core=1.6, clad=1.45, subs=1.45, h=1.0, w=1.5, wi=4.0, wo=2.0, do=4.0, d=4.0,
+                   g=2.0, R=200.0, N=40, No=4, m=20)
+    lmbda = weak.lambda_c + np.linspace(-0.01, 0.01, args.points)
+    T = {name: awg.simulate(weak, lmbda, options=options) for name, options in (("diffraction", fast),
+                                                                               ("bpm", slow))}
+    results["weak_walls"] = float(np.max(np.abs(T["bpm"] - T["diffraction"])) / np.max(T["diffraction"]))
+    print(f"weak walls: largest difference {results['weak_walls']:.2e} of the peak transmission")
+    ok &= results["weak_walls"] <= 2e-3
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+输出耦合窗口：只在焦斑附近计算 FPR2 场和输出波导耦合的耗时与误差
+
+Compares the full output coupling (fpr2 onto the whole output aperture and
+every output waveguide at every wavelength) with the windowed coupling of
+SimulationOptions(coupling_window=...), where the focal spot of every
+wavelength is located from the grating equation (awg.focus) and only the
+output waveguides within the window are evaluated (awg.couplings, sparse
+result). For every device size the sweep covers one free spectral range
+and reports the runtime of both, the stored couplings per wavelength, the
+largest actual error against the full coupling and the largest error
+estimate of couplings.
+
+    python benchmarks/coupling_window.py [--channels 16 64 128] [--windows 2 3]
+                                         [--points 64] [--json out.json]
+
+Exits with status 1 if the actual error of a window exceeds the estimate
+of couplings, or the largest device is not faster windowed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def device(channels):
+    """AWG of the given channel count: 4 arms per channel, radius fitting the output aperture."""
+    import awg
+
+    model = awg.AWG(No=channels, N=max(40, 4 * channels))
+    # 罗兰圆焦线需容纳整个输出孔径
+    model.R = max(100.0, 50.0 * round(3 * channels * model.do / 50.0))
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--channels", type=int, nargs="+", default=[16, 64, 128])
+    parser.add_argument("--windows", type=float, nargs="+", default=[2.0, 3.0])
+    parser.add_argument("--points", type=int, default=64)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    results, ok = [], True
+    for channels in args.channels:
+        model = device(channels)
+        ng = model.array_waveguide().groupindex(model.lambda_c)
+        fsr = model.lambda_c ** 2 / (ng * model.dl)
+        lmbda = model.lambda_c + np.linspace(-0.5, 0.5, args.points) * fsr
+
+        awg.StarCoupler._cache.clear()
+        t = time.perf_counter()
+        T = awg.simulate(model, lmbda)
+        dense = time.perf_counter() - t
+        print(f"{channels:4d} channels, N={model.N}, R={model.R:g}: full {dense:7.2f} s")
+
+        for window in args.windows:
+            options = awg.SimulationOptions(coupling_window=window)
+            t = time.perf_counter()
+            c = awg.couplings(model, lmbda, options=options)
+            seconds = time.perf_counter() - t
+            error = float(np.max(np.abs(c["coupling"].toarray() - T)))
+            r = {"channels": channels, "N": model.N, "R": model.R, "window": window,
+                 "dense_s": dense, "window_s": seconds, "speedup": dense / seconds,
+                 "per_wavelength": c["coupling"].nnz / lmbda.size,
+                 "error": error, "estimate": float(np.max(c["error_estimate"]))}
+            results.append(r)
+            print(f"     window {window:g}: {seconds:7.2f} s ({r['speedup']:5.1f}x), "
+                  f"{r['per_wavelength']:5.1f} couplings per wavelength, "
+                  f"error {error:.1e} (estimate {r['estimate']:.1e})")
+            ok &= error <= r["estimate"]
+        ok &= channels != max(args.channels) or all(r["speedup"] > 1 for r in results
+                                                      if r["channels"] == channels)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
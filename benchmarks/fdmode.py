@@ -0,0 +1,86 @@
+"""
+有限差分模式求解器：扫描中热启动与逐点冷启动的比较
+
+Solves the fundamental mode of thick ridge waveguides with the
+semivectorial finite-difference solver (awg.core.fdmode), indices from
+awg.material: a 1.2 x 0.8 micron Si3N4 strip in SiO2 and a LiTaO3 rib
+(1.5 micron wide, 0.6 micron high on a 0.3 micron slab, SiO2 below, air
+above). Each is swept over --points wavelengths and over --points widths
+in one call (warm-started) and compared with solving every --check-th
+point cold, extrapolated to the whole sweep. Reports the times, the
+speedup, the largest index difference between warm and cold solves and
+the error of the effective index method (awg.core.wgindex) at the center.
+
+    python benchmarks/fdmode.py [--points 100] [--check 10] [--json out.json]
+
+Exits with status 1 if a warm solve differs from the cold one by more than
+1e-8 or a sweep is not at least 3 times faster than cold solves.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=100)
+    parser.add_argument("--check", type=int, default=10)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    from awg.core import fdmode, wgindex
+    from awg.material import AirModel, LiTaO3Model, Si3N4Model, SiO2Model
+
+    guides = {
+        "Si3N4 strip 1.2 x 0.8": dict(w=1.2, h=0.8, t=0.0, clad=SiO2Model(), core=Si3N4Model(), subs=SiO2Model()),
+        "LiTaO3 rib 1.5 x 0.6 / 0.3": dict(w=1.5, h=0.6, t=0.3, clad=AirModel(), core=LiTaO3Model(),
+                                          subs=SiO2Model()),
+    }
+    lc = 1.55
+    # 预先导入 scipy，不计入计时
+    fdmode(lc, 1.0, 0.5, 0.0, 1.444, 2.0, 1.444, np.linspace(-1.0, 1.0, 11))
+    results, ok = [], True
+    for name, g in guides.items():
+        x = np.linspace(-2.0, 2.0, 81) * max(g["w"], 1.0)
+        lmbda = np.linspace(1.5, 1.6, args.points)
+        widths = g["w"] + np.linspace(-0.2, 0.2, args.points)
+        for sweep, l, w in (("wavelength", lmbda, g["w"]), ("width", lc, widths)):
+            l, w = np.broadcast_arrays(l, w)
+            na, nc, ns = (g[m].index(l) for m in ("clad", "core", "subs"))
+
+            t = time.perf_counter()
+            neff = fdmode(l, w, g["h"], g["t"], na, nc, ns, x)[2]
+            warm = time.perf_counter() - t
+
+            check = np.arange(0, args.points, args.check)
+            t = time.perf_counter()
+            cold = np.array([fdmode(l[i], w[i], g["h"], g["t"], na[i], nc[i], ns[i], x)[2] for i in check])
+            cold_s = (time.perf_counter() - t) * args.points / check.size
+            difference = float(np.max(np.abs(neff[check] - cold)))
+
+            c = args.points // 2
+            eim = float(wgindex(l[c], w[c], g["h"], g["t"], na[c], nc[c], ns[c]))
+            r = {"guide": name, "sweep": sweep, "points": args.points, "warm_s": warm, "cold_s": cold_s,
+                 "speedup": cold_s / warm, "difference": difference, "neff": float(neff[c]),
+                 "eim_error": eim - float(neff[c])}
+            results.append(r)
+            print(f"{name:<28} {sweep:<10}: sweep {warm:6.2f} s, cold {cold_s:6.2f} s "
+                  f"({r['speedup']:4.1f}x), difference {difference:.1e}; neff {neff[c]:.5f}, "
+                  f"effective index method {r['eim_error']:+.4f}")
+            ok &= difference <= 1e-8 and r["speedup"] >= 3
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Field 内存基准：每个采样点的字节数与视图操作的额外分配
+
+Measures, with tracemalloc, the memory held by the Field of every stage of
+the simulation chain per sampled point (batch entry x sample) and the
+extra memory allocated by the Field operations that are meant to be
+views or in-place (offset, crop, indexing, pnorm).
+
+    python benchmarks/field_memory.py [--batch 128] [--json out.json]
+
+Exits with status 1 if a stage holds more than 16 bytes per point (plus
+the shared grid) or if a view operation allocates more than the grid.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def allocated(f, *args):
+    """Result of f(*args) and the bytes still allocated by it."""
+    tracemalloc.start()
+    out = f(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch", type=int, default=128)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    model = awg.AWG()
+    options = awg.SimulationOptions()
+    lmbda = model.lambda_c + np.linspace(-0.01, 0.01, args.batch)
+    results, ok = {"batch": args.batch, "stages": {}, "views": {}}, True
+
+    F = awg.iw(model, lmbda, options=options)
+    for name, stage in (("iw", None), ("fpr1", awg.fpr1), ("aw", awg.aw), ("fpr2", awg.fpr2)):
+        if stage is not None:
+            F = stage(model, lmbda, F, options)
+        points = F.E.size
+        per_point = (F.nbytes - F.x.nbytes - F.lmbda.nbytes) / points
+        results["stages"][name] = {"points": points, "bytes_per_point": per_point}
+        print(f"{name:<6} {points:9d} points  {per_point:5.1f} B/point  grid {F.x.nbytes} B")
+        ok &= per_point <= 16
+
+    for name, op in (("offset", lambda: F.offset(1.0)),
+                     ("crop", lambda: F.crop(-model.R / 4, model.R / 4)),
+                     ("index", lambda: F[: args.batch // 2]),
+                     ("pnorm", lambda: F.pnorm())):
+        _, size = allocated(op)
+        results["views"][name] = size
+        print(f"{name:<6} allocates {size:8d} B  (field holds {F.nbytes} B)")
+        ok &= size <= F.x.nbytes + 4096
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+导入开销基准：测量 awg / awg.material / gdsdraw 的冷启动导入时间
+
+Every measurement runs in a fresh interpreter, so it reflects what a
+process-pool worker pays at start-up. The script also checks that no
+plotting, GUI or layout backend is loaded by the import, and times a
+spawn-based process pool whose workers import awg.
+
+    python benchmarks/import_time.py [--repeat 5] [--json out.json] [--max-ms 500]
+
+Exits with status 1 if a heavy module is loaded on import or if an import
+exceeds --max-ms.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["awg", "awg.material", "gdsdraw"]
+HEAVY = ["matplotlib", "mpld3", "gdsfactory", "scipy", "tkinter"]
+
+PROBE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t
+print(dt, ",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(module, repeat):
+    """Median cold import time (s) of module and the heavy modules it pulled in."""
+    times, loaded = [], set()
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[0]))
+        if len(out) > 1:
+            loaded.update(out[1].split(","))
+    return statistics.median(times), sorted(loaded)
+
+
+def _worker(_):
+    import awg  # noqa: F401
+    return os.getpid()
+
+
+def measure_pool(workers):
+    """Wall time (s) to start a spawn pool and have every worker import awg."""
+    t = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+        list(pool.map(_worker, range(workers)))
+    return time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if an import is slower")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    results = {"python": sys.version.split()[0], "imports": {}}
+    ok = True
+    for module in MODULES:
+        dt, loaded = measure(module, args.repeat)
+        results["imports"][module] = {"ms": dt * 1e3, "heavy_modules": loaded}
+        print(f"{module:<14} {dt * 1e3:8.1f} ms  heavy: {', '.join(loaded) or '-'}")
+        ok &= not loaded and (args.max_ms is None or dt * 1e3 <= args.max_ms)
+
+    dt = measure_pool(args.workers)
+    results["pool"] = {"workers": args.workers, "ms": dt * 1e3}
+    print(f"{'pool start':<14} {dt * 1e3:8.1f} ms  ({args.workers} spawn workers importing awg)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+版图顶点基准：固定角分辨率与弦高误差取点的顶点数和 GDS 文件大小
+
+Draws reference AWG layouts with awg_layout, once with the fixed angular
+resolution and once for every chord tolerance given, and reports the
+number of vertices and the size of the written GDS file. It also checks
+the largest chord deviation of ring_arc and ellipse_arc_points in
+tolerance mode against the analytic curves, over radii from a tight bend
+to a star coupler.
+
+    python benchmarks/layout_vertices.py [--tolerance 1 5] [--json out.json]
+
+Exits with status 1 if a primitive deviates from its curve by more than
+the tolerance plus the vertex snapping error (grid / sqrt(2), 1 nm grid).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 参考 AWG：默认设计和一个大型阵列
+DESIGNS = {"default": {}, "large": dict(N=200, R=500.0)}
+
+
+def vertices(c):
+    """Total number of vertices of the flattened component."""
+    return sum(len(p) for polygons in c.get_polygons_points().values() for p in polygons)
+
+
+def gds_size(c, folder):
+    path = os.path.join(folder, f"{c.name}.gds")
+    c.write_gds(path)
+    return os.path.getsize(path)
+
+
+def deviation(points, curve, param):
+    """
+    Largest distance of the dense curve samples from the polyline through
+    points; param maps coordinates to the monotone curve parameter, which
+    assigns every sample to its segment.
+    """
+    import numpy as np
+
+    tp, tc = param(points), param(curve)
+    if tp[0] > tp[-1]:
+        points, tp = points[::-1], tp[::-1]
+    k = np.clip(np.searchsorted(tp, tc) - 1, 0, len(points) - 2)
+    p, ab = points[k], points[k + 1] - points[k]
+    u = np.clip(np.sum((curve - p) * ab, axis=1) / np.sum(ab * ab, axis=1), 0, 1)
+    return float(np.max(np.hypot(*(curve - p - u[:, None] * ab).T)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tolerance", type=float, nargs="+", default=[1.0, 5.0],
+                        help="chord tolerances in nm")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import gdsfactory as gf
+    import awg
+    import gdsdraw
+    from gdsdraw.elliptical_arc_ring import ellipse_arc_points
+
+    gf.gpdk.PDK.activate()
+    results, ok = {"layouts": {}, "primitives": {}}, True
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name, params in DESIGNS.items():
+            model = awg.AWG(**params)
+            rows = {}
+            for tol in [None] + args.tolerance:
+                c = gdsdraw.awg_layout(model, tolerance=tol)
+                label = "fixed" if tol is None else f"{tol:g} nm"
+                rows[label] = {"vertices": vertices(c), "bytes": gds_size(c, folder)}
+            base = rows["fixed"]
+            print(f"{name} ({model!r})")
+            for label, r in rows.items():
+                print(f"  {label:<8} {r['vertices']:9d} vertices  {r['bytes']:9d} B"
+                      f"  ({100 * (1 - r['bytes'] / base['bytes']):+6.1f} % size saved)")
+            results["layouts"][name] = rows
+
+    # 圆弧与椭圆弧的实际弦高误差
+    for tol in args.tolerance:
+        worst = {}
+        for r in (5.0, 20.0, 100.0, 1000.0):
+            c = gdsdraw.ring_arc(r, 0.5, 0, 30, tolerance=tol)
+            points = next(iter(c.get_polygons_points().values()))[0]
+            # 多边形的后半段为外弧
+            outer = points[len(points) // 2:]
+            t = np.linspace(0, np.pi / 6, 20001)
+            curve = (r + 0.25) * np.column_stack([np.cos(t), np.sin(t)])
+            worst[f"ring r={r:g}"] = deviation(outer, curve, lambda q: np.arctan2(q[:, 1], q[:, 0])) * 1e3
+        t = np.linspace(0, np.pi, 200001)
+        for a, b in ((30.0, 5.0), (200.0, 20.0)):
+            p = ellipse_arc_points(a, b, 0, 180, tolerance=tol)
+            curve = np.column_stack([a * np.cos(t), b * np.sin(t)])
+            worst[f"ellipse {a:g}x{b:g}"] = deviation(
+                p, curve, lambda q, a=a, b=b: np.arctan2(q[:, 1] / b, q[:, 0] / a)) * 1e3
+        results["primitives"][f"{tol:g}"] = worst
+        print(f"tolerance {tol:g} nm: largest chord deviation "
+              + ", ".join(f"{k} {v:.2f} nm" for k, v in worst.items()))
+        ok &= max(worst.values()) <= max(round(tol), 1) + np.sqrt(0.5)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
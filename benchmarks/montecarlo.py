@@ -0,0 +1,58 @@
+"""
+Monte-Carlo 吞吐量基准：不同进程数下每秒完成的试验数
+
+Runs the same Monte-Carlo tolerance analysis of the default AWG with an
+increasing number of worker processes and reports the throughput and the
+parallel efficiency relative to a single process. Results are checked to
+be identical for every worker count (per-trial seeds).
+
+    python benchmarks/montecarlo.py [--trials 64] [--points 200] [--workers 1 2 4] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--trials", type=int, default=64)
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+    from awg.montecarlo import COLUMNS
+
+    model = awg.AWG()
+    sigma = dict(phase=0.2, width=0.005, thickness=0.002)
+    results, reference = [], None
+    for workers in args.workers:
+        t = time.perf_counter()
+        mc = awg.montecarlo(model, args.trials, points=args.points, seed=0, workers=workers, **sigma)
+        dt = time.perf_counter() - t
+
+        if reference is None:
+            reference, base = mc, args.trials / dt
+        same = all(np.array_equal(mc[c], reference[c], equal_nan=True) for c in COLUMNS)
+        rate = args.trials / dt
+        results.append({"workers": workers, "s": dt, "trials_per_s": rate,
+                        "efficiency": rate / (base * workers / args.workers[0]), "identical": same})
+        print(f"{workers:3d} workers  {dt:7.2f} s  {rate:7.2f} trials/s  "
+              f"efficiency {results[-1]['efficiency']:5.2f}  identical: {same}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"trials": args.trials, "points": args.points, "runs": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
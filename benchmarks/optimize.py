@@ -0,0 +1,92 @@
+"""
+梯度优化基准：解析导数的精度与优化所需的仿真次数
+
+Checks the derivatives of awg.jacobian against central finite differences
+of awg.simulate, then runs awg.optimize on the default AWG (input, output
+and array taper widths and the FPR length) and reports the number of
+simulations it needs, next to the cost of a plain grid search over the
+same parameters (--grid values per parameter, one spectrum each).
+
+    python benchmarks/optimize.py [--grid 10] [--json out.json]
+
+Exits with status 1 if a derivative differs from the finite difference by
+more than 1e-5 (relative), the merit does not improve or the optimizer
+needs more than --max-evaluations simulations.
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", type=int, default=10)
+    parser.add_argument("--max-evaluations", type=int, default=60)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    params = ("wi", "wo", "g", "R")
+    results, ok = {}, True
+
+    # 固定孔径采样数的默认设计（见 AWG.freeze）
+    model = awg.AWG().freeze()
+    model.dl = model.dl
+    lmbda = model.lambda_c + np.linspace(-0.004, 0.004, 9)
+    _, J = awg.jacobian(model, lmbda, params)
+    errors = {}
+    for i, p in enumerate(params):
+        h = 1e-6 * getattr(model, p)
+        T = []
+        for sign in (1, -1):
+            trial = copy.copy(model)
+            setattr(trial, p, getattr(model, p) + sign * h)
+            T.append(awg.simulate(trial, lmbda))
+        fd = (T[0] - T[1]) / (2 * h)
+        errors[p] = float(np.max(np.abs(J[..., i] - fd)) / np.max(np.abs(fd)))
+        print(f"d/d{p:<3} relative difference to finite differences {errors[p]:.1e}")
+    results["derivative_error"] = errors
+    ok &= max(errors.values()) <= 1e-5
+
+    model = awg.AWG()
+    t = time.perf_counter()
+    r = awg.optimize(model, params)
+    seconds = time.perf_counter() - t
+    start = dict(zip(params, (getattr(model, p) for p in params)))
+    print(f"optimize: {r['evaluations']} simulations in {seconds:.1f} s, "
+          f"merit {r['merit'][0]:.3f} -> {r['merit'][1]:.3f} ({r['message']})")
+    print("  " + "  ".join(f"{p} {start[p]:g} -> {v:.4g}" for p, v in r["params"].items()))
+    print(f"  ripple {np.mean(r['ripple']):.2f} dB  crosstalk {np.max(r['crosstalk']):.2f} dB  "
+          f"loss {np.mean(r['loss']):.2f} dB")
+    results["optimize"] = {"s": seconds, "evaluations": r["evaluations"], "merit": list(r["merit"]),
+                           "params": {p: float(v) for p, v in r["params"].items()},
+                           "ripple": float(np.mean(r["ripple"])), "crosstalk": float(np.max(r["crosstalk"])),
+                           "loss": float(np.mean(r["loss"]))}
+    ok &= r["merit"][1] < r["merit"][0] and r["evaluations"] <= args.max_evaluations
+
+    # 网格搜索：每个网格点一次（不求导的）光谱仿真
+    t = time.perf_counter()
+    awg.spectrum(model, r["wavelength"])
+    per_point = time.perf_counter() - t
+    points = args.grid ** len(params)
+    results["grid_search"] = {"points": points, "s": points * per_point}
+    print(f"grid search, {args.grid} values per parameter: {points} spectra x {per_point:.2f} s "
+          f"= {points * per_point / 3600:.1f} h")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+解析预测基准：一次调用筛选 10^5 个候选设计
+
+Times awg.predict on a grid of candidate designs, once varying only the
+layout (R, m, N, d: the indices are solved for a handful of distinct
+cross-sections) and once varying the cross-section (w, h: every candidate
+has its own waveguide), and compares the prediction of the default design
+with a full spectrum simulation.
+
+    python benchmarks/predict.py [--repeat 3] [--json out.json] [--max-s 1.0]
+
+Exits with status 1 if a grid takes longer than --max-s.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--max-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    model = awg.AWG()
+    grids = {
+        "layout": dict(R=np.linspace(50, 200, 50)[:, None, None, None],
+                       m=np.arange(10, 50)[None, :, None, None],
+                       N=np.arange(20, 70, 2)[None, None, :, None],
+                       d=np.array([1.3, 2.0])[None, None, None, :]),
+        "cross-section": dict(w=np.linspace(0.40, 0.60, 100)[:, None],
+                              h=np.linspace(0.20, 0.25, 1000)[None, :]),
+    }
+    results, ok = {"grids": {}}, True
+    for name, grid in grids.items():
+        times = []
+        for _ in range(args.repeat):
+            awg.Waveguide.cache.clear()
+            t = time.perf_counter()
+            r = awg.predict(model, **grid)
+            times.append(time.perf_counter() - t)
+        size, valid = r["FSR"].size, int(np.count_nonzero(r["valid"]))
+        results["grids"][name] = {"candidates": size, "valid": valid, "s": min(times)}
+        print(f"{name:<14} {size:7d} candidates  {min(times):6.3f} s  ({valid} valid)")
+        ok &= min(times) <= args.max_s
+
+    p = awg.predict(model)
+    a = awg.analyse(awg.spectrum(model, points=400))
+    rows = [("channel spacing (nm)", p["spacing"] * 1e3, -np.mean(np.diff(a["center"])) * 1e3),
+            ("3 dB bandwidth (nm)", p["bandwidth_3db"] * 1e3, np.mean(a["bandwidth_3db"]) * 1e3),
+            ("insertion loss (dB)", p["insertion_loss"], np.min(a["insertion_loss"])),
+            ("non-uniformity (dB)", p["nonuniformity"], a["nonuniformity"])]
+    print(f"{'':<22}{'predicted':>10}{'simulated':>10}")
+    for label, x, y in rows:
+        print(f"{label:<22}{float(x):10.3f}{float(y):10.3f}")
+    results["default"] = {label: [float(x), float(y)] for label, x, y in rows}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+性能剖析基准：关闭时的插桩开销与开启时的剖析结果
+
+Measures the cost of the stage instrumentation (awg.Profiler) while no
+profiler is active, as the number of instrumented calls of a spectrum
+sweep times the extra cost of one instrumented call, and the slowdown of
+the sweep with an active profiler (with and without peak memory
+tracking). The profile of the sweep is printed and can be written as
+JSON and as folded stacks for a flame graph.
+
+    python benchmarks/profiler.py [--points 1000] [--json out.json] [--folded out.folded]
+
+Exits with status 1 if the instrumentation costs more than --max-overhead
+(fraction of the sweep time) while profiling is off.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-overhead", type=float, default=0.01)
+    parser.add_argument("--json", help="write the results (and the profile) to this file")
+    parser.add_argument("--folded", help="write the folded stacks of the profile to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import awg
+    from awg.Profiler import profiled
+
+    model = awg.AWG()
+
+    def sweep(options=None):
+        awg.Waveguide.cache.clear()
+        awg.StarCoupler._cache.clear()
+        t = time.perf_counter()
+        awg.spectrum(model, points=args.points, options=options)
+        return time.perf_counter() - t
+
+    sweep()
+    off = min(sweep() for _ in range(args.repeat))
+    on = min(sweep(awg.SimulationOptions(profile=awg.Profiler(memory=False))) for _ in range(args.repeat))
+    profile = awg.Profiler()
+    memory = sweep(awg.SimulationOptions(profile=profile))
+
+    # 关闭时每次被装饰函数调用的额外开销
+    def f(x):
+        return x
+
+    g = profiled("f")(f)
+    n = 200000
+    per_call = (min(timeit.repeat(lambda: g(1), number=n, repeat=5))
+                - min(timeit.repeat(lambda: f(1), number=n, repeat=5))) / n
+    calls = sum(s["calls"] for s in profile.stages().values())
+    overhead = calls * per_call / off
+
+    print(profile.report())
+    print(f"\nsweep of {args.points} wavelengths: {off:.3f} s off, {on:.3f} s profiled "
+          f"({on / off - 1:+.1%}), {memory:.3f} s with memory tracking ({memory / off - 1:+.1%})")
+    print(f"instrumented calls {calls}, {per_call * 1e9:.0f} ns each when off: "
+          f"overhead {overhead:.2e} of the sweep")
+
+    if args.folded:
+        profile.folded(args.folded)
+    results = {"points": args.points, "off_s": off, "profiled_s": on, "memory_s": memory,
+               "calls": calls, "per_call_ns": per_call * 1e9, "overhead": overhead,
+               "profile": profile.to_dict()}
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump(results, fp, indent=2)
+    sys.exit(0 if overhead <= args.max_overhead else 1)
+
+
+if __name__ == "__main__":
+    main()
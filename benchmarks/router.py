@@ -0,0 +1,75 @@
+"""
+N x N 路由器：所有输入端口一次批量仿真，与逐端口仿真比较
+
+Computes the full transfer matrix of N x N routers (N inputs, N outputs,
+8 arms per port) over one free spectral range, once by simulating every
+input port in turn and once with all ports in one pass
+(simulate(model, lmbda, range(N))), and compares both with a single-port
+simulation. Reports the runtimes, the cost of the batched matrix in
+single-port simulations and the largest transmission difference, which
+is rounding error, since both put every port on the grid of the whole
+input aperture (see iw).
+
+    python benchmarks/router.py [--ports 8 16] [--points 200]
+                                [--max-error 1e-10] [--json out.json]
+
+Exits with status 1 if the difference exceeds --max-error or the batched
+pass is not faster than the per-port loop.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ports", type=int, nargs="+", default=[8, 16])
+    parser.add_argument("--points", type=int, default=200)
+    parser.add_argument("--max-error", type=float, default=1e-10)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    def timed(run):
+        t = time.perf_counter()
+        result = run()
+        return result, time.perf_counter() - t
+
+    results, ok = [], True
+    for ports in args.ports:
+        model = awg.AWG(Ni=ports, No=ports, N=8 * ports)
+        ng = model.array_waveguide().groupindex(model.lambda_c)
+        fsr = model.lambda_c ** 2 / (ng * model.dl)
+        lmbda = model.lambda_c + np.linspace(-0.5, 0.5, args.points) * fsr
+
+        awg.simulate(model, lmbda[:2])
+        _, single = timed(lambda: awg.simulate(model, lmbda))
+        loop, looped = timed(lambda: np.stack([awg.simulate(model, lmbda, i) for i in range(ports)]))
+        T, batched = timed(lambda: awg.simulate(model, lmbda, range(ports)))
+        error = float(np.max(np.abs(T - loop)))
+
+        r = {"ports": ports, "N": model.N, "wavelengths": args.points, "single_s": single,
+             "loop_s": looped, "batched_s": batched, "speedup": looped / batched,
+             "simulations": batched / single, "error": error}
+        results.append(r)
+        print(f"{ports:3d} x {ports:<3d} router, N={model.N}: one port {single:6.2f} s, "
+              f"per-port loop {looped:6.2f} s, batched {batched:6.2f} s "
+              f"({r['speedup']:4.1f}x, {r['simulations']:4.1f} simulations), error {error:.1e}")
+        ok &= error <= args.max_error and batched < looped
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
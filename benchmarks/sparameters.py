@@ -0,0 +1,91 @@
+"""
+S 参数导出：批量计算全端口散射矩阵，写出文件并拟合极点-留数模型
+
+Computes the scattering matrix of N x N routers (N inputs, N outputs, 4
+arms per port) over one free spectral range with awg.sparameters, writes
+it as .npz (SMatrix.save) and Touchstone (SMatrix.touchstone), fits the
+pole-residue model (SMatrix.fit) and evaluates it on --evaluations
+wavelengths. Reports the runtimes, the file sizes, the pole count, the
+largest fit error relative to the largest transmission amplitude and the
+cost per wavelength of the fitted model against the physical model.
+
+    python benchmarks/sparameters.py [--ports 4 8] [--points 400]
+                                     [--tolerance 1e-3] [--json out.json]
+
+Exits with status 1 if a fit misses --tolerance, the files do not read
+back, or the fitted model is not faster than the simulation.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ports", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--points", type=int, default=400)
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--evaluations", type=int, default=100000)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    folder = tempfile.mkdtemp()
+    results, ok = [], True
+    for ports in args.ports:
+        model = awg.AWG(Ni=ports, No=ports, N=4 * ports)
+
+        t = time.perf_counter()
+        S = awg.sparameters(model, points=args.points)
+        simulated = time.perf_counter() - t
+
+        binary = os.path.join(folder, f"awg{ports}.npz")
+        touchstone = os.path.join(folder, f"awg{ports}.s{S.ports}p")
+        t = time.perf_counter()
+        S.save(binary)
+        S.touchstone(touchstone)
+        written = time.perf_counter() - t
+        ok &= np.array_equal(awg.SMatrix.load(binary).S, S.S)
+
+        t = time.perf_counter()
+        fit = S.fit(tolerance=args.tolerance)
+        fitted = time.perf_counter() - t
+        error = fit.error / np.max(np.abs(S.transmission))
+
+        lmbda = np.linspace(S.wavelength.min(), S.wavelength.max(), args.evaluations)
+        t = time.perf_counter()
+        fit(lmbda)
+        evaluated = time.perf_counter() - t
+
+        r = {"ports": ports, "N": model.N, "wavelengths": args.points, "sparameters_s": simulated,
+             "write_s": written, "npz_bytes": os.path.getsize(binary),
+             "touchstone_bytes": os.path.getsize(touchstone), "fit_s": fitted, "poles": fit.poles.size,
+             "error": error, "per_wavelength_simulation_s": simulated / args.points,
+             "per_wavelength_fit_s": evaluated / args.evaluations}
+        r["speedup"] = r["per_wavelength_simulation_s"] / r["per_wavelength_fit_s"]
+        results.append(r)
+        print(f"{ports:3d} x {ports:<3d} router, N={model.N}: sparameters {simulated:6.2f} s, "
+              f"npz {r['npz_bytes'] / 1e3:7.1f} kB, {os.path.basename(touchstone)} "
+              f"{r['touchstone_bytes'] / 1e3:7.1f} kB")
+        print(f"     fit {fitted:6.2f} s, {fit.poles.size} poles, error {error:.1e}; "
+              f"{r['per_wavelength_fit_s'] * 1e6:.2f} us per wavelength "
+              f"({r['speedup']:.0f}x the simulation)")
+        ok &= error <= args.tolerance and r["speedup"] > 1
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+流式版图导出基准：版图变体数目增加时的峰值内存与写出时间
+
+Writes a reticle of K AWG variants (different R) to GDSII, once streamed
+with awg_cells + stream_gds and once built in memory with awg_layout into a
+gdsfactory top component and written with write_gds. Every run is a fresh
+subprocess, so the peak resident memory (ru_maxrss) includes the KLayout
+database behind gdsfactory; the streamed export does not import
+gdsfactory at all. The streamed file of the first variant is
+checked against awg_layout (XOR of the two layouts).
+
+    python benchmarks/stream_gds.py [--variants 5 20 80] [--arms 100] [--json out.json]
+
+Exits with status 1 if the streamed layout differs from awg_layout or the
+peak memory of the streamed export grows by more than --max-growth MB
+from the smallest to the largest number of variants.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def models(k, arms):
+    import awg
+
+    return [awg.AWG(N=arms, R=200.0 + 2.0 * i) for i in range(k)]
+
+
+def stream(path, k, arms):
+    import gdsdraw
+
+    def reticle():
+        top = []
+        for i, model in enumerate(models(k, arms)):
+            yield from gdsdraw.awg_cells(model, name=f"AWG_{i}")
+            top.append(gdsdraw.Reference(f"AWG_{i}", (0.0, 3000.0 * i)))
+        yield gdsdraw.Cell("TOP", references=top)
+
+    gdsdraw.stream_gds(path, reticle())
+
+
+def in_memory(path, k, arms):
+    import gdsfactory as gf
+    import gdsdraw
+
+    top = gf.Component()
+    for i, model in enumerate(models(k, arms)):
+        ref = top.add_ref(gdsdraw.awg_layout(model))
+        ref.move((0.0, 3000.0 * i))
+    top.write_gds(path)
+
+
+def child(mode, k, arms, path):
+    """Runs one export in this process and prints its figures as JSON."""
+    import resource
+
+    sys.path.insert(0, ROOT)
+    if mode != "stream":
+        # 流式导出不需要 gdsfactory
+        import gdsfactory as gf
+
+        gf.gpdk.PDK.activate()
+    import awg  # noqa: F401
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t = time.perf_counter()
+    (stream if mode == "stream" else in_memory)(path, k, arms)
+    seconds = time.perf_counter() - t
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"s": seconds, "peak_mb": peak / 1024, "growth_mb": (peak - base) / 1024,
+                      "bytes": os.path.getsize(path)}))
+
+
+def check(folder, arms):
+    """XOR area between the streamed first variant and awg_layout (dbu^2)."""
+    sys.path.insert(0, ROOT)
+    import gdsfactory as gf
+    import klayout.db as db
+    import gdsdraw
+
+    gf.gpdk.PDK.activate()
+    model = models(1, arms)[0]
+    ref, streamed = os.path.join(folder, "ref.gds"), os.path.join(folder, "check.gds")
+    gdsdraw.awg_layout(model).write_gds(ref)
+    gdsdraw.stream_gds(streamed, gdsdraw.awg_cells(model, name="AWG"))
+
+    # 区域引用其版图，版图需在比较结束前保持存活
+    layouts, regions = [], []
+    for path, name in ((ref, None), (streamed, "AWG")):
+        layouts.append(db.Layout())
+        layouts[-1].read(path)
+        cell = layouts[-1].cell(name) if name else layouts[-1].top_cell()
+        regions.append(db.Region(cell.begin_shapes_rec(layouts[-1].layer(1, 0))))
+    return (regions[0] ^ regions[1]).area()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--variants", type=int, nargs="+", default=[5, 20, 80])
+    parser.add_argument("--arms", type=int, default=100)
+    parser.add_argument("--max-growth", type=float, default=5.0)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--child", nargs=4, metavar=("MODE", "K", "ARMS", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, k, arms, path = args.child
+        child(mode, int(k), int(arms), path)
+        return
+
+    results, ok = {"arms": args.arms, "runs": {}}, True
+    with tempfile.TemporaryDirectory() as folder:
+        # 子进程的 ru_maxrss 从 fork 时父进程的驻留内存算起，所以先测量再在本进程中校验
+        for mode in ("stream", "gdsfactory"):
+            rows = {}
+            for k in args.variants:
+                path = os.path.join(folder, f"{mode}-{k}.gds")
+                out = subprocess.run([sys.executable, __file__, "--child", mode, str(k), str(args.arms), path],
+                                     check=True, capture_output=True, text=True)
+                rows[k] = json.loads(out.stdout.strip().splitlines()[-1])
+                r = rows[k]
+                print(f"{mode:<10} {k:4d} variants  {r['s']:7.2f} s  peak {r['peak_mb']:7.1f} MB"
+                      f"  (+{r['growth_mb']:6.1f} MB)  {r['bytes'] / 2 ** 20:7.2f} MiB file")
+            results["runs"][mode] = rows
+        xor = check(folder, args.arms)
+        print(f"streamed vs awg_layout XOR area: {xor} dbu^2")
+        ok &= xor == 0
+
+    stream_rows = results["runs"]["stream"]
+    growth = stream_rows[max(args.variants)]["peak_mb"] - stream_rows[min(args.variants)]["peak_mb"]
+    results["stream_growth_mb"] = growth
+    ok &= growth <= args.max_growth
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
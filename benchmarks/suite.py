@@ -0,0 +1,233 @@
+"""
+性能回归基准套件：与保存的基线比较，捕捉性能退化
+
+Times the building blocks of the package on fixed inputs:
+
+  * material  - Sellmeier and tabulated index evaluation
+  * overlap   - batched and scalar overlap integrals
+  * mode      - slab / channel effective index and mode profile solvers
+  * fpr       - star coupler diffraction (direct kernel and FFT)
+  * spectrum  - full sweeps of 8 / 16 / 40 channel AWGs at 1k and 10k
+                wavelengths
+  * gdsdraw   - AWG layout generation (gdsfactory, and the streamed GDSII
+                export, which does not need it)
+
+Every case is run until --min-time has elapsed (at most --repeat times) and
+its best time is kept, so that short cases are timed over many runs. Times
+are also expressed in units of a fixed NumPy calibration workload measured
+in the same run, so that a baseline recorded on one CPU-only machine
+remains meaningful on another; the comparison uses these normalized times.
+Everything runs offline; cases whose optional dependency is missing are
+reported as skipped.
+
+    python benchmarks/suite.py [--quick] [--only spectrum] [--json out.json]
+    python benchmarks/suite.py --baseline benchmarks/baseline.json
+    python benchmarks/suite.py --save benchmarks/baseline.json
+
+Exits with status 1 if a case is slower than its baseline by more than
+--tolerance (fraction of the normalized time) and by more than --floor
+seconds: timer noise of sub-millisecond cases is not a regression.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def calibrate():
+    """Best time of a fixed mix of NumPy work (matrix products, complex exp, FFT)."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    a = rng.random((300, 300)) + 1j * rng.random((300, 300))
+    x = rng.random(500000)
+
+    def run():
+        a @ a
+        np.exp(1j * x)
+        np.fft.fft(x)
+
+    return best(run, 1.0, 30)
+
+
+def best(run, min_time, repeat):
+    """Best time of run over at most repeat calls, stopping after min_time (s)."""
+    times, total = [], 0.0
+    while len(times) < repeat and (total < min_time or not times):
+        t = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t)
+        total += times[-1]
+    return min(times), len(times)
+
+
+def cases(quick):
+    """(name, setup) pairs; setup() returns the timed callable (or raises ImportError)."""
+    import numpy as np
+    import awg
+
+    x = np.linspace(1.5, 1.6, 1000000)
+    lmbda = np.linspace(1.5, 1.6, 10000)
+
+    def material(model):
+        return lambda: model.index(x)
+
+    def overlaps():
+        rng = np.random.default_rng(0)
+        t = np.linspace(-5, 5, 1000)
+        U = rng.random((40, 1000)) + 1j * rng.random((40, 1000))
+        V = rng.random((40, 1000)) + 1j * rng.random((40, 1000))
+        return lambda: awg.core.overlaps(t, U, V)
+
+    def overlap():
+        t = np.linspace(-5, 5, 256)
+        u, v = np.exp(-t ** 2), np.exp(-(t - 0.3) ** 2)
+
+        def run():
+            for _ in range(1000):
+                awg.core.overlap(t, u, v)
+        return run
+
+    def slabindex():
+        return lambda: awg.core.slabindex(lmbda, 0.22, 1.444, 3.476, 1.444)
+
+    def wgindex():
+        return lambda: awg.core.wgindex(lmbda, 0.45, 0.22, 0.0, 1.444, 3.476, 1.444)
+
+    def wgmode():
+        t = np.linspace(-2, 2, 256)
+        return lambda: awg.core.wgmode(lmbda[:1000], 0.45, 0.22, 0.0, 1.444, 3.476, 1.444, t)
+
+    def coupler():
+        model = awg.AWG()
+        options = awg.SimulationOptions()
+        wl = model.lambda_c + np.linspace(-0.01, 0.01, 128)
+        F = awg.iw(model, wl, options=options)
+        s, _ = model.array_aperture().grid(options.points, options.window, options.tolerance)
+        c = awg.StarCoupler(F.x, model.focal_z(F.x), model.R * np.sin(s / model.R),
+                            model.R * np.cos(s / model.R))
+        c.kernel
+        ns = model.slab_waveguide().index(wl)
+        return lambda: c.diffract(wl / ns, F.E, "direct")
+
+    def fft():
+        t = np.arange(4096) * 0.05
+        u = np.exp(-((t - t.mean()) / 5) ** 2)
+        wl = np.linspace(0.40, 0.45, 64)
+        return lambda: awg.core.diffract(wl, u, t, t, 100.0, method="fft")
+
+    def sweep(channels, points):
+        model = awg.AWG(No=channels, N=max(40, 4 * channels))
+
+        def run():
+            # 冷启动：清空折射率与星型耦合器缓存
+            awg.Waveguide.cache.clear()
+            awg.StarCoupler._cache.clear()
+            awg.spectrum(model, points=points)
+        return run
+
+    def layout():
+        import gdsfactory as gf
+        import gdsdraw
+
+        gf.gpdk.PDK.activate()
+        model = awg.AWG(N=100, R=200.0)
+        return lambda: gdsdraw.awg_layout(model)
+
+    def stream():
+        import gdsdraw
+
+        model = awg.AWG(N=100, R=200.0)
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, "awg.gds")
+        return lambda: gdsdraw.stream_gds(path, gdsdraw.awg_cells(model))
+
+    items = [
+        ("material/sellmeier-SiO2-1M", lambda: material(awg.material.SiO2Model())),
+        ("material/sellmeier-Si-1M", lambda: material(awg.material.SiModel())),
+        ("material/tabulated-SiO2-1M", lambda: material(awg.material.SiO2Model().table(1.5, 1.6))),
+        ("overlap/overlaps-40x40x1000", overlaps),
+        ("overlap/scalar-1000-calls", overlap),
+        ("mode/slabindex-10k", slabindex),
+        ("mode/wgindex-10k", wgindex),
+        ("mode/wgmode-1k-x256", wgmode),
+        ("fpr/diffract-direct-128", coupler),
+        ("fpr/diffract-fft-64x4096", fft),
+    ]
+    for channels in (8, 16, 40):
+        for points in ((1000,) if quick else (1000, 10000)):
+            items.append((f"spectrum/{channels}ch-{points // 1000}k", lambda c=channels, p=points: sweep(c, p)))
+    items += [("gdsdraw/awg_layout-100arms", layout), ("gdsdraw/stream_gds-100arms", stream)]
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="skip the 10k wavelength sweeps")
+    parser.add_argument("--only", help="run only the cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--min-time", type=float, default=1.0)
+    parser.add_argument("--baseline", help="compare against this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--floor", type=float, default=0.005,
+                        help="ignore differences below this time (s)")
+    parser.add_argument("--save", help="write the results as a new baseline to this file")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+
+    unit = calibrate()[0]
+    results = {"machine": {"python": platform.python_version(), "numpy": np.__version__,
+                           "processor": platform.processor() or platform.machine(),
+                           "cpus": os.cpu_count()},
+               "calibration_s": unit, "cases": {}}
+    print(f"calibration {unit * 1e3:.2f} ms")
+
+    for name, setup in cases(args.quick):
+        if args.only and args.only not in name:
+            continue
+        try:
+            run = setup()
+        except ImportError as e:
+            results["cases"][name] = {"skipped": str(e)}
+            print(f"{name:<32} skipped ({e})")
+            continue
+        seconds, runs = best(run, args.min_time, args.repeat)
+        results["cases"][name] = {"s": seconds, "runs": runs, "normalized": seconds / unit}
+        print(f"{name:<32} {seconds:10.4f} s  ({runs} runs, {seconds / unit:9.2f} units)")
+
+    ok = True
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {args.baseline} (tolerance {args.tolerance:.0%}, "
+              f"floor {args.floor * 1e3:g} ms):")
+        for name, r in results["cases"].items():
+            ref = baseline["cases"].get(name, {})
+            if "s" not in r or "normalized" not in ref:
+                continue
+            ratio = r["normalized"] / ref["normalized"]
+            r["ratio"] = ratio
+            # 差值换算为本机时间，低于下限的差别视为计时噪声
+            excess = (r["normalized"] - ref["normalized"]) * unit
+            slower = ratio > 1 + args.tolerance and excess > args.floor
+            ok &= not slower
+            print(f"{name:<32} {ratio:6.2f}x{'  REGRESSION' if slower else ''}")
+
+    for path in (args.json, args.save):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+代理模型：拉丁超立方采样训练光谱降阶模型，验证误差与查询耗时
+
+Trains awg.Surrogate over a box of array waveguide widths and grating
+radii of the default AWG with --samples designs each (Latin hypercube,
+simulated on --workers processes, plus a quarter as many held-out
+designs), and reports the training time, the number of principal
+components, the validation errors (RMS and largest in dB, largest in
+linear transmission) and the time of one query against one spectrum
+simulation.
+
+    python benchmarks/surrogate.py [--samples 32 96] [--points 120]
+                                   [--workers N] [--max-error 0.05]
+                                   [--json out.json]
+
+Exits with status 1 if the largest linear validation error of the largest
+training set exceeds --max-error or a query is not 1000 times faster than
+the simulation.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samples", type=int, nargs="+", default=[32, 96])
+    parser.add_argument("--points", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-error", type=float, default=0.05)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    model = awg.AWG()
+    space = {"w": (0.42, 0.48), "R": (90.0, 110.0)}
+    wavelength = awg.spectrum(model, points=args.points)["wavelength"]
+    t = time.perf_counter()
+    awg.spectrum(model, wavelength)
+    simulation = time.perf_counter() - t
+
+    results, ok = [], True
+    for samples in args.samples:
+        t = time.perf_counter()
+        S = awg.Surrogate.train(model, space, samples, points=args.points, seed=0, workers=args.workers)
+        trained = time.perf_counter() - t
+
+        queries = 2000
+        rng = np.random.default_rng(0)
+        w, R = rng.uniform(*space["w"], queries), rng.uniform(*space["R"], queries)
+        t = time.perf_counter()
+        for i in range(queries):
+            S(w=w[i], R=R[i])
+        query = (time.perf_counter() - t) / queries
+
+        r = {"samples": samples, "train_s": trained, "components": S.components.shape[0],
+             "query_s": query, "simulation_s": simulation, "speedup": simulation / query,
+             **{f"validation_{k}": v for k, v in S.validation.items()}}
+        results.append(r)
+        print(f"{samples:4d} designs: trained in {trained:6.1f} s, {r['components']} components, "
+              f"validation {S.validation['rms']:.2f} dB RMS, {S.validation['max']:.1f} dB max, "
+              f"{S.validation['linear']:.3f} linear; query {query * 1e6:.0f} us "
+              f"({r['speedup']:.0f}x a spectrum)")
+        ok &= r["speedup"] > 1000
+    ok &= results[-1]["validation_linear"] <= args.max_error
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+温度扫描：复用与温度无关的几何和模式，与逐温度完整仿真比较
+
+Sweeps the default AWG over one free spectral range at --counts
+temperatures between --tmin and --tmax (K) with the temperature sweep of
+simulate(..., temperature=...) (see awg.thermal), and compares it with
+running the full chain on model.at(T) for every --check-th temperature:
+the time of the full chain is extrapolated to the whole sweep. Reports the
+runtimes, the speedup, the largest transmission error and the thermal
+drift of the channel centers (see spectrum).
+
+    python benchmarks/thermal.py [--counts 50 200] [--tmin 250 --tmax 350]
+                                 [--points 250] [--check 10] [--json out.json]
+
+Exits with status 1 if the error exceeds --max-error or the sweep is not
+faster than the full chain.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--counts", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--tmin", type=float, default=250.0)
+    parser.add_argument("--tmax", type=float, default=350.0)
+    parser.add_argument("--points", type=int, default=250)
+    parser.add_argument("--check", type=int, default=10, help="run the full chain at every n-th temperature")
+    parser.add_argument("--max-error", type=float, default=1e-3)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import numpy as np
+    import awg
+
+    # Si 模型只标定到 300 K，外推警告不影响基准
+    warnings.simplefilter("ignore", RuntimeWarning)
+    model = awg.AWG()
+    wavelength = awg.spectrum(model, points=2)["wavelength"]
+    wavelength = np.linspace(wavelength[0], wavelength[-1], args.points)
+    awg.simulate(model, wavelength[:2], temperature=[args.tmin, args.tmax])
+
+    results, ok = [], True
+    for count in args.counts:
+        temperature = np.linspace(args.tmin, args.tmax, count)
+        t = time.perf_counter()
+        r = awg.spectrum(model, wavelength, temperature=temperature)
+        sweep = time.perf_counter() - t
+
+        checked = np.arange(0, count, args.check)
+        t = time.perf_counter()
+        full = np.stack([awg.simulate(model.at(temperature[i]), wavelength) for i in checked])
+        chain = (time.perf_counter() - t) * count / checked.size
+        error = float(np.max(np.abs(r["transmission"][checked] - full)))
+
+        result = {"temperatures": count, "wavelengths": args.points, "sweep_s": sweep,
+                  "full_s": chain, "speedup": chain / sweep, "error": error,
+                  "slope_nm_per_K": (r["slope"] * 1e3).tolist()}
+        results.append(result)
+        print(f"{count:4d} temperatures x {args.points} wavelengths: sweep {sweep:6.2f} s, "
+              f"full chain {chain:7.2f} s ({result['speedup']:5.1f}x), error {error:.1e}, "
+              f"drift of channel {model.No // 2} {r['slope'][model.No // 2] * 1e3:.4f} nm/K")
+        ok &= error <= args.max_error and sweep < chain
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
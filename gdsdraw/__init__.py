@@ -10,3 +10,7 @@ from .sector import sector
 from .ring_arc import ring_arc
 from .curved_taper import curved_taper
 from .elliptical_arc_ring import elliptical_arc_ring
+from .awg_layout import awg_layout
+from .arc_num_points import arc_num_points
+from .stream_gds import stream_gds, Cell, Reference
+from .awg_cells import awg_cells
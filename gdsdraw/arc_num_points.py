@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def arc_num_points(
+    radius: float,
+    angle: float,
+    tolerance: float | None = None,
+    angle_resolution: float = 2.5,
+    grid: float = 0.001
+) -> int:
+    """圆弧的描点数目
+
+    tolerance 为 None 时按固定角分辨率 angle_resolution（度）取点；
+    否则按弦高误差取点：半径 r 的圆弧上相邻两点的弦与圆弧的最大偏差为
+    r (1 - cos(dθ / 2))，令其不超过 tolerance，得到每段的最大角度
+
+        dθ = 2 arccos(1 - tolerance / r)
+
+    因此大半径的星形耦合器圆弧点数少，小半径弯曲的点数多。版图坐标
+    最终对齐到 grid，tolerance 也取为 grid 的整数倍（至少一个格点）；
+    写入版图后顶点对齐还会带来至多 grid / √2 的额外偏差。
+
+    Args:
+        radius: 圆弧半径（有多个半径时取最大者，弦高误差最大）
+        angle: 圆弧张角（度）
+        tolerance: 最大弦高误差（nm），None 表示使用 angle_resolution
+        angle_resolution: 角分辨率（度）
+        grid: 版图格点（um）
+    """
+    angle = abs(angle)
+    if tolerance is None:
+        return int(np.round(angle / angle_resolution)) + 1
+    if tolerance <= 0:
+        raise ValueError(f"tolerance={tolerance} must be > 0")
+    if radius <= 0:
+        raise ValueError(f"radius={radius} must be > 0")
+    tol = max(np.round(tolerance * 1e-3 / grid), 1) * grid
+    step = 2 * np.arccos(max(1 - tol / radius, -1.0))
+    return max(int(np.ceil(np.deg2rad(angle) / step)), 1) + 1
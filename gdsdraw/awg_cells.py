@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+from .awg_layout import _geometry
+from .stream_gds import Cell, Reference
+
+
+def awg_cells(
+    model,
+    name: str = "AWG",
+    arm_width: float | None = None,
+    taper_length: float = 10.0,
+    bend_radius: float = 10.0,
+    angle: float = 60.0,
+    separation: float | None = None,
+    angle_resolution: float = 1.0,
+    layer: tuple[int, int] = (1, 0),
+    tolerance: float | None = None
+) -> Iterator[Cell]:
+    """按单元逐个生成 AWG 版图，供 stream_gds 流式写出
+
+    几何与 awg_layout 完全相同，但不创建 gdsfactory 单元：先给出所用的
+    锥形波导单元（名字由参数决定，不同 AWG 之间共享，stream_gds 只写
+    一次），最后给出名为 name 的 AWG 单元，其中阵列波导和平板为多边形，
+    锥形波导为引用。参数含义见 awg_layout。
+
+    例：把多个 AWG 变体写入同一个文件
+
+        def reticle():
+            top = []
+            for i, model in enumerate(models):
+                yield from awg_cells(model, name=f"AWG_{i}")
+                top.append(Reference(f"AWG_{i}", (0, 2000 * i)))
+            yield Cell("TOP", references=top)
+
+        stream_gds("reticle.gds", reticle())
+    """
+    polygons, references, _ = _geometry(model, arm_width, taper_length, bend_radius, angle,
+                                        separation, angle_resolution, tolerance)
+    names = {}
+    for key, _, _ in references:
+        if key not in names:
+            names[key] = _taper_name(*key, layer)
+            yield Cell(names[key], [(layer, _taper_points(*key))])
+    yield Cell(name, ((layer, p) for p in polygons),
+               (Reference(names[key], origin, rotation) for key, rotation, origin in references))
+
+
+def _taper_name(w1, w2, length, layer):
+    # 名字只由参数决定，相同参数的锥形波导在整个文件中共享
+    return f"taper_{w1:.12g}_{w2:.12g}_{length:.12g}_{layer[0]}_{layer[1]}".replace(".", "p").replace("-", "m")
+
+
+def _taper_points(w1, w2, length):
+    """与 taper(w1, w2, length) 相同的顶点：短边中心在原点，沿 +x 方向"""
+    return [(0.0, -w1 / 2), (0.0, w1 / 2), (length, w2 / 2), (length, -w2 / 2)]
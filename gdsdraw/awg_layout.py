@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .arc_num_points import arc_num_points
+from .taper import taper
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
+    from gdsfactory.typings import LayerSpec
+
+
+# 按参数复用的单元（锥形波导等），键为绘制参数
+_cells: dict = {}
+
+
+def awg_layout(
+    model,
+    arm_width: float | None = None,
+    taper_length: float = 10.0,
+    bend_radius: float = 10.0,
+    angle: float = 60.0,
+    separation: float | None = None,
+    angle_resolution: float = 1.0,
+    layer: LayerSpec = (1, 0),
+    tolerance: float | None = None
+) -> gf.Component:
+    """绘制完整的 AWG 版图（马蹄形阵列）
+
+           FPR1                      FPR2
+            \\  ___________________  /
+             \\/  阵列波导（镜像对称） \\/
+
+    每根阵列波导由径向直波导、半径为 bend_radius 的圆弧和水平直波导组成，
+    关于 x = 0 镜像对称。所有阵列波导的中心线与边界在一次 numpy 运算中
+    按 (N, 点数, 2) 的数组求出，每根波导写成一个多边形；相同的锥形波导
+    只生成一个单元并按引用放置。若 model.L0 不足以完成布线，
+    自动增加 L0（只引入全局相位，不改变光谱），实际值记录在 c.info 中。
+
+    Args:
+        model: AWG 模型（awg.AWG），使用其 N, R, d, g, w, dl, L0 及输入输出波导参数
+        arm_width: 阵列波导宽度，默认 model.w
+        taper_length: 锥形波导长度
+        bend_radius: 阵列波导的弯曲半径
+        angle: FPR1 轴线方向（度，相对 +x）
+        separation: 两个 FPR 焦点之间的距离，默认取可布线的最小值
+        angle_resolution: 圆弧角分辨率（度）
+        layer: gdsfactory layer
+        tolerance: 最大弦高误差（nm），给定时按各圆弧半径确定点数，忽略 angle_resolution
+    """
+    import gdsfactory as gf
+
+    polygons, references, info = _geometry(model, arm_width, taper_length, bend_radius, angle,
+                                           separation, angle_resolution, tolerance)
+    c = gf.Component()
+    for p in polygons:
+        c.add_polygon(p, layer=layer)
+    for (w1, w2, length), rotation, origin in references:
+        ref = c.add_ref(_taper_cell(w1, w2, length, layer))
+        ref.rotate(rotation)
+        ref.move(origin)
+    c.info.update(info)
+    return c
+
+
+def _geometry(model, arm_width, taper_length, bend_radius, angle, separation, angle_resolution, tolerance):
+    """
+    版图几何：(多边形列表, 锥形波导引用 [((w1, w2, length), 旋转角度, 位置)], info)，
+    awg_layout 与 awg_cells 共用
+    """
+    w = model.w if arm_width is None else arm_width
+    N, R = model.N, model.R
+    theta_c = np.deg2rad(angle)
+    theta = theta_c + (np.arange(N) - (N - 1) / 2) * model.d / R
+    if theta.min() <= 0 or theta.max() >= np.pi:
+        raise ValueError("array fan must point upwards: adjust angle or N d / R")
+    # 锥形波导之后的径向起点（相对 FPR1 焦点）
+    r0 = R + taper_length
+    if separation is None:
+        X = _separation(theta, r0, bend_radius, model.dl, taper_length, model.L0)
+    else:
+        X = separation / 2
+    lo, hi = _window(theta, r0, bend_radius, model.dl, X, taper_length)
+    if not lo <= hi or model.L0 > hi:
+        raise ValueError(f"separation={2 * X:g} is too small for this array")
+    L0 = max(float(model.L0), float(lo))
+    lengths = L0 + np.arange(N) * model.dl
+
+    # 半臂：径向直波导 s、圆弧 rho * theta、水平直波导 h，到 x = 0
+    px = -X + r0 * np.cos(theta)
+    py = r0 * np.sin(theta)
+    s = (lengths / 2 - taper_length + px - bend_radius * (theta - np.sin(theta))) / (1 - np.cos(theta))
+    h = -px - s * np.cos(theta) - bend_radius * np.sin(theta)
+    y = py + s * np.sin(theta) + bend_radius * (1 - np.cos(theta))
+    if np.any(np.diff(y) < w):
+        raise ValueError("array waveguides overlap: increase d, bend_radius or separation")
+
+    # 中心线及切向角，形状 (N, M)
+    n = arc_num_points(bend_radius + w / 2, np.rad2deg(theta.max()), tolerance, angle_resolution)
+    phi = theta[:, np.newaxis] * np.linspace(0, 1, n)
+    ax, ay = px + s * np.cos(theta), py + s * np.sin(theta)
+    cx, cy = ax + bend_radius * np.sin(theta), ay - bend_radius * np.cos(theta)
+    tangent = theta[:, np.newaxis] - phi
+    arc_x = cx[:, np.newaxis] - bend_radius * np.sin(tangent)
+    arc_y = cy[:, np.newaxis] + bend_radius * np.cos(tangent)
+    x = np.column_stack([px, arc_x])
+    yy = np.column_stack([py, arc_y])
+    t = np.column_stack([theta, tangent])
+    # 右半臂为左半臂关于 x = 0 的镜像（逆序）
+    x = np.concatenate([x, -x[:, ::-1]], axis=1)
+    yy = np.concatenate([yy, yy[:, ::-1]], axis=1)
+    t = np.concatenate([t, -t[:, ::-1]], axis=1)
+
+    nx, ny = -np.sin(t) * w / 2, np.cos(t) * w / 2
+    polygons = list(np.concatenate([np.stack([x + nx, yy + ny], axis=-1),
+                                    np.stack([x - nx, yy - ny], axis=-1)[:, ::-1]], axis=1))
+
+    # 两个 FPR、阵列与输入输出锥形波导（单元复用）
+    references = []
+    for side, origin in ((1, (-X, 0.0)), (-1, (X, 0.0))):
+        apertures = model.input_aperture() if side == 1 else model.output_aperture()
+        slab, refs = _fpr(model, apertures, theta, origin, side, w, taper_length, angle_resolution, tolerance)
+        polygons.append(slab)
+        references += refs
+
+    info = {"L0": float(L0), "separation": float(2 * X), "length": float(lengths[-1]),
+            "width": float(2 * X + 2 * r0)}
+    return polygons, references, info
+
+
+def _taper_cell(w1, w2, length, layer):
+    key = ("taper", float(w1), float(w2), float(length), tuple(layer))
+    if key not in _cells:
+        _cells[key] = taper(w1, w2, length, layer=layer)
+    return _cells[key]
+
+
+def _fpr(model, apertures, theta, origin, side, w, taper_length, angle_resolution, tolerance):
+    """自由传播区平板、阵列侧锥形波导和焦线侧锥形波导；side = -1 为镜像的 FPR2"""
+    R = model.R
+    ox, oy = origin
+    theta_c = theta.mean()
+    margin = model.d / R
+    a = np.linspace(theta.min() - margin, theta.max() + margin,
+                    arc_num_points(R, np.rad2deg(np.ptp(theta) + 2 * margin), tolerance, angle_resolution))
+
+    # 焦线：局部坐标 (x 横向, z 轴向) -> 全局，横向 v 为轴向 u 顺时针旋转 90 度
+    u = np.array([np.cos(theta_c), np.sin(theta_c)])
+    v = np.array([np.sin(theta_c), -np.cos(theta_c)])
+    pitch = apertures.pitch
+    xs = np.linspace(apertures.positions.min() - pitch, apertures.positions.max() + pitch,
+                     max(int(np.ceil(2 * np.ptp(apertures.positions) / pitch)), 2) + 1)
+    zs = model.focal_z(xs)
+    focal = zs[:, np.newaxis] * u + xs[:, np.newaxis] * v
+    arc = R * np.column_stack([np.cos(a), np.sin(a)])
+    slab = np.concatenate([arc, focal[::-1]])
+    slab[:, 0] *= side
+
+    key = (float(model.wa), float(w), float(taper_length))
+    references = [(key, float(np.rad2deg(t) if side == 1 else 180 - np.rad2deg(t)),
+                   (ox + side * R * np.cos(t), oy + R * np.sin(t))) for t in theta]
+
+    # 焦线上的锥形波导指向光栅圆的极点 (0, R)
+    key = (float(apertures.width), float(w), float(taper_length))
+    z = model.focal_z(apertures.positions)
+    for xk, zk in zip(apertures.positions, z):
+        p = zk * u + xk * v
+        d = p - R * u
+        references.append((key, float(np.rad2deg(np.arctan2(d[1], side * d[0]))),
+                           (ox + side * p[0], oy + p[1])))
+    return slab + origin, references
+
+
+def _window(theta, r0, rho, dl, X, lt):
+    """各 X 下可行的 L0 区间 [lo, hi]（径向直波导 s >= 0、水平直波导 h >= 0）"""
+    X = np.asarray(X, dtype=float)[..., np.newaxis]
+    k = np.arange(theta.size)
+    px = -X + r0 * np.cos(theta)
+    cos = np.cos(theta)
+    # h = -px - s cos(theta) - rho sin(theta) >= 0 给出 s 的上界（cos > 0）或下界（cos < 0）
+    sb = (-px - rho * np.sin(theta)) / np.where(cos == 0, 1, cos)
+    s_lo = np.where(cos < 0, np.maximum(sb, 0), 0.0)
+    s_hi = np.where(cos > 0, sb, np.inf)
+    base = rho * (theta - np.sin(theta)) - px
+    lo = s_lo * (1 - cos) + base
+    hi = np.where(s_hi >= s_lo, s_hi * (1 - cos) + base, -np.inf)
+    # 半臂长度 L/2 = lt + s + rho * theta + h
+    lo, hi = 2 * (lo + lt) - k * dl, 2 * (hi + lt) - k * dl
+    return np.max(lo, axis=-1), np.min(hi, axis=-1)
+
+
+def _separation(theta, r0, rho, dl, lt, L0):
+    """可布线且容纳 L0 的最小半间距 X（在网格上向量化搜索）"""
+    X = r0 * np.geomspace(0.5, 50, 400)
+    lo, hi = _window(theta, r0, rho, dl, X, lt)
+    ok = np.flatnonzero((lo <= hi) & (L0 <= hi))
+    if ok.size == 0:
+        raise ValueError("no horseshoe layout found: reduce N d / R or change angle")
+    return X[ok[0]]
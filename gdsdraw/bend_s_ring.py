@@ -1,7 +1,15 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
 from numpy import cos, sin, pi, rad2deg, atan
-import gdsfactory as gf
-from gdsfactory.typings import LayerSpec
+
+from .arc_num_points import arc_num_points
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
+    from gdsfactory.typings import LayerSpec
 
 
 def bend_s_ring(
@@ -12,7 +20,8 @@ def bend_s_ring(
     y_center: float = 0.0,
     angle_resolution: float = 2.5,
     radius_min: float = 10,
-    layer: LayerSpec = (1, 0)
+    layer: LayerSpec = (1, 0),
+    tolerance: float | None = None
 ) -> gf.Component:
     """绘制由两个圆环拼接而成的 S bend
             |<------ w ------>|
@@ -32,7 +41,9 @@ def bend_s_ring(
         angle_resolution: resolution of the ring.
         radius_min: 构成Bend的圆环所允许的最小半径
         layer: gdsfactory layer
+        tolerance: 最大弦高误差（nm），给定时按外圆半径确定点数，忽略 angle_resolution
     """
+    import gdsfactory as gf
 
     if h >= 0:
         direction = 1
@@ -51,7 +62,7 @@ def bend_s_ring(
     inner_radius = radius - w / 2
     outer_radius = radius + w / 2
     angle = rad2deg(theta)
-    n = int(np.round(angle / angle_resolution)) + 1
+    n = arc_num_points(outer_radius, angle, tolerance, angle_resolution)
     if direction == 1:
         x_ring1 = x_center
         y_ring1 = y_center + radius
@@ -81,5 +92,5 @@ def bend_s_ring(
     else:
         x = np.concatenate([inner_points_x_1[::-1], outer_points_x_2, inner_points_x_2[::-1], outer_points_x_1])
         y = np.concatenate([inner_points_y_1[::-1], outer_points_y_2, inner_points_y_2[::-1], outer_points_y_1])
-    c.add_polygon(points=list(zip(x, y, strict=False)), layer=layer)
+    c.add_polygon(points=np.column_stack((x, y)), layer=layer)
     return c
@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
-import gdsfactory as gf
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
 
 
 def curved_taper(
@@ -22,6 +28,7 @@ def curved_taper(
             center (float): 锥形波导短边中心
             layer (float): gdsfactory绘制层
         """
+    import gdsfactory as gf
 
     c = gf.Component()
     alpha = (w1 - w2) / (length ** m)
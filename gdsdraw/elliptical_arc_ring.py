@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
-import gdsfactory as gf
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
 
 
 def ellipse_arc_points(
@@ -10,6 +16,7 @@ def ellipse_arc_points(
     rotate_angle: float = 0.0,
     angle_resolution: float = 1.0,
     center: tuple[float, float] = (0.0, 0.0),
+    tolerance: float | None = None,
 ) -> np.ndarray:
     """生成椭圆弧坐标点
 
@@ -22,6 +29,8 @@ def ellipse_arc_points(
     rotate_angle (float): 椭圆旋转角度（相对于椭圆中心）
     angle_resolution (float): 绘图角分辨率（度）
     center (tuple[float, float]): 椭圆中心点坐标
+    tolerance (float | None): 最大弦高误差（nm）。给定时按局部曲率自适应取点，
+        曲率大的长轴两端点密、短轴两端点疏，忽略 angle_resolution
 
     Returns
     -------
@@ -34,10 +43,13 @@ def ellipse_arc_points(
     elif b <= 0:
         raise ValueError(f"b={b} must be > 0")
 
-    # 根据角分辨率计算绘图所用坐标点总数
-    num_points = int(np.round(np.abs(theta_stop-theta_start) / angle_resolution)) + 1
-    # 防止超出 theta_stop 的范围
-    theta = np.linspace(np.deg2rad(theta_start), np.deg2rad(theta_stop), num_points)
+    if tolerance is None:
+        # 根据角分辨率计算绘图所用坐标点总数
+        num_points = int(np.round(np.abs(theta_stop-theta_start) / angle_resolution)) + 1
+        # 防止超出 theta_stop 的范围
+        theta = np.linspace(np.deg2rad(theta_start), np.deg2rad(theta_stop), num_points)
+    else:
+        theta = _adaptive_theta(a, b, np.deg2rad(theta_start), np.deg2rad(theta_stop), tolerance)
 
     # 计算椭圆坐标，计算大量数据采用 numpy 库
     x = a * np.cos(theta)
@@ -55,6 +67,28 @@ def ellipse_arc_points(
     return np.column_stack((x_final, y_final))
 
 
+def _adaptive_theta(a, b, t0, t1, tolerance):
+    """按弦高误差自适应的参数角 t
+
+    参数步长 dt 对应的弦高约为 ds^2 / (8 rho)，其中 ds = |r'(t)| dt，
+    曲率半径 rho = |r'(t)|^3 / (a b)，|r'(t)| = sqrt(a^2 sin^2 t + b^2 cos^2 t)。
+    令弦高等于 tolerance，单位 t 内的分段数为 sqrt(a b / (8 tol |r'(t)|))，
+    对其积分后按等分取点。
+    """
+    if tolerance <= 0:
+        raise ValueError(f"tolerance={tolerance} must be > 0")
+    # 对齐到 1 nm 格点，至少一个格点
+    tol = max(np.round(tolerance), 1) * 1e-3
+    t = np.linspace(t0, t1, 4097)
+    speed = np.sqrt((a * np.sin(t)) ** 2 + (b * np.cos(t)) ** 2)
+    density = np.sqrt(a * b / (8 * tol * speed))
+    # 累积分段数（梯形积分）
+    dt = np.abs(t1 - t0) / (t.size - 1)
+    count = np.concatenate([[0.0], np.cumsum((density[1:] + density[:-1]) / 2 * dt)])
+    n = max(int(np.ceil(count[-1])), 1)
+    return np.interp(np.linspace(0, count[-1], n + 1), count, t)
+
+
 def elliptical_arc_ring(
     a_inner: float = 0.0,
     b_inner: float = 0.0,
@@ -65,7 +99,8 @@ def elliptical_arc_ring(
     rotate_angle: float = 0.0,
     angle_resolution: float = 1.0,
     center: tuple[float, float] = (0.0, 0.0),
-    layer: tuple[int, int] = (1, 0)
+    layer: tuple[int, int] = (1, 0),
+    tolerance: float | None = None
 ) -> gf.Component:
     """绘制椭圆弧环
     参数：
@@ -76,15 +111,18 @@ def elliptical_arc_ring(
         angle_resolution (float): 绘图角分辨率
         center (float): 椭圆环中心
         layer (float): 绘制层
+        tolerance (float | None): 最大弦高误差（nm），给定时按曲率自适应取点
     """
+    import gdsfactory as gf
+
     c = gf.Component()
 
     # 外弧 (正向)
     outer_arc = ellipse_arc_points(a_outer, b_outer, theta_start, theta_stop, rotate_angle=rotate_angle,
-                                   angle_resolution=angle_resolution, center=center)
+                                   angle_resolution=angle_resolution, center=center, tolerance=tolerance)
     # 内弧 (反向)
     inner_arc = ellipse_arc_points(a_inner, b_inner, theta_stop, theta_start, rotate_angle=rotate_angle,
-                                   angle_resolution=angle_resolution, center=center)
+                                   angle_resolution=angle_resolution, center=center, tolerance=tolerance)
 
     # 拼接椭圆环
     ring_points = np.vstack([outer_arc, inner_arc])
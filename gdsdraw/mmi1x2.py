@@ -1,5 +1,10 @@
-import gdsfactory as gf
-from gdsfactory.typings import LayerSpec
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
+    from gdsfactory.typings import LayerSpec
 
 
 def mmi1x2(
@@ -13,6 +18,7 @@ def mmi1x2(
     cross_section="strip",
     layer: LayerSpec | None = None,
 ):
+    import gdsfactory as gf
 
     c = gf.Component()
 
@@ -1,7 +1,15 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
 from numpy import cos, sin, pi
-import gdsfactory as gf
-from gdsfactory.typings import LayerSpec
+
+from .arc_num_points import arc_num_points
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
+    from gdsfactory.typings import LayerSpec
 
 
 def ring_arc(
@@ -12,7 +20,8 @@ def ring_arc(
     x_center: float = 0.0,
     y_center: float = 0.0,
     angle_resolution: float = 2.5,
-    layer: LayerSpec = (1, 0)
+    layer: LayerSpec = (1, 0),
+    tolerance: float | None = None
 ) -> gf.Component:
     """Returns a ring arc.
 
@@ -25,7 +34,10 @@ def ring_arc(
         y_center: 圆环弧的中心坐标y
         angle_resolution: resolution of the ring.
         layer: gdsfactory layer
+        tolerance: 最大弦高误差（nm），给定时按外圆半径确定点数，忽略 angle_resolution
     """
+    import gdsfactory as gf
+
     if radius <= 0:
         raise ValueError(f"radius={radius} must be > 0")
     if width <= 0:
@@ -36,7 +48,7 @@ def ring_arc(
     c = gf.Component()
     inner_radius = radius - width / 2
     outer_radius = radius + width / 2
-    n = int(np.round((theta_stop - theta_start) / angle_resolution)) + 1
+    n = arc_num_points(outer_radius, theta_stop - theta_start, tolerance, angle_resolution)
     t = np.linspace(theta_start, theta_stop, n) * pi / 180
     inner_points_x = x_center + inner_radius * cos(t)
     inner_points_y = y_center + inner_radius * sin(t)
@@ -44,5 +56,5 @@ def ring_arc(
     outer_points_y = y_center + outer_radius * sin(t)
     x = np.concatenate([inner_points_x, outer_points_x[::-1]])
     y = np.concatenate([inner_points_y, outer_points_y[::-1]])
-    c.add_polygon(points=list(zip(x, y, strict=False)), layer=layer)
+    c.add_polygon(points=np.column_stack((x, y)), layer=layer)
     return c
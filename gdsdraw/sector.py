@@ -1,7 +1,15 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
 from numpy import cos, sin
-import gdsfactory as gf
-from gdsfactory.typings import LayerSpec
+
+from .arc_num_points import arc_num_points
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
+    from gdsfactory.typings import LayerSpec
 
 
 def sector(
@@ -11,7 +19,8 @@ def sector(
     x_center: float = 0.0,
     y_center: float = 0.0,
     angle_resolution: float = 2.5,
-    layer: LayerSpec = (1, 0)
+    layer: LayerSpec = (1, 0),
+    tolerance: float | None = None
 ) -> gf.Component:
     """Generate a circle geometry.
 
@@ -23,13 +32,16 @@ def sector(
         y_center: 扇形的中心坐标y
         angle_resolution: number of degrees per point.
         layer: layer.
+        tolerance: 最大弦高误差（nm），给定时按半径确定点数，忽略 angle_resolution
     """
+    import gdsfactory as gf
+
     if radius <= 0:
         raise ValueError(f"radius={radius} must be > 0")
     if angle_stop <= angle_start:
         raise ValueError(f"theta_stop={angle_stop} must be > theta_start={angle_start}")
     c = gf.Component()
-    num_points = int(np.round((angle_stop - angle_start) / angle_resolution)) + 1
+    num_points = arc_num_points(radius, angle_stop - angle_start, tolerance, angle_resolution)
     theta = np.deg2rad(np.linspace(angle_start, angle_stop, num_points, endpoint=True))
     points = np.stack((x_center + radius * cos(theta), y_center + radius * sin(theta)), axis=-1)
     points = np.append(points, np.array([[x_center, y_center]]), axis=0)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import datetime
+import struct
+from collections.abc import Iterable
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Reference(NamedTuple):
+    """单元引用：先绕原点旋转 rotation（度），再平移到 origin"""
+    cell: str
+    origin: tuple[float, float] = (0.0, 0.0)
+    rotation: float = 0.0
+
+
+class Cell(NamedTuple):
+    """
+    流式写出的单元：polygons 为 (layer, 顶点数组) 的可迭代对象，
+    references 为 Reference 的可迭代对象，二者都可以是生成器
+    """
+    name: str
+    polygons: Iterable = ()
+    references: Iterable = ()
+
+
+# GDSII 记录类型（含数据类型字节）
+_HEADER, _BGNLIB, _LIBNAME, _UNITS, _ENDLIB = 0x0002, 0x0102, 0x0206, 0x0305, 0x0400
+_BGNSTR, _STRNAME, _ENDSTR = 0x0502, 0x0606, 0x0700
+_BOUNDARY, _SREF, _LAYER, _DATATYPE, _XY, _ENDEL = 0x0800, 0x0A00, 0x0D02, 0x0E02, 0x1003, 0x1100
+_SNAME, _STRANS, _ANGLE = 0x1206, 0x1A01, 0x1C05
+
+# 单个 XY 记录最多 8191 个点（含闭合点）
+_MAX_POINTS = 8190
+
+
+def stream_gds(
+    path: str,
+    cells: Iterable[Cell],
+    unit: float = 1e-6,
+    precision: float = 1e-9,
+    libname: str = "AWG"
+) -> dict:
+    """流式写出 GDSII 文件
+
+    逐个消费 cells（通常是生成器）并立即把每个单元写入文件，不在内存中
+    保留版图，因此峰值内存只取决于单个单元，而与单元（版图变体）的数目
+    无关。GDSII 允许引用尚未写出的单元，顶层单元可以最后给出。
+
+    同名单元只写出第一次出现的那个：重复的基本单元（锥形波导、弯曲等）
+    按由参数生成的名字共享，后续同名单元直接跳过，只保留引用。
+
+    坐标按 precision 对齐到整数格点。
+
+    Args:
+        path: 输出文件路径
+        cells: Cell 的可迭代对象
+        unit: 用户单位（m），默认 1 um
+        precision: 数据库单位（m），默认 1 nm
+        libname: 库名
+
+    Returns:
+        统计信息 {"cells", "skipped", "polygons", "references", "bytes"}
+    """
+    scale = unit / precision
+    stats = {"cells": 0, "skipped": 0, "polygons": 0, "references": 0, "bytes": 0}
+    written = set()
+    now = datetime.datetime.now()
+    stamp = (now.year, now.month, now.day, now.hour, now.minute, now.second) * 2
+
+    with open(path, "wb") as f:
+        f.write(_record(_HEADER, struct.pack(">h", 600)))
+        f.write(_record(_BGNLIB, struct.pack(">12h", *stamp)))
+        f.write(_record(_LIBNAME, _string(libname)))
+        f.write(_record(_UNITS, _real8(precision / unit) + _real8(precision)))
+
+        for cell in cells:
+            if cell.name in written:
+                stats["skipped"] += 1
+                continue
+            written.add(cell.name)
+            stats["cells"] += 1
+            f.write(_record(_BGNSTR, struct.pack(">12h", *stamp)))
+            f.write(_record(_STRNAME, _string(cell.name)))
+
+            for layer, points in cell.polygons:
+                points = np.asarray(points, dtype=float)
+                if len(points) > _MAX_POINTS:
+                    raise ValueError(f"polygon in cell {cell.name!r} has {len(points)} vertices, "
+                                     f"GDSII allows at most {_MAX_POINTS}")
+                # 闭合多边形：末点重复首点
+                xy = np.round(np.concatenate([points, points[:1]]) * scale).astype(">i4")
+                f.write(_record(_BOUNDARY)
+                        + _record(_LAYER, struct.pack(">h", layer[0]))
+                        + _record(_DATATYPE, struct.pack(">h", layer[1]))
+                        + _record(_XY, xy.tobytes())
+                        + _record(_ENDEL))
+                stats["polygons"] += 1
+
+            for ref in cell.references:
+                xy = np.round(np.asarray(ref.origin, dtype=float) * scale).astype(">i4")
+                body = _record(_SREF) + _record(_SNAME, _string(ref.cell))
+                rotation = float(ref.rotation) % 360
+                if rotation:
+                    body += _record(_STRANS, struct.pack(">H", 0)) + _record(_ANGLE, _real8(rotation))
+                f.write(body + _record(_XY, xy.tobytes()) + _record(_ENDEL))
+                stats["references"] += 1
+
+            f.write(_record(_ENDSTR))
+
+        f.write(_record(_ENDLIB))
+        stats["bytes"] = f.tell()
+    return stats
+
+
+def _record(kind, data=b""):
+    return struct.pack(">HH", 4 + len(data), kind) + data
+
+
+def _string(s):
+    b = s.encode("ascii")
+    # 字符串补齐到偶数字节
+    return b + b"\0" * (len(b) % 2)
+
+
+def _real8(x):
+    """GDSII 8 字节实数：符号位、16 进制偏移 64 的指数、56 位尾数"""
+    if x == 0:
+        return b"\0" * 8
+    sign = 0x80 if x < 0 else 0
+    x = abs(x)
+    exponent = 64
+    while x >= 1:
+        x /= 16
+        exponent += 1
+    while x < 1 / 16:
+        x *= 16
+        exponent -= 1
+    mantissa = int(round(x * 2 ** 56))
+    if mantissa >= 2 ** 56:
+        mantissa //= 16
+        exponent += 1
+    return struct.pack(">B", sign | exponent) + mantissa.to_bytes(7, "big")
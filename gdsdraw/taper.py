@@ -1,6 +1,12 @@
-import gdsfactory as gf
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from numpy import cos, sin, deg2rad
 
+if TYPE_CHECKING:
+    import gdsfactory as gf
+
 
 def taper(
     w1: float = 1.0,
@@ -18,6 +24,7 @@ def taper(
             center (float): 锥形波导短边中心
             layer (float): gdsfactory绘制层
         """
+    import gdsfactory as gf
 
     c = gf.Component()
     x = center[0]
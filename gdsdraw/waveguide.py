@@ -1,5 +1,11 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import numpy as np
-import gdsfactory as gf
+
+if TYPE_CHECKING:
+    import gdsfactory as gf
 
 
 def waveguide(
@@ -16,6 +22,8 @@ def waveguide(
         width (float): 波导宽度
         layer (tuple[int, int]): 绘制层
     """
+    import gdsfactory as gf
+
     dx, dy = end[0]-start[0], end[1]-start[1]
     length = np.sqrt(dx**2 + dy**2)
     angle = np.degrees(np.arctan2(dy, dx))
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import awg
+from awg.core import autoset, trapzw
+
+TOLERANCES = (1e-2, 1e-3, 1e-4)
+
+
+def apertures():
+    for polarization in ("TE", "TM"):
+        model = awg.AWG(polarization=polarization)
+        for aperture in (model.input_aperture(), model.array_aperture(), model.output_aperture()):
+            yield pytest.param(model, aperture, id=f"{polarization}-{aperture.count}")
+
+
+@pytest.mark.parametrize("tol", TOLERANCES)
+def test_smooth_integral_within_tolerance(tol):
+    def f(x):
+        return np.stack([np.exp(-x ** 2), 1 / np.cosh(3 * x)])
+
+    x = autoset(f, -4.0, 4.0, tol)
+    fine = np.linspace(-4.0, 4.0, 200001)
+    error = np.abs(trapzw(x) @ f(x).T - np.trapezoid(f(fine), fine))
+    assert np.all(error <= tol * 8.0)
+
+
+@pytest.mark.parametrize("model, aperture", list(apertures()))
+def test_aperture_row_integral_within_tolerance(model, aperture):
+    # Aperture 的自适应采样所积分的整排场（见 Aperture._adaptive）
+    p = aperture.pitch
+    shifts = p * np.arange(-3, 4)
+
+    def row(x):
+        E, H, _ = aperture.waveguide.mode(aperture.lambda_c, x[:, np.newaxis] - shifts)
+        return np.abs(np.stack([E, H])).sum(axis=-1)
+
+    fine = np.linspace(0.0, p / 2, 200001)
+    reference = np.trapezoid(row(fine), fine)
+    scale = np.max(row(fine)) * p / 2
+    for tol in TOLERANCES:
+        x = autoset(row, 0.0, p / 2, tol)
+        assert np.max(np.abs(row(x) @ trapzw(x) - reference)) <= tol * scale
+
+
+@pytest.mark.parametrize("model, aperture", list(apertures()))
+def test_aperture_overlaps_within_tolerance(model, aperture):
+    # 单位功率模式与数值孔径内各方向平面波的重叠积分
+    lc = model.lambda_c
+    q = 2 * np.pi * model.slab_waveguide().index(lc) / lc * np.linspace(0.0, 0.3, 7)
+    for tol in TOLERANCES:
+        xl, M = aperture.mode(lc, 32, 2.0, tol)
+        fine = np.linspace(xl[0], xl[-1], 400001)
+        E = aperture.waveguide.mode(lc, fine)[0]
+        E = E / np.sqrt(np.trapezoid(E ** 2, fine))
+        waves = np.exp(1j * q[:, np.newaxis] * fine)
+        reference = np.trapezoid(E * waves, fine, axis=-1)
+        overlaps = np.exp(1j * q[:, np.newaxis] * xl) @ (M * trapzw(xl))
+        scale = np.trapezoid(np.abs(E), fine)
+        assert np.max(np.abs(overlaps - reference)) <= 2 * tol * scale
@@ -0,0 +1,41 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import awg
+
+# 弱侧壁（|n - ncl| / n 约 6%）、输入远场窄、几乎照不到侧壁的设计
+WEAK = dict(core=1.6, clad=1.45, subs=1.45, h=1.0, w=1.5, wi=4.0, wo=2.0, do=4.0, d=4.0, g=2.0,
+            R=200.0, N=40, No=4, m=20)
+
+
+def test_bpm_without_walls_matches_diffraction():
+    # 无侧壁时两者求解同一个均匀问题，差别是渐近衍射核的误差
+    model = awg.AWG()
+    options = awg.SimulationOptions()
+    lmbda = model.lambda_c + np.linspace(-0.005, 0.005, 4)
+    ns = model.slab_waveguide().index(lmbda)
+    F0 = awg.iw(model, lmbda, options=options)
+    s, _ = model.array_aperture().grid(options.points, options.window, options.tolerance)
+    coupler = awg.StarCoupler(F0.x, model.focal_z(F0.x), model.R * np.sin(s / model.R),
+                              model.R * np.cos(s / model.R))
+    reference = coupler.diffract(lmbda / ns, F0.E, "direct")
+    error = np.abs(coupler.bpm(lmbda, ns, None, F0.E) - reference)
+    assert np.max(error) <= 1e-3 * np.max(np.abs(reference))
+
+
+def test_bpm_with_weak_walls_matches_diffraction():
+    model = awg.AWG(**WEAK)
+    lmbda = model.lambda_c + np.linspace(-0.01, 0.01, 9)
+    T = awg.simulate(model, lmbda)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        B = awg.simulate(model, lmbda, options=awg.SimulationOptions(fpr="bpm"))
+    np.testing.assert_allclose(B, T, rtol=0, atol=2e-3 * T.max())
+
+
+def test_bpm_warns_on_high_contrast_walls():
+    model = awg.AWG()
+    with pytest.warns(RuntimeWarning, match="wall contrast"):
+        awg.simulate(model, model.lambda_c, options=awg.SimulationOptions(fpr="bpm"))
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import awg
+from awg.core import slabgroup, slabindex
+from awg.dispersion import groupindex, index
+from awg.material import SiModel, SiO2Model
+
+
+def central(f, lmbda, step=1e-4):
+    # 参照：对求解器做中心差分
+    return f(lmbda) - lmbda * (f(lmbda + step) - f(lmbda - step)) / (2 * step)
+
+
+@pytest.mark.parametrize("polarization", ["TE", "TM"])
+@pytest.mark.parametrize("t, mode", [(0.22, 0), (0.6, 1)])
+def test_slab_group_index_matches_finite_differences(polarization, t, mode):
+    si, ox = SiModel(), SiO2Model()
+    lmbda = np.linspace(1.5, 1.6, 5)
+    ng = slabgroup(lmbda, t, ox(lmbda), si(lmbda), 1.0, ox.dispersion(lmbda)[1], si.dispersion(lmbda)[1],
+                   0.0, mode, polarization)
+    fd = central(lambda l: slabindex(l, t, ox(l), si(l), 1.0, mode, polarization), lmbda)
+    np.testing.assert_allclose(ng, fd, rtol=0, atol=1e-7)
+
+
+@pytest.mark.parametrize("model", [awg.AWG(), awg.AWG(polarization="TM"), awg.AWG(t=0.09),
+                                   awg.AWG(core=3.47, clad=awg.material.SiO2)])
+def test_group_index_grid_matches_finite_differences(model):
+    w = np.array([0.4, 0.5, 0.6, np.inf])[:, np.newaxis]
+    h = np.array([0.2, 0.22, 0.25])
+    n, ng = groupindex(model, 1.55, w, h, model.t)
+    np.testing.assert_array_equal(n, index(model, 1.55, w, h, model.t))
+    fd = central(lambda l: index(model, l, w, h, model.t), 1.55)
+    np.testing.assert_allclose(ng, fd, rtol=0, atol=1e-7)
+    _, own = groupindex(model, 1.55, model.w, model.h, model.t)
+    assert np.isclose(own, model.array_waveguide().groupindex(1.55), rtol=0, atol=1e-7)
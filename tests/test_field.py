@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import awg
+from awg import Field
+
+
+def field(batch=4, n=101, H=False):
+    x = np.linspace(-5.0, 5.0, n)
+    E = np.exp(-x ** 2) * np.arange(1, batch + 1)[:, np.newaxis] + 0j
+    return Field(x, E, E / 2 if H else None, lmbda=np.linspace(1.54, 1.56, batch))
+
+
+def test_footprint_per_sampled_point():
+    # 每个采样点 16 字节（complex128 的 E），加上共享的坐标网格与波长
+    B, n = 8, 257
+    F = field(B, n)
+    assert F.nbytes == 16 * B * n + 8 * n + 8 * B
+    F.H = F.E.copy()
+    assert F.nbytes == 32 * B * n + 8 * n + 8 * B
+
+
+def test_lazy_H_is_not_counted_until_evaluated():
+    F = field()
+    G = Field(F.x, F.E, lambda: F.E.conj(), F.lmbda)
+    assert G.nbytes == F.nbytes
+    G.H
+    assert G.nbytes == F.nbytes + F.E.nbytes
+
+
+def test_chain_fields_hold_at_most_16_bytes_per_point():
+    # 同 benchmarks/field_memory.py：各级场每个采样点至多一个 complex128，外加共享网格
+    model = awg.AWG()
+    lmbda = np.linspace(1.54, 1.56, 16)
+    fields = [awg.iw(model, lmbda)]
+    for stage in (awg.fpr1, awg.aw, awg.fpr2):
+        fields.append(stage(model, lmbda, fields[-1]))
+    for F in fields:
+        assert F._H is None or callable(F._H)
+        assert F.nbytes <= 16 * F.E.size + F.x.nbytes + lmbda.nbytes
+
+
+def test_views_share_the_data():
+    F = field(H=True)
+    for G in (F.offset(1.0), F.crop(-1.0, 1.0), F[1], F[1:3], F[..., 10:20]):
+        assert np.shares_memory(G.E, F.E)
+        assert np.shares_memory(G.H, F.H)
+    assert F.offset(1.0).E is F.E
+    assert np.shares_memory(F.crop(-1.0, 1.0).x, F.x)
+    assert np.shares_memory(F[1:3].lmbda, F.lmbda)
+    assert not np.shares_memory(F.copy().E, F.E)
+
+
+def test_pnorm_is_in_place_and_visible_through_views():
+    F = field(H=True)
+    E, H, view = F.E, F.H, F[2]
+    assert F.pnorm() is F
+    assert F.E is E and F.H is H
+    np.testing.assert_allclose(np.real(F.power()), 1.0, rtol=1e-12)
+    np.testing.assert_allclose(np.real(view.power()), 1.0, rtol=1e-12)
+
+
+def test_pnorm_copies_read_only_data():
+    F = field()
+    F.E.flags.writeable = False
+    E = F.E
+    F.pnorm()
+    assert F.E is not E and not np.shares_memory(F.E, E)
+    np.testing.assert_allclose(F.power(), 1.0, rtol=1e-12)
+
+
+def test_crop_and_indexing():
+    F = field(H=True)
+    G = F.crop(-1.0, 1.0)
+    assert G.x.min() >= -1.0 and G.x.max() <= 1.0
+    np.testing.assert_array_equal(G.E, F.E[:, (F.x >= -1.0) & (F.x <= 1.0)])
+    assert F[1].lmbda == F.lmbda[1]
+    with pytest.raises(IndexError):
+        F[0, 0]
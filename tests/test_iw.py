@@ -0,0 +1,57 @@
+import numpy as np
+
+import awg
+
+
+def router():
+    return awg.AWG(Ni=4, No=4, di=2.0, wi=1.5)
+
+
+def test_batched_inputs_match_single_ports():
+    model = router()
+    lmbda = np.linspace(1.54, 1.56, 16)
+    T = awg.simulate(model, lmbda, _input=range(model.Ni))
+    for i in range(model.Ni):
+        np.testing.assert_allclose(T[i], awg.simulate(model, lmbda, _input=i), rtol=0, atol=1e-12)
+
+
+def test_batched_inputs_match_single_ports_adaptive():
+    model = router()
+    lmbda = np.linspace(1.54, 1.56, 8)
+    options = awg.SimulationOptions(tolerance=1e-3)
+    T = awg.simulate(model, lmbda, _input=[3, 1], options=options)
+    for j, i in enumerate([3, 1]):
+        np.testing.assert_allclose(T[j], awg.simulate(model, lmbda, _input=i, options=options),
+                                   rtol=0, atol=1e-12)
+
+
+def test_sparameters_match_simulate():
+    model = router()
+    lmbda = np.linspace(1.54, 1.56, 16)
+    S = awg.sparameters(model, lmbda)
+    T = np.moveaxis(awg.simulate(model, lmbda, _input=range(model.Ni)), 0, -1)
+    np.testing.assert_allclose(np.abs(S.transmission) ** 2, T, rtol=0, atol=1e-12)
+
+
+def test_single_input_field_on_aperture_grid():
+    model = router()
+    options = awg.SimulationOptions()
+    F = awg.iw(model, 1.55, 2, options=options)
+    x, idx = model.input_aperture().grid(options.points, options.window)
+    np.testing.assert_array_equal(F.x, x)
+    outside = np.ones(x.size, dtype=bool)
+    outside[idx[2]] = False
+    assert np.all(F.E[..., outside] == 0)
+
+
+def test_multiport_field_indexing_keeps_wavelengths():
+    lmbda = np.array([1.55, 1.551])
+    F = awg.iw(awg.AWG(Ni=3), lmbda, [0, 1, 2])
+    assert F.batch_shape == (3, 2)
+    for p in range(3):
+        np.testing.assert_array_equal(F[p].lmbda, lmbda)
+        np.testing.assert_array_equal(F[p].E, F.E[p])
+    assert F[1, 1].lmbda == 1.551
+    np.testing.assert_array_equal(F[:, 1].lmbda, 1.551)
+    np.testing.assert_array_equal(F[1:].lmbda, lmbda)
+    assert np.shares_memory(F[2].lmbda, F.lmbda)
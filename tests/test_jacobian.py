@@ -0,0 +1,72 @@
+import copy
+
+import numpy as np
+import pytest
+
+import awg
+from awg.jacobian import PARAMETERS
+
+
+def central(model, lmbda, name, step=1e-6):
+    # 中心差分：采样数固定的模型，步长内不跨过采样数的跳变
+    value = getattr(model, name)
+    h = step * max(abs(value), 1.0)
+    T = []
+    for sign in (1, -1):
+        trial = copy.copy(model)
+        setattr(trial, name, value + sign * h)
+        T.append(awg.simulate(trial, lmbda))
+    return (T[0] - T[1]) / (2 * h)
+
+
+@pytest.mark.parametrize("model", [awg.AWG(), awg.AWG(polarization="TM", Ni=3, di=2.0, wi=1.5)])
+def test_jacobian_matches_finite_differences(model):
+    # 默认设计的 wo 恰在采样数取整的跳变处
+    model = model.freeze()
+    model.dl = model.dl
+    lmbda = model.lambda_c + np.linspace(-0.004, 0.004, 5)
+    T, J = awg.jacobian(model, lmbda, PARAMETERS)
+    np.testing.assert_allclose(T, awg.simulate(model, lmbda), rtol=0, atol=1e-12)
+    for i, name in enumerate(PARAMETERS):
+        fd = central(model, lmbda, name)
+        np.testing.assert_allclose(J[..., i], fd, rtol=0, atol=1e-5 * np.max(np.abs(fd)) + 1e-6,
+                                   err_msg=name)
+
+
+def test_frozen_sampling_is_continuous_in_width():
+    model = awg.AWG().freeze()
+    model.dl = model.dl
+    T = []
+    for wo in model.wo + np.array([-2e-6, -1e-6, 0.0, 1e-6, 2e-6]):
+        trial = copy.copy(model)
+        trial.wo = wo
+        T.append(awg.simulate(trial, model.lambda_c))
+    slope = np.diff(T, axis=0) / 1e-6
+    np.testing.assert_allclose(slope, np.broadcast_to(slope[1], slope.shape), rtol=0, atol=1e-5)
+
+
+def test_freeze_keeps_the_grids():
+    model = awg.AWG()
+    frozen = model.freeze()
+    options = awg.SimulationOptions()
+    assert set(frozen.samples) == {"input", "array", "output"}
+    assert model.samples is None
+    assert frozen.hash() != model.hash()
+    for name in ("input_aperture", "array_aperture", "output_aperture"):
+        a, b = getattr(model, name)(), getattr(frozen, name)()
+        np.testing.assert_array_equal(a.grid(options.points, options.window)[0],
+                                      b.grid(options.points, options.window)[0])
+    # 冻结模型的模式取单元平均，结果只在离散化误差内不同
+    T, F = awg.simulate(model, 1.55), awg.simulate(frozen, 1.55)
+    assert not np.array_equal(T, F)
+    np.testing.assert_allclose(F, T, rtol=0, atol=1e-2)
+
+
+def test_jacobian_of_unfrozen_model_is_that_of_the_frozen_model():
+    model = awg.AWG()
+    lmbda = model.lambda_c + np.linspace(-0.002, 0.002, 3)
+    T, J = awg.jacobian(model, lmbda, ("wo", "R"))
+    T0, J0 = awg.jacobian(model.freeze(), lmbda, ("wo", "R"))
+    np.testing.assert_array_equal(T, T0)
+    np.testing.assert_array_equal(J, J0)
+    np.testing.assert_allclose(T, awg.simulate(model.freeze(), lmbda), rtol=0, atol=1e-12)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import awg
+
+
+def chain(model, wavelength, **kwargs):
+    # 基准：每个波长单独通过仿真链
+    return np.stack([awg.simulate(model, l, **kwargs) for l in wavelength])
+
+
+def test_direct_sweep_matches_chain():
+    model = awg.AWG()
+    S = awg.spectrum(model, points=64, options=awg.SimulationOptions(sweep="direct"))
+    wavelength, T = S["wavelength"], S["transmission"]
+    check = [0, 21, 40, 63]
+    # 批量衍射的相位递推允许 1e-6 rad 的相位误差（见 core.diffract）
+    np.testing.assert_allclose(T[check], chain(model, wavelength[check]), rtol=0, atol=1e-8)
+
+
+@pytest.mark.parametrize("model", [awg.AWG(), awg.AWG(No=16, N=64, Ni=3)])
+def test_interpolated_sweep_matches_chain(model):
+    options = awg.SimulationOptions(sweep="interpolate", sweep_tolerance=1e-5)
+    wavelength = np.linspace(1.53, 1.565, 301)
+    T = awg.spectrum(model, wavelength, _input=model.Ni - 1, options=options)["transmission"]
+    check = [0, 77, 150, 222, 300]
+    R = chain(model, wavelength[check], _input=model.Ni - 1)
+    np.testing.assert_allclose(T[check], R, rtol=0, atol=1e-5 * R.max())
+
+
+def test_auto_sweep_interpolates_long_sweeps_only():
+    model = awg.AWG()
+    short = np.linspace(1.54, 1.56, 500)
+    long = np.linspace(1.54, 1.56, 501)
+    direct = awg.SimulationOptions(sweep="direct")
+    interpolate = awg.SimulationOptions(sweep="interpolate")
+    assert np.array_equal(awg.spectrum(model, short)["transmission"],
+                          awg.spectrum(model, short, options=direct)["transmission"])
+    assert np.array_equal(awg.spectrum(model, long)["transmission"],
+                          awg.spectrum(model, long, options=interpolate)["transmission"])
+
+
+def test_interpolated_sweep_options():
+    model = awg.AWG()
+    with pytest.raises(ValueError):
+        awg.SimulationOptions(sweep="fast")
+    with pytest.raises(ValueError):
+        awg.SimulationOptions(sweep_tolerance=0)
+    with pytest.raises(ValueError):
+        awg.spectrum(model, points=8, options=awg.SimulationOptions(sweep="interpolate", coupling_window=2))
+    # 自动模式在不适用时退回仿真链
+    T = awg.spectrum(model, points=600, options=awg.SimulationOptions(coupling_window=2))["transmission"]
+    assert T.shape == (600, model.No)
+
+
+def test_cached_sweep_is_computed_through_the_chain(tmp_path):
+    # 缓存内容不随调用顺序变化：长扫描也逐批走仿真链
+    model = awg.AWG()
+    long = np.linspace(1.54, 1.56, 501)
+    cache = awg.ResultCache(tmp_path)
+    direct = awg.spectrum(model, long, options=awg.SimulationOptions(sweep="direct"))["transmission"]
+    assert np.array_equal(awg.spectrum(model, long, cache=cache)["transmission"], direct)
+    assert np.array_equal(cache.simulate(model, long[::7]), direct[::7])
+    assert cache.misses == long.size
@@ -0,0 +1,15 @@
+import numpy as np
+
+import awg
+
+
+def test_integer_parameters_are_trained_on_rounded_values():
+    model = awg.AWG()
+    space = {"N": (30, 50), "w": (0.9, 1.1)}
+    S = awg.Surrogate.train(model, space, samples=8, validation=2, points=5, seed=0, workers=1)
+    N = S.low[0] + S.X[:, 0] * (S.high[0] - S.low[0])
+    np.testing.assert_allclose(N, np.round(N), rtol=0, atol=1e-12)
+    # 插值在训练设计上是精确的（低于 floor 的透射率被截断）
+    design = dict(N=int(round(N[0])), w=S.low[1] + S.X[0, 1] * (S.high[1] - S.low[1]))
+    expected = awg.spectrum(awg.AWG(**design), S.wavelength)["transmission"]
+    np.testing.assert_allclose(S(**design), np.maximum(expected, 10 ** (S.floor / 10)), rtol=1e-6)